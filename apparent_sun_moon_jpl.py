@@ -37,9 +37,12 @@ class ApparentSunMoonJpl:
             ap = apos.Apos(self.FILE_BIN, self.utc)
             self.tdb    = ap.tdb
             self.jd_tdb = ap.jd_tdb
-            self.sun  = ap.sun()
-            self.moon = ap.moon()
+            self.sun, self.moon = ap.sun_moon()
             self.__display()
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
         except Exception as e:
             raise
 
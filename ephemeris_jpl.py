@@ -86,6 +86,10 @@ class EphemerisJpl:
             self.au = de.au
             self.rrds = de.calc()
             self.__display()
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
         except Exception as e:
             raise
 
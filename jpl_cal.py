@@ -23,6 +23,8 @@ from lib import calendar as lcal
 class JplCal:
     USAGE    = "[USAGE] ./jpl_cal.py [YYYYMMDD]"
     BIN_PATH = "/path/to/JPLEPH"
+    # 視黄経のチェビシェフ近似ファイル（jpleph_cheb.py で作成。 None: 使用しない）
+    CHEB_PATH = None
 
     def __init__(self):
         self.__get_arg()
@@ -30,7 +32,7 @@ class JplCal:
     def exec(self):
         """ Execution """
         try:
-            cal = lcal.Calendar(self.BIN_PATH, self.jst)
+            cal = lcal.Calendar(self.BIN_PATH, self.jst, self.CHEB_PATH)
             self.jst    = cal.jst
             self.jd     = cal.jd
             self.jd_jst = cal.jd_jst
@@ -40,8 +42,7 @@ class JplCal:
             self.sekki_24     = cal.sekki_24()
             self.sekku        = cal.sekku()
             self.zassetsu     = cal.zassetsu()
-            self.kokei_sun    = cal.kokei_sun()
-            self.kokei_moon   = cal.kokei_moon()
+            self.kokei_sun, self.kokei_moon = cal.kokei_sun_moon()
             self.moonage      = cal.moonage()
             self.oc           = cal.oc()
             self.__display()
@@ -56,6 +57,10 @@ class JplCal:
             #    diff += 360
             #moonphase = round(diff / 360 * 28)
             #print("---\n月相: " + str(moonphase))
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
         except Exception as e:
             raise
 
@@ -0,0 +1,59 @@
+#! /usr/local/bin/python3
+"""
+JPL 提供の ASCII 形式のデータ(header.4xx, ascpYYYY.4xx)をバイナリデータ(JPLEPH)に変換
+
+---------------------------------------------------------------------
+* 引数
+  [第１] ヘッダファイル（必須。 header.4xx）
+  [第２] 出力ファイル（必須）
+  [第３〜] データファイル（必須。 ascpYYYY.4xx。時刻順に 1 個以上）
+
+* 注意事項
+  - データファイルは 1 行ずつ読み込み、 1 区間ずつ出力する。
+    （全ての係数をメモリに展開しない）
+  - 区間の連続性、レコード番号・係数の数を確認し、不正な場合はエラーとする。
+  - 出力ファイルは、 EphJpl（EphJplSession）のバイナリファイルとして
+    そのまま使用できる。
+"""
+import sys
+import traceback
+from lib import eph_jpl_asc as ljasc
+
+
+class JplephAsc:
+    USAGE = "[USAGE] ./jpleph_asc.py <header.4xx> <出力ファイル>" \
+          + " <ascpYYYY.4xx> [<ascpYYYY.4xx> ...]"
+
+    def __init__(self):
+        self.__get_args()
+
+    def exec(self):
+        """ Execution """
+        try:
+            n_rec = ljasc.convert(
+                self.file_header, self.files_data, self.file_bin
+            )
+            print("{} records -> {}".format(n_rec, self.file_bin))
+        except Exception as e:
+            raise
+
+    def __get_args(self):
+        """ コマンドライン引数取得 """
+        try:
+            if len(sys.argv) < 4:
+                print(self.USAGE)
+                sys.exit(0)
+            self.file_header = sys.argv[1]
+            self.file_bin    = sys.argv[2]
+            self.files_data  = sys.argv[3:]
+        except Exception as e:
+            raise
+
+
+if __name__ == '__main__':
+    try:
+        obj = JplephAsc()
+        obj.exec()
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(1)
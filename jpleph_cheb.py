@@ -0,0 +1,84 @@
+#! /usr/local/bin/python3
+"""
+JPLEPH(JPL の DE430 バイナリデータ)から太陽・月の視黄経のチェビシェフ近似ファイルを作成
+
+---------------------------------------------------------------------
+* 引数
+  [第１] 出力ファイル（必須）
+  [第２] 開始年（省略可。省略時は 1899）
+  [第３] 終了年（省略可。省略時は 2100）
+
+* 注意事項
+  - 期間は開始年の 1 月 1 日 0 時から終了年の翌年の 1 月 1 日 0 時まで
+    （TDB）とし、区間の日数・多項式の次数は lib/apos_cheb.py の SPANS,
+    DEGS とする。
+  - 作成時に求めた誤差の上限と、ランダムな時刻での Apos との差
+    （天体毎の最大値）を出力する。
+  - 出力ファイルは、 Calendar（jpl_cal.py の CHEB_PATH）に指定すると、
+    視黄経（太陽・月）の計算に使用される。
+"""
+from datetime import datetime
+import math
+import re
+import sys
+import traceback
+from lib import apos_cheb as lcheb
+from lib import time_     as ltm
+
+
+class JplephCheb:
+    USAGE    = "[USAGE] ./jpleph_cheb.py <出力ファイル> [開始年] [終了年]"
+    FILE_BIN = "/path/to/JPLEPH"
+
+    def __init__(self):
+        self.__get_args()
+
+    def exec(self):
+        """ Execution """
+        try:
+            jd_s = ltm.gc2jd(datetime(self.year_s, 1, 1))
+            jd_e = ltm.gc2jd(datetime(self.year_e + 1, 1, 1))
+            errs = lcheb.build(self.FILE_BIN, self.file_out, jd_s, jd_e)
+            print("JD {} - {} -> {}".format(jd_s, jd_e, self.file_out))
+            diffs = lcheb.verify(self.FILE_BIN, self.file_out)
+            for k in ["sun", "moon"]:
+                print("  {:4s}: max |err| = {} deg (vs Apos: {} deg)".format(
+                    k, errs[k] * 180 / math.pi, diffs[k] * 180 / math.pi
+                ))
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
+        except Exception as e:
+            raise
+
+    def __get_args(self):
+        """ コマンドライン引数取得 """
+        try:
+            if len(sys.argv) < 2:
+                print(self.USAGE)
+                sys.exit(0)
+            self.file_out = sys.argv[1]
+            self.year_s, self.year_e = 1899, 2100
+            if len(sys.argv) > 2:
+                if len(sys.argv) < 4 or \
+                   not re.search(r"^\d{4}$", sys.argv[2]) or \
+                   not re.search(r"^\d{4}$", sys.argv[3]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.year_s = int(sys.argv[2])
+                self.year_e = int(sys.argv[3])
+            if self.year_s > self.year_e:
+                print(self.USAGE)
+                sys.exit(0)
+        except Exception as e:
+            raise
+
+
+if __name__ == '__main__':
+    try:
+        obj = JplephCheb()
+        obj.exec()
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,98 @@
+#! /usr/local/bin/python3
+"""
+JPLEPH(JPL の DE430 バイナリデータ)を天体毎に分割した係数データに変換
+
+---------------------------------------------------------------------
+* 引数
+  [第１] 出力ディレクトリ（必須）
+  [第２] 出力対象の係数データの番号（省略可。カンマ区切り。省略時は全て）
+          1: 水星, 2: 金星, 3: 地球 - 月の重心, 4: 火星, 5: 木星,
+          6: 土星, 7: 天王星, 8: 海王星, 9: 冥王星, 10: 月（地心）,
+         11: 太陽, 12: 地球の章動, 13: 月の秤動
+         （"all" は全て）
+  [第３] 係数の型（省略可。 f8: 倍精度（既定）, f4: 単精度）
+
+* 注意事項
+  - 出力ディレクトリは、 EphJpl（EphJplSession）のバイナリファイルの
+    フルパスの代わりにそのまま指定できる。
+  - 単精度の場合は、変換後に天体毎の位置の誤差の上限（係数の丸め誤差から
+    計算）と、元のバイナリデータとの差の最大値（計測）を出力する。
+    （一部の係数データのみ変換した場合は、変換した係数データのみで計算可能な
+      天体の差を計測する）
+"""
+import json
+import os
+import re
+import sys
+import traceback
+from lib import eph_jpl_col as ljcol
+
+
+class JplephCol:
+    USAGE    = "[USAGE] ./jpleph_col.py <出力ディレクトリ>" \
+             + " [係数データの番号,...|all] [f8|f4]"
+    FILE_BIN = "/path/to/JPLEPH"
+
+    def __init__(self):
+        self.__get_args()
+
+    def exec(self):
+        """ Execution """
+        try:
+            n_rec = ljcol.convert(
+                self.FILE_BIN, self.dir_col, self.bodies, self.dtype
+            )
+            print("{} records -> {}".format(n_rec, self.dir_col))
+            if self.dtype == "f8":
+                return
+            with open(os.path.join(self.dir_col, "header.json")) as f:
+                errors = json.load(f)["errors"]
+            print("[Error bound (coefficient No.)]")
+            for k, err in errors.items():
+                print("  {:>2s}: {:.3e}".format(k, err))
+            print("[Measured max error (body No.)]")
+            errors = ljcol.measure(self.FILE_BIN, self.dir_col)
+            if not errors:
+                print("  (No body computable from the converted data.)")
+            for k, err in errors.items():
+                print("  {:2d}: {:.3e}".format(k, err))
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
+        except Exception as e:
+            raise
+
+    def __get_args(self):
+        """ コマンドライン引数取得 """
+        try:
+            if len(sys.argv) < 2:
+                print(self.USAGE)
+                sys.exit(0)
+            self.dir_col = sys.argv[1]
+            self.bodies = None
+            self.dtype = "f8"
+            if len(sys.argv) > 3:
+                if not re.search(r"^f[48]$", sys.argv[3]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.dtype = sys.argv[3]
+            if len(sys.argv) > 2 and sys.argv[2] != "all":
+                if not re.search(r"^\d+(,\d+)*$", sys.argv[2]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.bodies = [int(k) for k in sys.argv[2].split(",")]
+                if [k for k in self.bodies if k < 1 or k > 13]:
+                    print(self.USAGE)
+                    sys.exit(0)
+        except Exception as e:
+            raise
+
+
+if __name__ == '__main__':
+    try:
+        obj = JplephCol()
+        obj.exec()
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(1)
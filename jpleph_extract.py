@@ -0,0 +1,85 @@
+#! /usr/local/bin/python3
+"""
+JPLEPH(JPL の DE430 バイナリデータ)から期間・天体を限定したバイナリデータを作成
+
+---------------------------------------------------------------------
+* 引数
+  [第１] 出力ファイル（必須）
+  [第２] 開始ユリウス日（必須）
+  [第３] 終了ユリウス日（必須）
+  [第４] 出力対象の係数データの番号（省略可。カンマ区切り。省略時は全て）
+          1: 水星, 2: 金星, 3: 地球 - 月の重心, 4: 火星, 5: 木星,
+          6: 土星, 7: 天王星, 8: 海王星, 9: 冥王星, 10: 月（地心）,
+         11: 太陽, 12: 地球の章動, 13: 月の秤動
+
+* 注意事項
+  - 期間は区間（DE430 の場合は 32 日）単位に切り上げる。
+  - 作成後、元のバイナリデータとの計算結果の差（天体毎の最大値）を出力する。
+    （係数をそのまま複写しているため、全て 0.0 となる）
+  - 出力ファイルは、 EphJpl（EphJplSession）のバイナリファイルの
+    フルパスの代わりにそのまま指定できる。
+"""
+import re
+import sys
+import traceback
+from lib import eph_jpl_ext as ljext
+
+
+class JplephExtract:
+    USAGE    = "[USAGE] ./jpleph_extract.py <出力ファイル> <開始JD> <終了JD>" \
+             + " [係数データの番号,...]"
+    FILE_BIN = "/path/to/JPLEPH"
+
+    def __init__(self):
+        self.__get_args()
+
+    def exec(self):
+        """ Execution """
+        try:
+            n_rec = ljext.extract(
+                self.FILE_BIN, self.file_out, self.jd_s, self.jd_e, self.bodies
+            )
+            print("{} records -> {}".format(n_rec, self.file_out))
+            diffs = ljext.validate(self.FILE_BIN, self.file_out)
+            for k, diff in diffs.items():
+                print("  {:2d}: max |diff| = {}".format(k, diff))
+        except ValueError as e:
+            print(e)
+            print(self.USAGE)
+            sys.exit(0)
+        except Exception as e:
+            raise
+
+    def __get_args(self):
+        """ コマンドライン引数取得 """
+        try:
+            if len(sys.argv) < 4:
+                print(self.USAGE)
+                sys.exit(0)
+            self.file_out = sys.argv[1]
+            if not re.search(r"^\d+(\.\d+)?$", sys.argv[2]) or \
+               not re.search(r"^\d+(\.\d+)?$", sys.argv[3]):
+                print(self.USAGE)
+                sys.exit(0)
+            self.jd_s = float(sys.argv[2])
+            self.jd_e = float(sys.argv[3])
+            self.bodies = None
+            if len(sys.argv) > 4:
+                if not re.search(r"^\d+(,\d+)*$", sys.argv[4]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.bodies = [int(k) for k in sys.argv[4].split(",")]
+                if [k for k in self.bodies if k < 1 or k > 13]:
+                    print(self.USAGE)
+                    sys.exit(0)
+        except Exception as e:
+            raise
+
+
+if __name__ == '__main__':
+    try:
+        obj = JplephExtract()
+        obj.exec()
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(1)
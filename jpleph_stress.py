@@ -0,0 +1,121 @@
+#! /usr/local/bin/python3
+"""
+JPLEPH(JPL の DE430 バイナリデータ)の EphJplSession を複数スレッドで共有した
+場合の計算結果の検査
+
+---------------------------------------------------------------------
+* 引数
+  [第１] スレッド数（省略可。省略時は 16）
+  [第２] 計算回数（省略可。省略時は 20000）
+
+* 注意事項
+  - ランダムな（対象天体番号, 基準天体番号, ユリウス日）の state() を、
+    1 つの EphJplSession を共有した ThreadPoolExecutor で計算し、
+    単一スレッド（キャッシュ無し）で計算した結果と比較する。
+  - 読み込み方法（mmap, os.pread）・キャッシュ数・先読みの組み合わせ毎に、
+    一致しない結果の数、キャッシュの統計を出力する。
+  - 一致しない結果がある場合は、終了ステータスを 1 とする。
+"""
+from concurrent.futures import ThreadPoolExecutor
+import random
+import re
+import sys
+import time
+import traceback
+from lib import eph_jpl as ljpl
+
+
+class JplephStress:
+    USAGE    = "[USAGE] ./jpleph_stress.py [スレッド数] [計算回数]"
+    FILE_BIN = "/path/to/JPLEPH"
+    SEED     = 1
+    MODES    = [
+        {"pread": False},
+        {"pread": True},
+        {"pread": False, "cache_size": 2},
+        {"pread": True, "cache_size": 3, "prefetch": 2},
+    ]
+
+    def __init__(self):
+        self.__get_args()
+
+    def exec(self):
+        """ Execution """
+        try:
+            ref = ljpl.EphJplSession(self.FILE_BIN, cache_size=0)
+            try:
+                qs = self.__gen_queries(ref)
+                exps = [ref.state(*q) for q in qs]
+            finally:
+                ref.close()
+            n_ng = 0
+            for kw in self.MODES:
+                session = ljpl.EphJplSession(self.FILE_BIN, **kw)
+                try:
+                    t_0 = time.time()
+                    with ThreadPoolExecutor(self.n_thread) as ex:
+                        gots = list(ex.map(lambda q: session.state(*q), qs))
+                    t_1 = time.time() - t_0
+                    n_diff = sum(1 for g, e in zip(gots, exps) if g != e)
+                    n_ng += n_diff
+                    print("{}: {} / {} differ ({:.3f} s) {}".format(
+                        kw, n_diff, len(qs), t_1, session.cache.stats()
+                    ))
+                finally:
+                    session.close()
+            print("OK" if n_ng == 0 else "NG")
+            if n_ng > 0:
+                sys.exit(1)
+        except Exception as e:
+            raise
+
+    def __get_args(self):
+        """ コマンドライン引数取得 """
+        try:
+            self.n_thread, self.n_query = 16, 20000
+            if len(sys.argv) > 1:
+                if not re.search(r"^[1-9]\d*$", sys.argv[1]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.n_thread = int(sys.argv[1])
+            if len(sys.argv) > 2:
+                if not re.search(r"^[1-9]\d*$", sys.argv[2]):
+                    print(self.USAGE)
+                    sys.exit(0)
+                self.n_query = int(sys.argv[2])
+        except Exception as e:
+            raise
+
+    def __gen_queries(self, session):
+        """ ランダムな計算条件の生成
+            * 対象・基準天体番号は計算可能な 1 - 13 の天体（対象 ≠ 基準）、
+              ユリウス日はファイルの期間内とする。
+
+        :param  EphJplSession session: 期間・天体番号の取得に使用
+        :return list: [(対象天体番号, 基準天体番号, ユリウス日), ...]
+        """
+        try:
+            rnd = random.Random(self.SEED)
+            jd_s, jd_e = session.sss[0], session.sss[1]
+            bodies = [k for k in session.bodies() if k <= 13]
+            qs = []
+            while len(qs) < self.n_query:
+                target, center = rnd.choice(bodies), rnd.choice(bodies)
+                if target == center:
+                    continue
+                jd = rnd.uniform(jd_s, jd_e)
+                if jd >= jd_e:
+                    continue
+                qs.append((target, center, jd))
+            return qs
+        except Exception as e:
+            raise
+
+
+if __name__ == '__main__':
+    try:
+        obj = JplephStress()
+        obj.exec()
+    except Exception as e:
+        traceback.print_exc()
+        sys.exit(1)
@@ -8,6 +8,7 @@ Class for apparent position of Sun/Moon.
 Copyright(C) 2018 mk-mode.com All Rights Reserved.
 """
 import math
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -15,35 +16,67 @@ import const   as lcst
 import coord   as lcd
 import eph_bpn as lbpn
 import eph_jpl as ljpl
+import matrix  as lmtx
 import time_   as ltm
 
 
 class Apos:
-    def __init__(self, file_bin, utc):
+    def __init__(self, file_bin, utc=None, session=None, jd_tdb=None):
         """ Initialization
+            * 位置・速度の計算は、 1 つの EphJplSession（省略時は
+              eph_jpl.get_session() で共有するもの）で行う。
+              （ファイルのオープン・ヘッダ部の解析は初回のみ）
+            * 時刻 t2 の地球・月・太陽は state_all() で 1 回の係数取得で計算し、
+              光差の計算（Newton 法）では対象天体のみを計算する。
+            * utc の代わりに TDB のユリウス日（jd_tdb）を指定した場合は、
+              datetime を使用せずに計算する。 jd_tdb は 2 つの値の和
+              （[jd_1, jd_2]。例えば [0 時のユリウス日, 日の端数]）でも
+              指定でき、光差の補正も jd_2 側で行う。（time_.utc2tdb_2() で
+              UTC から変換可能）
 
-        :param string file_bin: バイナリファイルのフルパス
-        :param datetime    utc: UTC（協定世界時）
+        :param string            file_bin: バイナリファイルのフルパス
+        :param datetime               utc: UTC（協定世界時）
+        :param EphJplSession      session: 使用する EphJplSession（省略可）
+        :param float/list          jd_tdb: TDB のユリウス日（utc の代わりに指定）
         """
         self.file_bin = file_bin
         self.utc = utc
+        self.session = session
+        if self.session is None:
+            self.session = ljpl.get_session(self.file_bin)
         # === t1(= TDB), t2(= TDB) における位置・速度（ICRS 座標）用 Dict
         self.icrs_1, self.icrs_2 = {}, {}
-        # === 時刻 t2 の変換（UTC（協定世界時） -> TDB（太陽系力学時））
-        self.tdb = self.__utc2tdb(utc)
-        # === 時刻 t2 のユリウス日
-        self.jd_tdb = ltm.gc2jd(self.tdb)
+        if jd_tdb is None:
+            # === 時刻 t2 の変換（UTC（協定世界時） -> TDB（太陽系力学時））
+            self.tdb = self.__utc2tdb(utc)
+            # === 時刻 t2 のユリウス日
+            self.jd_tdb = ltm.gc2jd(self.tdb)
+            # （2 つの値の和は [0.0, ユリウス日] とし、従来と同じ計算とする）
+            self.jd_tdb_2 = [0.0, self.jd_tdb]
+        else:
+            self.tdb = None
+            if isinstance(jd_tdb, (list, tuple)):
+                self.jd_tdb_2 = [float(jd_tdb[0]), float(jd_tdb[1])]
+            else:
+                self.jd_tdb_2 = [float(jd_tdb), 0.0]
+            self.jd_tdb = self.jd_tdb_2[0] + self.jd_tdb_2[1]
         # === 時刻 t2(= TDB) におけるの位置・速度（ICRS 座標）の計算 (地球, 月, 太陽)
-        #Const::BODIES.each { |k, v| @icrs_2[k] = get_icrs(v, @jd_tdb) }
+        pvs = self.session.state_all(
+            self.jd_tdb_2[0], list(lcst.BODIES.values()),
+            jd2=self.jd_tdb_2[1]
+        )
         for k, v in lcst.BODIES.items():
-            self.icrs_2[k] = self.__get_icrs(v, self.jd_tdb)
+            self.icrs_2[k] = pvs[v]
         # === 時刻 t2(= TDB) における地球と太陽・月の距離
         self.r_e = self.__get_r_e()
         # === 太陽／月／地球の半径取得
-        de = ljpl.EphJpl(self.file_bin, 11, 3, self.jd_tdb)
-        self.asun = de.cvals[de.cnams.index("ASUN")]
-        self.am   = de.cvals[de.cnams.index("AM")]
-        self.re   = de.cvals[de.cnams.index("RE")]
+        self.asun = self.session.consts["ASUN"]
+        self.am   = self.session.consts["AM"]
+        self.re   = self.session.consts["RE"]
+        # === bias & precession & nutation（初回の sun(), moon() で計算し、共有）
+        self.bpn = None
+        # === 平均黄道傾斜角, bias & precession & nutation 回転行列（視黄経のみの計算用）
+        self.eps, self.r_mtx_bpn = None, None
 
     def sun(self):
         """ Computation of Sun position
@@ -56,10 +89,9 @@ class Apos:
         """
         try:
             # === 太陽が光を発した時刻 t1(JD) の計算
-            t_1_jd = self.__calc_t1("sun", self.tdb)
-            # === 時刻 t1(= TDB) におけるの位置・速度（ICRS 座標）の計算 (地球, 月, 太陽)
-            for k, v in lcst.BODIES.items():
-                self.icrs_1[k] = self.__get_icrs(v, t_1_jd)
+            t_1_jd = self.__calc_t1("sun")
+            # === 時刻 t1(= TDB) におけるの位置・速度（ICRS 座標）の計算 (太陽)
+            self.icrs_1["sun"] = self.__get_icrs(lcst.BODIES["sun"], t_1_jd)
             # === 時刻 t2 における地球重心から時刻 t1 における太陽への方向ベクトルの計算
             v_12 = self.__calc_unit_vector(
                 self.icrs_2["earth"][0:3], self.icrs_1["sun"][0:3]
@@ -68,7 +100,7 @@ class Apos:
             dd = self.__conv_lorentz(v_12)
             pos_sun = [d * self.r_e["sun"] for d in dd]
             # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
-            bpn = lbpn.EphBpn(self.tdb)
+            bpn = self.__get_bpn()
             pos_sun_bpn = bpn.apply_bias_prec_nut(pos_sun)
             # === 座標変換
             eq_pol_s, eq_r = lcd.rect2pol(pos_sun_bpn)
@@ -95,10 +127,9 @@ class Apos:
         try:
             pass
             # === 月が光を発した時刻 t1(jd) の計算
-            t_1_jd = self.__calc_t1("moon", self.tdb)
-            # === 時刻 t1(= TDB) におけるの位置・速度（ICRS 座標）の計算 (地球, 月, 太陽)
-            for k, v in lcst.BODIES.items():
-                self.icrs_1[k] = self.__get_icrs(v, t_1_jd)
+            t_1_jd = self.__calc_t1("moon")
+            # === 時刻 t1(= TDB) におけるの位置・速度（ICRS 座標）の計算 (月)
+            self.icrs_1["moon"] = self.__get_icrs(lcst.BODIES["moon"], t_1_jd)
             # === 時刻 t2 における地球重心から時刻 t1 における月への方向ベクトルの計算
             v_12 = self.__calc_unit_vector(
                 self.icrs_2["earth"][0:3], self.icrs_1["moon"][0:3]
@@ -107,7 +138,7 @@ class Apos:
             dd = self.__conv_lorentz(v_12)
             pos_moon = [d * self.r_e["moon"] for d in dd]
             # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
-            bpn = lbpn.EphBpn(self.tdb)
+            bpn = self.__get_bpn()
             pos_moon_bpn = bpn.apply_bias_prec_nut(pos_moon)
             # === 座標変換
             eq_pol_m, eq_r = lcd.rect2pol(pos_moon_bpn)
@@ -122,6 +153,91 @@ class Apos:
         except Exception as e:
             raise
 
+    def sun_moon(self):
+        """ Computation of Sun and Moon positions
+            * 時刻 t2 の地球の位置・速度、章動、 bias & precession & nutation の
+              回転行列は 1 回のみ計算し、太陽・月で共有する。
+
+        :return list: [sun() の戻り値, moon() の戻り値]
+        """
+        try:
+            return [self.sun(), self.moon()]
+        except Exception as e:
+            raise
+
+    def sun_lambda(self):
+        """ Computation of Sun apparent longitude
+            * sun() の視黄経のみを計算する。（sun()[1][0] と同じ値）
+              視赤経・視赤緯、距離、視半径・視差、 bias & precession & nutation
+              以外の回転行列は計算しない。
+
+        :return float: 視黄経 (Unit: rad)
+        """
+        try:
+            return self.__calc_lambda("sun")
+        except Exception as e:
+            raise
+
+    def moon_lambda(self):
+        """ Computation of Moon apparent longitude
+            * moon() の視黄経のみを計算する。（moon()[1][0] と同じ値）
+
+        :return float: 視黄経 (Unit: rad)
+        """
+        try:
+            return self.__calc_lambda("moon")
+        except Exception as e:
+            raise
+
+    def __calc_lambda(self, target):
+        """ 視黄経の計算（太陽・月共通）
+            * sun(), moon() と同じ演算を同じ順序で行う。（np.matrix の代わりに
+              np.ndarray を使用し、位置は速度を計算せずに取得する）
+
+        :param  string target: 対象天体（"sun", "moon"）
+        :return float     lmd: 視黄経 (Unit: rad)
+        """
+        try:
+            # === 対象天体が光を発した時刻 t1(JD) の計算
+            t_1_jd = self.__calc_t1(target)
+            # === 時刻 t1(= TDB) における位置（ICRS 座標）の計算
+            pos_1 = self.__get_icrs(lcst.BODIES[target], t_1_jd, kind=1)
+            # === 時刻 t2 における地球重心から時刻 t1 における対象天体への方向ベクトルの計算
+            v_12 = self.__calc_unit_vector(self.icrs_2["earth"][0:3], pos_1)
+            # === GCRS 座標系: 光行差の補正（方向ベクトルの Lorentz 変換）
+            dd = self.__conv_lorentz(v_12)
+            pos = np.array([[d * self.r_e[target] for d in dd]]).T
+            # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
+            if self.r_mtx_bpn is None:
+                if self.bpn is not None:
+                    self.eps, self.r_mtx_bpn = self.bpn.eps, self.bpn.r_mtx_bpn
+                else:
+                    self.eps, self.r_mtx_bpn = lbpn.calc_bpn(self.jd_tdb)
+            pos_bpn = np.dot(self.r_mtx_bpn.A, pos).ravel()
+            # === 座標変換（黄道直交座標 -> 黄経）
+            ec_rect = np.dot(lmtx.r_x(self.eps).A, np.array([pos_bpn]).T)
+            lmd = math.atan2(ec_rect[1, 0], ec_rect[0, 0])
+            if lmd < 0:
+                lmd %= math.pi * 2
+            return lmd
+        except Exception as e:
+            raise
+
+    def __get_bpn(self):
+        """ bias & precession & nutation の取得
+            * 初回のみ EphBpn を生成し、以降は同じものを返す。
+
+        :return EphBpn bpn
+        """
+        try:
+            if self.bpn is None:
+                self.bpn = lbpn.EphBpn(
+                    self.jd_tdb if self.tdb is None else self.tdb
+                )
+            return self.bpn
+        except Exception as e:
+            raise
+
     def __utc2tdb(self, utc):
         """ UTC（協定世界時） -> TDB（太陽系力学時）
 
@@ -140,18 +256,20 @@ class Apos:
         except Exception as e:
             raise
 
-    def __get_icrs(self, target, jd):
+    def __get_icrs(self, target, jd, kind=ljpl.EphJplSession.KIND):
         """ ICRS 座標取得
-            * JPL DE430 データを自作 RubyGems ライブラリ eph_jpl を使用して取得
+            * JPL DE430 データを自作ライブラリ eph_jpl（共有の EphJplSession）を
+              使用して取得
 
         :param  string target: 対象天体
-        :param  float      jd: ユリウス日
+        :param  list       jd: ユリウス日（2 つの値の和 [jd_1, jd_2]）
+        :param  int      kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
         :return list [pos_x, pos_y, pos_z, vel_x, vel_y, vel_z]
                              : 位置・速度(単位: AU, AU/day)
+                               （kind = 1 の場合は位置のみ）
         """
         try:
-            de = ljpl.EphJpl(self.file_bin, target, 12, jd)
-            return de.calc()
+            return self.session.state(target, 12, jd[0], kind=kind, jd2=jd[1])
         except Exception as e:
             raise
 
@@ -170,17 +288,19 @@ class Apos:
         except Exception as e:
             raise
 
-    def __calc_t1(self, target, tdb):
+    def __calc_t1(self, target):
         """ 対象天体が光を発した時刻 t1 の計算（太陽・月専用）
             * 計算式： c * (t2 - t1) = r12  (但し、 c: 光の速度。 Newton 法で近似）
             * 太陽・月専用なので、太陽・木星・土星・天王星・海王星の重力場による
               光の曲がりは非考慮。
+            * t1 は観測時刻 t2（= [jd_1, jd_2]）の jd_2 側に光差を加えた
+              2 つの値の和で扱う。
 
         :param  int   target: 対象天体(0:Sun, 1:Moon)
-        :param  datetime tdb: 観測時刻(TDB)
-        :return float    t_1: Julian Day
+        :return list     t_1: Julian Day（2 つの値の和 [jd_1, jd_2]）
         """
-        t_1 = ltm.gc2jd(tdb)
+        t_0 = self.jd_tdb_2[0]
+        t_1 = self.jd_tdb_2[1]
         t_2 = t_1
         pv_1 = self.icrs_2[target]
         df, m = 1.0, 0
@@ -198,8 +318,8 @@ class Apos:
                 m += 1
                 if m > 10:
                     raise "[ERROR] Newton method error!"
-                pv_1 = self.__get_icrs(lcst.BODIES[target], t_1)
-            return t_1
+                pv_1 = self.__get_icrs(lcst.BODIES[target], [t_0, t_1])
+            return [t_0, t_1]
         except Exception as e:
             raise
 
@@ -0,0 +1,472 @@
+"""
+Class for apparent position of Sun/Moon (batch).
+
+* apos.Apos と同じ計算（光差、光行差、 bias & precession & nutation、
+  座標変換、視半径／（地平）視差）を、複数の UTC に対して配列演算で行う。
+  - UTC -> TDB は time_.utc2tdb_v() でユリウス日（0 時のユリウス日と
+    日の端数の 2 つの配列）のまま変換する。 TDB のユリウス日を直接
+    指定することもできる。
+  - 位置・速度は EphJplSession.states() で全時刻をまとめて計算する。
+  - 光差の計算（Newton 法）は、未収束の時刻のみを繰り返し計算する。
+  - bias & precession & nutation の回転行列は eph_bpn.calc_bpn_v() で
+    計算し、太陽・月で共有する。
+* 惑星（planets()）は、光差・重力による光の曲がり（木星・土星・太陽）・
+  光行差・ bias & precession & nutation を、天体 x 時刻の配列で計算する。
+* 地点毎の視位置（topocentric()）は、太陽・月の地心の視位置から観測地点の
+  位置を引き、観測地点 x 時刻の配列で計算する。
+* 結果は np.ndarray で返す。（各行が 1 時刻分）
+"""
+import math
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import const   as lcst
+import coord   as lcd
+import eph_bpn as lbpn
+import eph_jpl as ljpl
+import matrix  as lmtx
+import time_   as ltm
+
+
+class AposBatch:
+    PLANETS = [1, 2, 4, 5, 6, 7, 8, 9]  # planets() の既定の天体番号
+    # 光を曲げる天体（天体番号, 質量の定数名, 質量比（太陽 = 1, 定数が無い場合）,
+    #                 q・(q + e) の下限）（この順に補正する）
+    DEFLECTORS = [
+        (5,  "GM5", 1 / 1047.3486, 3e-9),
+        (6,  "GM6", 1 / 3497.898,  3e-10),
+        (11, "GMS", 1.0,           6e-6)
+    ]
+
+    def __init__(self, file_bin, utcs=None, session=None, jds_tdb=None):
+        """ Initialization
+            * 時刻 t2 の地球・月・太陽は、天体毎に states() で全時刻を
+              まとめて計算する。
+            * utcs の代わりに TDB のユリウス日の配列（jds_tdb）を指定できる。
+              jds_tdb は 2 つの配列の和（[jds_1, jds_2]）でも指定でき、
+              光差の補正は jds_2 側で行う。
+
+        :param string            file_bin: バイナリファイルのフルパス
+        :param list                  utcs: UTC（協定世界時）の一覧
+                                           （datetime のリスト、
+                                             np.datetime64 の配列）
+        :param EphJplSession      session: 使用する EphJplSession（省略可）
+        :param np.ndarray         jds_tdb: TDB のユリウス日の配列
+                                           （utcs の代わりに指定）
+        """
+        self.file_bin = file_bin
+        self.utcs = None
+        self.session = session
+        if self.session is None:
+            self.session = ljpl.get_session(self.file_bin)
+        # === t2(= TDB) における位置・速度（ICRS 座標）用 Dict
+        self.icrs_2 = {}
+        if jds_tdb is None:
+            # === 時刻 t2 の変換（UTC（協定世界時） -> TDB（太陽系力学時）のユリウス日）
+            self.utcs = np.atleast_1d(np.asarray(utcs, dtype="datetime64[us]"))
+            self.jds_1, self.jds_2 = ltm.utc2tdb_v(self.utcs)
+        elif isinstance(jds_tdb, (list, tuple)) and len(jds_tdb) == 2:
+            self.jds_1, self.jds_2 = np.broadcast_arrays(
+                np.atleast_1d(np.asarray(jds_tdb[0], dtype=np.float64)),
+                np.atleast_1d(np.asarray(jds_tdb[1], dtype=np.float64))
+            )
+        else:
+            self.jds_1 = np.atleast_1d(np.asarray(jds_tdb, dtype=np.float64))
+            self.jds_2 = np.zeros_like(self.jds_1)
+        self.jd_tdb = self.jds_1 + self.jds_2
+        # === 時刻 t2(= TDB) におけるの位置・速度（ICRS 座標）の計算 (地球, 月, 太陽)
+        for k, v in lcst.BODIES.items():
+            self.icrs_2[k] = self.session.states(
+                v, 12, self.jds_1, jds2=self.jds_2
+            )
+        # === 時刻 t2(= TDB) における地球と太陽・月の距離
+        self.r_e = {}
+        for k in ["sun", "moon"]:
+            self.r_e[k] = np.linalg.norm(
+                self.icrs_2[k][:, 0:3] - self.icrs_2["earth"][:, 0:3], axis=1
+            )
+        # === 太陽／月／地球の半径取得
+        self.asun = self.session.consts["ASUN"]
+        self.am   = self.session.consts["AM"]
+        self.re   = self.session.consts["RE"]
+        # === 平均黄道傾斜角, bias & precession & nutation 回転行列, Δψ
+        #     （初回計算時に設定）
+        self.eps, self.r_mtx_bpn, self.dpsi = None, None, None
+        # === 太陽・月の地心の視位置（瞬時の真座標系の直交座標, 初回計算時に設定）
+        self.pos_bpn = {}
+        # === グリニッジ視恒星時（初回計算時に設定）
+        self.gast = None
+        # === 太陽・月以外の t2(= TDB) における位置・速度（天体番号 => 位置・速度）
+        self.pvs_2 = {}
+
+    def sun(self):
+        """ Computation of Sun position
+
+        :return list: [
+                          視赤経, 視赤緯, 地心距離（形状: N x 3）,
+                          視黄経, 視黄緯, 地心距離（形状: N x 3）,
+                          視半径, 視差（形状: N x 2）
+                      ]
+        """
+        try:
+            return self.__calc("sun", self.asun)
+        except Exception as e:
+            raise
+
+    def moon(self):
+        """ Computation of Moon position
+
+        :return list: [
+                          視赤経, 視赤緯, 地心距離（形状: N x 3）,
+                          視黄経, 視黄緯, 地心距離（形状: N x 3）,
+                          視半径, 視差（形状: N x 2）
+                      ]
+        """
+        try:
+            return self.__calc("moon", self.am)
+        except Exception as e:
+            raise
+
+    def planets(self, bodies=None, deflect=True):
+        """ Computation of planet positions
+            * 天体毎に光差を計算した後、光の曲がり・光行差・ bias & precession &
+              nutation・座標変換は全天体・全時刻をまとめて計算する。
+            * 光の曲がりは、木星・土星・太陽の重力場によるもの（対象天体自身に
+              よるものは除く）。光を曲げる天体の位置は、光がその天体の近くを
+              通過した時刻のものとする。
+            * 地心距離は、 sun(), moon() と同じく時刻 t2 の距離とする。
+
+        :param  list  bodies: 天体番号（1 - 11, 地球（3）を除く）の一覧
+                              （省略時は PLANETS）
+        :param  bool deflect: 光の曲がりの補正（True: 行う, False: 行わない）
+        :return list: [
+                          視赤経, 視赤緯, 地心距離（形状: 天体数 x N x 3）,
+                          視黄経, 視黄緯, 地心距離（形状: 天体数 x N x 3）
+                      ]
+        """
+        pvs_1, r_e = [], []
+        try:
+            if bodies is None:
+                bodies = self.PLANETS
+            pv_e = self.icrs_2["earth"]
+            for k in bodies:
+                # === 対象天体が光を発した時刻 t1(JD) の計算
+                pv_2 = self.__get_pv_2(k)
+                t_1_jd = self.__calc_t1(k, pv_2)
+                # === 時刻 t1(= TDB) におけるの位置（ICRS 座標）の計算
+                pvs_1.append(self.session.states(
+                    k, 12, self.jds_1, kind=1, jds2=t_1_jd
+                ))
+                r_e.append(np.linalg.norm(pv_2[:, 0:3] - pv_e[:, 0:3], axis=1))
+            pos_1, r_e = np.array(pvs_1), np.array(r_e)
+            # === 時刻 t2 における地球重心から時刻 t1 における対象天体への方向ベクトルの計算
+            v_12 = self.__calc_unit_vector(pv_e[:, 0:3], pos_1)
+            # === 重力による光の曲がりの補正
+            if deflect:
+                v_12 = self.__deflect(bodies, v_12, pos_1)
+            # === GCRS 座標系: 光行差の補正（方向ベクトルの Lorentz 変換）
+            dd = self.__conv_lorentz(v_12)
+            pos = dd * r_e[..., np.newaxis]
+            # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
+            self.__set_bpn()
+            pos_bpn = lmtx.rotate_v(self.r_mtx_bpn, pos)
+            # === 座標変換
+            eq_lmd, eq_phi, eq_r = lcd.rect2pol_v(pos_bpn)
+            ec_rect = lcd.rect_eq2ec_v(pos_bpn, self.eps)
+            ec_lmd, ec_phi, ec_r = lcd.rect2pol_v(ec_rect)
+            return [
+                np.stack((eq_lmd, eq_phi, eq_r), axis=-1),
+                np.stack((ec_lmd, ec_phi, ec_r), axis=-1)
+            ]
+        except Exception as e:
+            raise
+
+    def topocentric(self, target, lats, lons, heights=0.0):
+        """ Computation of topocentric Sun/Moon position
+            * sun(), moon() の地心の視位置（瞬時の真座標系の位置ベクトル）から
+              観測地点の位置ベクトルを引き、観測地点 x 時刻の配列で計算する。
+            * 観測地点の位置は、測地座標を地心直交座標（赤道半径は RE,
+              扁平率は FLAT）に変換し、 z 軸周りにグリニッジ視恒星時だけ
+              回転したもの。（極運動は無視する）
+            * 日周光行差（観測地点の自転速度による光行差）も補正する。
+            * 高度は大気差を含まない幾何学的な高度とする。
+            * 結果の大きさは 観測地点数 x N x 3 の配列 3 個分となるため、
+              観測地点・時刻の数が多い場合は分割して指定すること。
+            * target が "sun", "moon" 以外の場合は ValueError とする。
+
+        :param  string       target: 対象天体（"sun", "moon"）
+        :param  np.ndarray     lats: 測地緯度（北緯を正） (Unit: 度)（M 個）
+        :param  np.ndarray     lons: 経度（東経を正） (Unit: 度)（M 個）
+        :param  np.ndarray  heights: 楕円体高 (Unit: m)（M 個, 省略時は 0）
+        :return list: [
+                          視赤経, 視赤緯, 距離（形状: M x N x 3）,
+                          視黄経, 視黄緯, 距離（形状: M x N x 3）,
+                          視半径, 方位角（北から東回り）, 高度
+                          （形状: M x N x 3）
+                      ]
+        """
+        try:
+            if target not in ["sun", "moon"]:
+                raise ValueError("target must be 'sun' or 'moon'")
+            radius = self.asun if target == "sun" else self.am
+            if target not in self.pos_bpn:
+                self.__calc(target, radius)
+            # === 観測地点の地心直交座標（地球固定座標系, Unit: AU）
+            lats, lons, hs = np.broadcast_arrays(
+                np.atleast_1d(np.asarray(lats, dtype=np.float64)),
+                np.atleast_1d(np.asarray(lons, dtype=np.float64)),
+                np.atleast_1d(np.asarray(heights, dtype=np.float64))
+            )
+            phi, lmd = np.radians(lats), np.radians(lons)
+            r_o = lcd.geod2rect_v(phi, lmd, hs / 1000, self.re, lcst.FLAT)
+            r_o /= lcst.AU / 1000
+            # === 瞬時の真座標系: グリニッジ視恒星時による回転（形状: M x N）
+            gast = self.__get_gast()
+            c, s = np.cos(gast), np.sin(gast)
+            x = r_o[:, 0:1] * c - r_o[:, 1:2] * s
+            y = r_o[:, 0:1] * s + r_o[:, 1:2] * c
+            z = np.broadcast_to(r_o[:, 2:3], x.shape)
+            # === 観測地点から対象天体への位置ベクトル
+            pos = self.pos_bpn[target] - np.stack((x, y, z), axis=-1)
+            # === 日周光行差の補正（1 次の近似）
+            vec_v = np.stack((-y, x, np.zeros_like(x)), axis=-1) \
+                  * (lcst.OMEGA * lcst.AU / lcst.C)
+            r = np.sqrt(np.sum(pos * pos, axis=-1))[..., np.newaxis]
+            vec_d = pos / r
+            g = np.sum(vec_d * vec_v, axis=-1)[..., np.newaxis]
+            vec_d = vec_d + vec_v - g * vec_d
+            pos = vec_d / np.sqrt(np.sum(vec_d * vec_d, axis=-1))[..., np.newaxis]
+            pos *= r
+            # === 座標変換
+            eq_lmd, eq_phi, eq_r = lcd.rect2pol_v(pos)
+            ec_rect = lcd.rect_eq2ec_v(pos, self.eps)
+            ec_lmd, ec_phi, ec_r = lcd.rect2pol_v(ec_rect)
+            # === 視半径計算
+            rad = np.arcsin(radius / (eq_r * lcst.AU / 1000))
+            rad *= 180 / math.pi * 3600
+            # === 方位角・高度計算（時角 = 地方視恒星時 - 視赤経）
+            ha = gast + lmd[:, np.newaxis] - eq_lmd
+            sp, cp = np.sin(phi)[:, np.newaxis], np.cos(phi)[:, np.newaxis]
+            sd, cd = np.sin(eq_phi), np.cos(eq_phi)
+            alt = np.arcsin(sp * sd + cp * cd * np.cos(ha))
+            az = np.arctan2(-cd * np.sin(ha), sd * cp - cd * np.cos(ha) * sp)
+            az = np.mod(az, lcst.PI2)
+            return [
+                np.stack((eq_lmd, eq_phi, eq_r), axis=-1),
+                np.stack((ec_lmd, ec_phi, ec_r), axis=-1),
+                np.stack((rad, az, alt), axis=-1)
+            ]
+        except Exception as e:
+            raise
+
+    def __calc(self, target, radius):
+        """ 視位置の計算（太陽・月共通）
+
+        :param  string target: 対象天体（"sun", "moon"）
+        :param  float  radius: 対象天体の半径（Unit: km）
+        :return list         : sun(), moon() の戻り値
+        """
+        try:
+            # === 対象天体が光を発した時刻 t1(JD) の計算
+            t_1_jd = self.__calc_t1(lcst.BODIES[target], self.icrs_2[target])
+            # === 時刻 t1(= TDB) におけるの位置（ICRS 座標）の計算
+            pos_1 = self.session.states(
+                lcst.BODIES[target], 12, self.jds_1, kind=1, jds2=t_1_jd
+            )
+            # === 時刻 t2 における地球重心から時刻 t1 における対象天体への方向ベクトルの計算
+            v_12 = self.__calc_unit_vector(self.icrs_2["earth"][:, 0:3], pos_1)
+            # === GCRS 座標系: 光行差の補正（方向ベクトルの Lorentz 変換）
+            dd = self.__conv_lorentz(v_12)
+            pos = dd * self.r_e[target][:, np.newaxis]
+            # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
+            self.__set_bpn()
+            pos_bpn = lmtx.rotate_v(self.r_mtx_bpn, pos)
+            self.pos_bpn[target] = pos_bpn
+            # === 座標変換
+            eq_lmd, eq_phi, eq_r = lcd.rect2pol_v(pos_bpn)
+            ec_rect = lcd.rect_eq2ec_v(pos_bpn, self.eps)
+            ec_lmd, ec_phi, ec_r = lcd.rect2pol_v(ec_rect)
+            # === 視半径／（地平）視差計算
+            rad = np.arcsin(radius / (eq_r * lcst.AU / 1000))
+            rad *= 180 / math.pi * 3600
+            par = np.arcsin(self.re / (eq_r * lcst.AU / 1000))
+            par *= 180 / math.pi * 3600
+            return [
+                np.column_stack((eq_lmd, eq_phi, eq_r)),
+                np.column_stack((ec_lmd, ec_phi, ec_r)),
+                np.column_stack((rad, par))
+            ]
+        except Exception as e:
+            raise
+
+    def __set_bpn(self):
+        """ 平均黄道傾斜角, bias & precession & nutation 回転行列の計算
+            * 初回のみ計算し、太陽・月・惑星で共有する。
+        """
+        try:
+            if self.r_mtx_bpn is None:
+                self.eps, self.r_mtx_bpn, self.dpsi = lbpn.calc_bpn_v(
+                    ((self.jds_1 - lcst.J2000) + self.jds_2) / lcst.JC
+                )
+        except Exception as e:
+            raise
+
+    def __get_gast(self):
+        """ グリニッジ視恒星時 (GAST) の取得
+            * GAST = GMST (IAU 2006) + 分点均差。初回のみ計算する。
+            * UT1 は UTC + DUT1 とする。（TDB のユリウス日を指定した場合は、
+              time_.tdb2utc_v() で求めた近似の UTC を使用する）
+
+        :return np.ndarray gast: グリニッジ視恒星時 (Unit: rad)（N 個）
+        """
+        try:
+            if self.gast is None:
+                self.__set_bpn()
+                utcs = self.utcs
+                if utcs is None:
+                    utcs = ltm.tdb2utc_v(self.jds_1, self.jds_2)
+                jds_ut1_1, jds_ut1_2 = ltm.utc2ut1_v(utcs)
+                jcs = ((self.jds_1 - lcst.J2000) + self.jds_2) / lcst.JC
+                self.gast = ltm.ut12gmst_v(jds_ut1_1, jds_ut1_2, jcs) \
+                          + lbpn.eqeq_v(jcs, self.eps, self.dpsi)
+            return self.gast
+        except Exception as e:
+            raise
+
+    def __get_pv_2(self, k):
+        """ 時刻 t2(= TDB) における位置・速度（ICRS 座標）の取得
+            * 地球・月・太陽は icrs_2 の値、それ以外は初回のみ計算する。
+
+        :param  int          k: 天体番号
+        :return np.ndarray pv_2: 位置・速度（形状: N x 6）
+        """
+        try:
+            for name, v in lcst.BODIES.items():
+                if k == v:
+                    return self.icrs_2[name]
+            if k not in self.pvs_2:
+                self.pvs_2[k] = self.session.states(
+                    k, 12, self.jds_1, jds2=self.jds_2
+                )
+            return self.pvs_2[k]
+        except Exception as e:
+            raise
+
+    def __deflect(self, bodies, vec_p, pos_1):
+        """ 重力による光の曲がりの補正
+            * DEFLECTORS の天体毎に以下を計算する。（SOFA の iauLd, iauLdn と
+              同じ計算）
+                p' = p + w * (p x (e x q))
+                w  = m * SRS / |E| / max(q・(q + e), dlim)
+              但し、 p: 観測者から対象天体への方向, q: 光を曲げる天体から
+              対象天体への方向, e: 光を曲げる天体から観測者への方向,
+              E: 光を曲げる天体から観測者へのベクトル, m: 質量比（太陽 = 1）
+            * 光を曲げる天体の位置は、光が通過した時刻（観測時刻 - 観測者との
+              距離の p 方向成分 / c、観測者より後方の場合は観測時刻）のもの
+              とする。
+
+        :param  list        bodies: 対象天体の天体番号の一覧
+        :param  np.ndarray   vec_p: 方向(単位)ベクトル（形状: 天体数 x N x 3）
+        :param  np.ndarray   pos_1: 時刻 t1 の対象天体の位置（形状: 天体数 x N x 3）
+        :return np.ndarray   vec_p: 補正後ベクトル（形状: 天体数 x N x 3）
+        """
+        pos_e = self.icrs_2["earth"][:, 0:3]
+        cr = lcst.AU / lcst.C / lcst.DAYSEC  # 1 AU の光差（日）
+        try:
+            r_o = np.linalg.norm(pos_1 - pos_e, axis=-1)[..., np.newaxis]
+            for k, name, bm, dlim in self.DEFLECTORS:
+                if k not in self.session.bodies():
+                    continue
+                if name in self.session.consts and \
+                   "GMS" in self.session.consts:
+                    bm = self.session.consts[name] / self.session.consts["GMS"]
+                pv_d = self.__get_pv_2(k)
+                v = pos_e - pv_d[:, 0:3]
+                dt = np.minimum(np.sum(vec_p * v, axis=-1) * cr, 0.0)
+                ev = v - dt[..., np.newaxis] * pv_d[:, 3:6]
+                em = np.linalg.norm(ev, axis=-1)[..., np.newaxis]
+                e = ev / em
+                q = vec_p * r_o + ev
+                q /= np.linalg.norm(q, axis=-1)[..., np.newaxis]
+                qdqpe = np.sum(q * (q + e), axis=-1)[..., np.newaxis]
+                w = bm * lcst.SRS / em / np.maximum(qdqpe, dlim)
+                p_1 = vec_p + w * np.cross(vec_p, np.cross(e, q))
+                mask = np.array([b == k for b in bodies])
+                vec_p = np.where(mask[:, np.newaxis, np.newaxis], vec_p, p_1)
+            return vec_p
+        except Exception as e:
+            raise
+
+    def __calc_t1(self, k, pv_2):
+        """ 対象天体が光を発した時刻 t1 の計算
+            * 計算式： c * (t2 - t1) = r12  (但し、 c: 光の速度。 Newton 法で近似）
+            * Apos.__calc_t1() と同じ計算を、未収束の時刻のみについて繰り返す。
+            * t1 は観測時刻 t2（= jds_1 + jds_2）の jds_2 側に光差を加えた値で
+              扱う。
+
+        :param  int           k: 対象天体の天体番号
+        :param  np.ndarray pv_2: 時刻 t2 の対象天体の位置・速度（形状: N x 6）
+        :return np.ndarray  t_1: ユリウス日（jds_1 に加える値）（N 個）
+        """
+        t_2 = self.jds_2
+        t_1 = t_2.copy()
+        pv_e = self.icrs_2["earth"]
+        idx = np.arange(t_1.size)
+        pos_1 = pv_2[:, 0:3]
+        c = lcst.C * lcst.DAYSEC / lcst.AU
+        m = 0
+        try:
+            while idx.size > 0:
+                r_12 = pos_1 - pv_e[idx, 0:3]
+                r_12_d = np.sqrt(np.sum(r_12 * r_12, axis=1))
+                df = c * (t_2[idx] - t_1[idx]) - r_12_d
+                df_wk = np.sum(r_12 * pv_2[idx, 3:6], axis=1)
+                df /= c + df_wk / r_12_d
+                t_1[idx] += df
+                m += 1
+                if m > 10:
+                    raise Exception("[ERROR] Newton method error!")
+                idx = idx[df > 1.0e-10]
+                if idx.size > 0:
+                    pos_1 = self.session.states(
+                        k, 12, self.jds_1[idx], kind=1, jds2=t_1[idx]
+                    )
+            return t_1
+        except Exception as e:
+            raise
+
+    def __calc_unit_vector(self, pos_a, pos_b):
+        """ 天体Aから見た天体Bの方向ベクトル計算（太陽・月専用）
+            * 距離が 0 の場合は、 0 ベクトルとする。
+
+        :param   np.ndarray pos_a: 位置ベクトル(天体A)（形状: N x 3）
+        :param   np.ndarray pos_b: 位置ベクトル(天体B)（形状: N x 3。
+                                   先頭に軸を追加した形状も可）
+        :return  np.ndarray   vec: 方向(単位)ベクトル（pos_b と同じ形状）
+        """
+        try:
+            vec = pos_b - pos_a
+            w = np.sqrt(np.sum(vec * vec, axis=-1))[..., np.newaxis]
+            return np.divide(vec, w, out=np.zeros_like(vec), where=w != 0.0)
+        except Exception as e:
+            raise
+
+    def __conv_lorentz(self, vec_d):
+        """ 光行差の補正（方向ベクトルの Lorentz 変換）
+            * Apos.__conv_lorentz() と同じ計算を配列で行う。
+
+        :param  np.ndarray  v_d: 方向（単位）ベクトル（形状: N x 3。
+                                 先頭に軸を追加した形状も可）
+        :return np.ndarray v_dd: 補正後ベクトル（v_d と同じ形状）
+        """
+        try:
+            vec_v = (self.icrs_2["earth"][:, 3:6] / lcst.DAYSEC) \
+                  / (lcst.C / lcst.AU)
+            g = np.sum(vec_v * vec_d, axis=-1)[..., np.newaxis]
+            f = np.sqrt(1.0 - np.sqrt(np.sum(vec_v * vec_v, axis=1)))
+            f = f[:, np.newaxis]
+            vec_dd = vec_d * f + (1.0 + g / (1.0 + f)) * vec_v
+            return vec_dd / (1.0 + g)
+        except Exception as e:
+            raise
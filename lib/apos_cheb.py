@@ -0,0 +1,273 @@
+"""
+Modules for apparent longitude of Sun/Moon (Chebyshev approximation).
+
+* 太陽・月の視黄経（apos.Apos の sun_lambda(), moon_lambda() の値）を、
+  区間毎のチェビシェフ多項式で近似したファイルを作成し（build()）、
+  多項式の計算のみで視黄経を求める（AposCheb）。
+  - 時刻は TDB のユリウス日とし、開始ユリウス日から天体毎に一定の日数
+    （SPANS）の区間に分割する。
+  - 各区間の係数は、区間内の Chebyshev 点（第 1 種, 次数 + 1 個）における
+    視黄経（区間内で連続になるよう 2π の整数倍を加えたもの）の補間多項式の
+    係数とする。視黄経は apos_batch.AposBatch で全時刻をまとめて計算する。
+    （Apos の値との差は 1e-12 rad 程度）
+  - 作成時に、各区間の両端と Chebyshev 点の中間の時刻で AposBatch の値と
+    比較し、差の絶対値の最大値を誤差の上限としてファイルに記録する。
+    （verify() では Apos の値と比較する）
+* ファイルは NumPy の npz 形式で、天体（"sun", "moon"）毎に以下を保持する。
+  - <天体>_jd   : [開始ユリウス日, 区間の日数]
+  - <天体>_coeff: 係数（形状: 区間数 x (次数 + 1)）
+  - <天体>_err  : 誤差の上限 (Unit: rad)
+"""
+import math
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import apos       as lapos
+import apos_batch as lab
+import const      as lcst
+import eph_jpl    as ljpl
+
+SPANS = {"sun": 16.0, "moon": 8.0}  # 区間の日数
+DEGS  = {"sun": 13,   "moon": 20}   # 多項式の次数
+CHUNK = 2048                        # AposBatch 1 回で計算する区間数
+
+
+def build(file_bin, file_out, jd_s, jd_e, spans=SPANS, degs=DEGS):
+    """ 視黄経のチェビシェフ近似ファイルの作成
+
+    :param  string file_bin: バイナリファイル（JPLEPH）のフルパス
+    :param  string file_out: 出力ファイルのフルパス
+    :param  float      jd_s: 開始ユリウス日 (for TDB)
+    :param  float      jd_e: 終了ユリウス日 (for TDB)
+    :param  dict      spans: 天体 => 区間の日数
+    :param  dict       degs: 天体 => 多項式の次数
+    :return dict       errs: 天体 => 誤差の上限 (Unit: rad)
+    """
+    data, errs = {}, {}
+    try:
+        session = ljpl.get_session(file_bin)
+        for target in ["sun", "moon"]:
+            span, deg = spans[target], degs[target]
+            n_seg = int(math.ceil((jd_e - jd_s) / span))
+            coeffs, err = [], 0.0
+            for i in range(0, n_seg, CHUNK):
+                jds_0 = jd_s + span * np.arange(i, min(i + CHUNK, n_seg))
+                c, e = fit(file_bin, session, target, jds_0, span, deg)
+                coeffs.append(c)
+                err = max(err, e)
+            data[target + "_jd"] = np.array([jd_s, span])
+            data[target + "_coeff"] = np.concatenate(coeffs)
+            data[target + "_err"] = np.array(err)
+            errs[target] = err
+        with open(file_out, "wb") as f:
+            np.savez(f, **data)
+        return errs
+    except Exception as e:
+        raise
+
+def fit(file_bin, session, target, jds_0, span, deg):
+    """ 区間毎のチェビシェフ多項式の係数の計算
+        * Chebyshev 点 x_k = cos(π(k + 1/2) / n)（n = 次数 + 1）の値から、
+            c_j = (2 / n) Σ f(x_k) cos(jπ(k + 1/2) / n)（c_0 は 1/2 倍）
+          で求める。
+        * 区間の両端と Chebyshev 点の中間の時刻で、視黄経との差を求める。
+
+    :param  string        file_bin: バイナリファイルのフルパス
+    :param  EphJplSession  session: 使用する EphJplSession
+    :param  string          target: 対象天体（"sun", "moon"）
+    :param  np.ndarray       jds_0: 区間の開始ユリウス日（区間数）
+    :param  float             span: 区間の日数
+    :param  int                deg: 多項式の次数
+    :return np.ndarray      coeffs: 係数（形状: 区間数 x (次数 + 1)）
+    :return float              err: 差の絶対値の最大値 (Unit: rad)
+    """
+    n = deg + 1
+    try:
+        # === Chebyshev 点の視黄経
+        th = math.pi * (np.arange(n) + 0.5) / n
+        lmds = calc_lambda(file_bin, session, target, jds_0, span, np.cos(th))
+        base = lmds[:, 0:1]
+        coeffs = (lmds - base) @ np.cos(np.outer(th, np.arange(n))) * (2 / n)
+        coeffs[:, 0] /= 2
+        coeffs[:, 0] += base[:, 0]
+        # === 区間の両端と Chebyshev 点の中間の視黄経との比較
+        xs = np.cos(math.pi * np.arange(n + 1) / n)
+        lmds = calc_lambda(file_bin, session, target, jds_0, span, xs)
+        diff = evaluate(coeffs, np.broadcast_to(xs, lmds.shape)) - lmds
+        diff = (diff + math.pi) % lcst.PI2 - math.pi
+        return coeffs, float(np.abs(diff).max())
+    except Exception as e:
+        raise
+
+def calc_lambda(file_bin, session, target, jds_0, span, xs):
+    """ 区間内の時刻の視黄経の計算（区間内で連続な値）
+
+    :param  string        file_bin: バイナリファイルのフルパス
+    :param  EphJplSession  session: 使用する EphJplSession
+    :param  string          target: 対象天体（"sun", "moon"）
+    :param  np.ndarray       jds_0: 区間の開始ユリウス日（区間数）
+    :param  float             span: 区間の日数
+    :param  np.ndarray          xs: 区間内の位置（-1 <= x <= 1）（m 個）
+    :return np.ndarray        lmds: 視黄経 (Unit: rad)（形状: 区間数 x m）
+    """
+    try:
+        jds_1 = np.repeat(jds_0, xs.size)
+        jds_2 = np.tile((xs + 1.0) * (span / 2), jds_0.size)
+        o = lab.AposBatch(file_bin, session=session, jds_tdb=[jds_1, jds_2])
+        lmds = (o.sun() if target == "sun" else o.moon())[1][:, 0]
+        return np.unwrap(lmds.reshape(jds_0.size, xs.size), axis=1)
+    except Exception as e:
+        raise
+
+def evaluate(coeffs, xs):
+    """ チェビシェフ多項式の計算（Clenshaw 法）
+
+    :param  np.ndarray coeffs: 係数（形状: N x (次数 + 1)）
+    :param  np.ndarray     xs: 区間内の位置（-1 <= x <= 1）（形状: N または N x m）
+    :return np.ndarray       : 値（xs と同じ形状）
+    """
+    try:
+        c = coeffs if np.ndim(xs) == 1 else coeffs[:, np.newaxis, :]
+        b_1, b_2 = np.zeros_like(xs), np.zeros_like(xs)
+        for j in range(coeffs.shape[-1] - 1, 0, -1):
+            b_1, b_2 = 2.0 * xs * b_1 - b_2 + c[..., j], b_1
+        return xs * b_1 - b_2 + c[..., 0]
+    except Exception as e:
+        raise
+
+def verify(file_bin, file_cheb, n_sample=200):
+    """ 作成したファイルの検証
+        * 期間内のランダムなユリウス日で Apos の sun_lambda(), moon_lambda() と
+          比較し、天体毎の差の絶対値の最大値を返す。
+
+    :param  string  file_bin: バイナリファイル（JPLEPH）のフルパス
+    :param  string file_cheb: チェビシェフ近似ファイルのフルパス
+    :param  int     n_sample: 比較するユリウス日の数
+    :return dict       diffs: 天体 => 差の絶対値の最大値 (Unit: rad)
+    """
+    diffs = {"sun": 0.0, "moon": 0.0}
+    try:
+        cheb = AposCheb(file_cheb)
+        session = ljpl.get_session(file_bin)
+        jd_s, jd_e = cheb.range()
+        for jd in np.random.uniform(jd_s, jd_e, n_sample):
+            jd_2 = [math.floor(jd), jd - math.floor(jd)]
+            o = lapos.Apos(file_bin, session=session, jd_tdb=jd_2)
+            for target, lmd in [
+                ("sun", o.sun_lambda()), ("moon", o.moon_lambda())
+            ]:
+                diff = cheb.calc_lambda(target, jd_2) - lmd
+                diff = abs((diff + math.pi) % lcst.PI2 - math.pi)
+                diffs[target] = max(diffs[target], diff)
+        return diffs
+    except Exception as e:
+        raise
+
+
+class AposCheb:
+    def __init__(self, file_cheb):
+        """ Initialization
+            * build() で作成したファイルを読み込む。
+
+        :param string file_cheb: チェビシェフ近似ファイルのフルパス
+        """
+        self.file_cheb = file_cheb
+        self.jd, self.coeff, self.err = {}, {}, {}
+        with np.load(file_cheb) as data:
+            for target in ["sun", "moon"]:
+                self.jd[target] = data[target + "_jd"].tolist()
+                self.coeff[target] = data[target + "_coeff"]
+                self.err[target] = float(data[target + "_err"])
+
+    def sun_lambda(self, jd_tdb):
+        """ Computation of Sun apparent longitude
+
+        :param  float/list/np.ndarray jd_tdb: TDB のユリウス日
+                                              （2 つの値の和 [jd_1, jd_2] も可）
+        :return float/np.ndarray            : 視黄経 (Unit: rad)
+        """
+        try:
+            return self.calc_lambda("sun", jd_tdb)
+        except Exception as e:
+            raise
+
+    def moon_lambda(self, jd_tdb):
+        """ Computation of Moon apparent longitude
+
+        :param  float/list/np.ndarray jd_tdb: TDB のユリウス日
+                                              （2 つの値の和 [jd_1, jd_2] も可）
+        :return float/np.ndarray            : 視黄経 (Unit: rad)
+        """
+        try:
+            return self.calc_lambda("moon", jd_tdb)
+        except Exception as e:
+            raise
+
+    def range(self):
+        """ 計算可能な期間（太陽・月共通）
+
+        :return list: [開始ユリウス日, 終了ユリウス日]
+        """
+        try:
+            return [
+                max(self.jd[k][0] for k in self.jd),
+                min(self.jd[k][0] + self.jd[k][1] * len(self.coeff[k])
+                    for k in self.jd)
+            ]
+        except Exception as e:
+            raise
+
+    def calc_lambda(self, target, jd_tdb):
+        """ 視黄経の計算（太陽・月共通）
+            * 期間外のユリウス日の場合は ValueError とする。
+
+        :param  string                target: 対象天体（"sun", "moon"）
+        :param  float/list/np.ndarray jd_tdb: TDB のユリウス日
+                                              （2 つの値の和 [jd_1, jd_2] も可）
+        :return float/np.ndarray            : 視黄経 (Unit: rad)
+        """
+        try:
+            jd_0, span = self.jd[target]
+            coeff = self.coeff[target]
+            if isinstance(jd_tdb, (list, tuple)) and len(jd_tdb) == 2:
+                jd_1, jd_2 = jd_tdb
+            else:
+                jd_1, jd_2 = jd_tdb, 0.0
+            if np.ndim(jd_1) == 0 and np.ndim(jd_2) == 0:
+                # === 1 時刻の場合は、配列を生成せずに計算する
+                t = (float(jd_1) - jd_0) + float(jd_2)
+                idx = int(t // span)
+                self.__check_range(target, 0 <= idx < len(coeff))
+                x = (t - idx * span) * (2 / span) - 1.0
+                c = coeff[idx].tolist()
+                b_1, b_2 = 0.0, 0.0
+                for a in c[:0:-1]:
+                    b_1, b_2 = 2.0 * x * b_1 - b_2 + a, b_1
+                return (x * b_1 - b_2 + c[0]) % lcst.PI2
+            t = (np.asarray(jd_1, dtype=np.float64) - jd_0) \
+              + np.asarray(jd_2, dtype=np.float64)
+            idx = np.floor(t / span)
+            self.__check_range(
+                target, np.all(idx >= 0) and np.all(idx < len(coeff))
+            )
+            xs = (t - idx * span) * (2 / span) - 1.0
+            return evaluate(coeff[idx.astype(np.int64)], xs) % lcst.PI2
+        except Exception as e:
+            raise
+
+    def __check_range(self, target, ok):
+        """ ユリウス日の範囲チェック
+            * 期間外の場合は ValueError とする。
+
+        :param string target: 対象天体（"sun", "moon"）
+        :param bool       ok: 期間内か否か
+        """
+        try:
+            if not ok:
+                jd_0, span = self.jd[target]
+                raise ValueError("Please input JD s.t. {} <= JD < {}.".format(
+                    jd_0, jd_0 + span * len(self.coeff[target])
+                ))
+        except Exception as e:
+            raise
@@ -0,0 +1,238 @@
+"""
+Class for apparent place of stars (catalog).
+
+* 恒星カタログ（CSV ファイル）を列毎の配列（StarCatalog）に読み込み、
+  1 つの時刻の視位置を全恒星まとめて配列演算で計算する。
+  - 空間運動（固有運動・視線速度）・年周視差: SOFA の iauPmpx と同じ計算。
+    （観測者の位置は EphJplSession で計算した時刻 t の地球（太陽系重心基準））
+  - 太陽の重力による光の曲がり: SOFA の iauLdsun と同じ計算。
+  - 光行差: apos.Apos と同じ Lorentz 変換（時刻 t の地球の速度）。
+  - bias & precession & nutation: eph_bpn.calc_bpn() の回転行列 1 個を
+    全恒星に適用する。
+* カタログの形式（CSV, 1 行目は列名, "#" で始まる行は無視）
+  - id      : 識別子（文字列）
+  - ra, dec : 元期の赤経・赤緯（ICRS） (Unit: 度)（必須）
+  - pmra    : 赤経方向の固有運動（μα* = μα cosδ） (Unit: mas/year)
+  - pmdec   : 赤緯方向の固有運動 (Unit: mas/year)
+  - parallax: 年周視差 (Unit: mas)
+  - rv      : 視線速度 (Unit: km/s)
+  - mag     : 等級
+  （ra, dec 以外の列は省略可。空欄・省略時は 0（mag は nan）とする）
+* 結果は np.ndarray で返す。（各行が 1 恒星分）
+"""
+import collections
+import csv
+import math
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import const   as lcst
+import coord   as lcd
+import eph_bpn as lbpn
+import eph_jpl as ljpl
+import matrix  as lmtx
+import time_   as ltm
+
+# 恒星カタログ（列毎の配列。 epoch は元期（TDB のユリウス日））
+StarCatalog = collections.namedtuple(
+    "StarCatalog",
+    ["ids", "ra", "dec", "pmra", "pmdec", "parallax", "rv", "mag", "epoch"]
+)
+
+
+def load_catalog(file_cat, epoch=lcst.J2000):
+    """ 恒星カタログ（CSV ファイル）の読み込み
+        * 列名は大文字・小文字を区別しない。
+        * ra, dec の列が無い場合、列数が 1 行目より少ない行がある場合は
+          ValueError とする。（ファイル名・行番号を示す）
+
+    :param  string  file_cat: カタログファイルのフルパス
+    :param  float      epoch: 元期（TDB のユリウス日, 省略時は J2000.0）
+                              （例: Hipparcos は 2448349.0625,
+                                    Gaia DR3 は 2457389.0）
+    :return StarCatalog    c: 恒星カタログ
+    """
+    cols = ["ra", "dec", "pmra", "pmdec", "parallax", "rv", "mag"]
+    ids, vals = [], {k: [] for k in cols}
+    try:
+        with open(file_cat, newline="") as f:
+            lines = [
+                (i, l) for i, l in enumerate(f, 1)
+                if l.strip() != "" and not l.startswith("#")
+            ]
+            reader = csv.reader(l for _, l in lines)
+            names = [n.strip().lower() for n in next(reader, [])]
+            if "ra" not in names or "dec" not in names:
+                raise ValueError(
+                    "Columns 'ra' and 'dec' are required. ({})".format(file_cat)
+                )
+            idxs = {k: names.index(k) for k in cols if k in names}
+            idx_id = names.index("id") if "id" in names else None
+            for (i, _), row in zip(lines[1:], reader):
+                if len(row) < len(names):
+                    raise ValueError(
+                        "Too few columns ({} < {}) at line {}. ({})".format(
+                            len(row), len(names), i, file_cat
+                        )
+                    )
+                ids.append(
+                    row[idx_id].strip() if idx_id is not None
+                    else str(len(ids) + 1)
+                )
+                for k in cols:
+                    v = row[idxs[k]].strip() if k in idxs else ""
+                    vals[k].append(
+                        float(v) if v != "" else
+                        (math.nan if k == "mag" else 0.0)
+                    )
+        arrs = {k: np.array(v, dtype=np.float64) for k, v in vals.items()}
+        return StarCatalog(ids=np.array(ids), epoch=float(epoch), **arrs)
+    except Exception as e:
+        raise
+
+
+class AposStar:
+    def __init__(self, file_bin, utc=None, session=None, jd_tdb=None):
+        """ Initialization
+            * 時刻 t の地球・太陽の位置・速度は state_all() で 1 回の係数取得で
+              計算する。
+            * utc は time_.utc2tdb_2() で TDB のユリウス日（2 つの値の和）に
+              変換する。 utc の代わりに TDB のユリウス日（jd_tdb, 2 つの値の和
+              [jd_1, jd_2] も可）を指定できる。
+
+        :param string            file_bin: バイナリファイルのフルパス
+        :param datetime               utc: UTC（協定世界時）
+        :param EphJplSession      session: 使用する EphJplSession（省略可）
+        :param float/list          jd_tdb: TDB のユリウス日（utc の代わりに指定）
+        """
+        self.file_bin = file_bin
+        self.utc = utc
+        self.session = session
+        if self.session is None:
+            self.session = ljpl.get_session(self.file_bin)
+        if jd_tdb is None:
+            self.jd_tdb_2 = ltm.utc2tdb_2(utc)
+        elif isinstance(jd_tdb, (list, tuple)):
+            self.jd_tdb_2 = [float(jd_tdb[0]), float(jd_tdb[1])]
+        else:
+            self.jd_tdb_2 = [float(jd_tdb), 0.0]
+        self.jd_tdb = self.jd_tdb_2[0] + self.jd_tdb_2[1]
+        # === 時刻 t(= TDB) における地球・太陽の位置・速度（ICRS 座標）
+        pvs = self.session.state_all(
+            self.jd_tdb_2[0], [lcst.BODIES["earth"], lcst.BODIES["sun"]],
+            jd2=self.jd_tdb_2[1]
+        )
+        self.pv_e = np.asarray(pvs[lcst.BODIES["earth"]], dtype=np.float64)
+        self.pv_s = np.asarray(pvs[lcst.BODIES["sun"]], dtype=np.float64)
+        # === 平均黄道傾斜角, bias & precession & nutation 回転行列（全恒星で共有）
+        self.eps, self.r_mtx_bpn = lbpn.calc_bpn(self.jd_tdb)
+
+    def stars(self, cat, deflect=True):
+        """ Computation of star positions
+            * 空間運動・年周視差、光の曲がり、光行差、 bias & precession &
+              nutation を全恒星まとめて計算する。
+
+        :param  StarCatalog cat: 恒星カタログ（load_catalog() の戻り値）
+        :param  bool    deflect: 太陽の重力による光の曲がりの補正
+                                 （True: 行う, False: 行わない）
+        :return list: [
+                          視赤経, 視赤緯（形状: 恒星数 x 2）,
+                          視黄経, 視黄緯（形状: 恒星数 x 2）
+                      ]
+        """
+        try:
+            # === 空間運動・年周視差の補正（時刻 t の地球から見た方向）
+            vec_p = self.__pmpx(cat)
+            # === 太陽の重力による光の曲がりの補正
+            if deflect:
+                vec_p = self.__deflect_sun(vec_p)
+            # === GCRS 座標系: 光行差の補正（方向ベクトルの Lorentz 変換）
+            dd = self.__conv_lorentz(vec_p)
+            # === 瞬時の真座標系: GCRS への bias & precession（歳差） & nutation（章動）の適用
+            pos_bpn = lmtx.rotate_v(self.r_mtx_bpn, dd)
+            # === 座標変換
+            eq_lmd, eq_phi, _ = lcd.rect2pol_v(pos_bpn)
+            ec_rect = lmtx.rotate_v(lmtx.r_x(self.eps), pos_bpn)
+            ec_lmd, ec_phi, _ = lcd.rect2pol_v(ec_rect)
+            return [
+                np.column_stack((eq_lmd, eq_phi)),
+                np.column_stack((ec_lmd, ec_phi))
+            ]
+        except Exception as e:
+            raise
+
+    def __pmpx(self, cat):
+        """ 空間運動・年周視差の補正
+            * SOFA の iauPmpx と同じ計算。
+              （元期からの経過時間は、光が太陽系重心から地球まで進む時間
+                （Rømer 遅延）も考慮する）
+            * 年周視差が 0 以下の恒星は、視差・視線速度による補正を行わない。
+
+        :param  StarCatalog   cat: 恒星カタログ
+        :return np.ndarray  vec_p: 方向(単位)ベクトル（形状: 恒星数 x 3）
+        """
+        pos_e = self.pv_e[0:3]
+        vf = lcst.DAYSEC * 365.25 / (lcst.AU / 1000)  # km/s -> AU/year
+        aulty = lcst.AU / lcst.C / lcst.DAYSEC / 365.25  # 1 AU の光差（年）
+        try:
+            ra, dec = np.radians(cat.ra), np.radians(cat.dec)
+            sr, cr = np.sin(ra), np.cos(ra)
+            sd, cd = np.sin(dec), np.cos(dec)
+            x, y, z = cr * cd, sr * cd, sd
+            pr = np.divide(
+                cat.pmra * lcst.MAS2R, cd,
+                out=np.zeros_like(cd), where=cd != 0.0
+            )
+            pd = cat.pmdec * lcst.MAS2R
+            pxr = np.where(cat.parallax > 0.0, cat.parallax * lcst.MAS2R, 0.0)
+            w = vf * cat.rv * pxr
+            dt = ((self.jd_tdb_2[0] - cat.epoch) + self.jd_tdb_2[1]) / 365.25
+            dt = dt + (x * pos_e[0] + y * pos_e[1] + z * pos_e[2]) * aulty
+            pdz = pd * z
+            vec_p = np.column_stack((
+                x + dt * (-pr * y - pdz * cr + w * x) - pxr * pos_e[0],
+                y + dt * ( pr * x - pdz * sr + w * y) - pxr * pos_e[1],
+                z + dt * ( pd * cd           + w * z) - pxr * pos_e[2]
+            ))
+            return vec_p / np.linalg.norm(vec_p, axis=1)[:, np.newaxis]
+        except Exception as e:
+            raise
+
+    def __deflect_sun(self, vec_p):
+        """ 太陽の重力による光の曲がりの補正
+            * SOFA の iauLdsun と同じ計算。（恒星は無限遠とし、 q = p）
+                p' = p + w * (p x (e x p))
+                w  = SRS / |E| / max(p・(p + e), dlim)
+              但し、 p: 観測者から恒星への方向, e: 太陽から観測者への方向,
+              E: 太陽から観測者へのベクトル, dlim = 1e-6 / max(|E|^2, 1)
+
+        :param  np.ndarray vec_p: 方向(単位)ベクトル（形状: 恒星数 x 3）
+        :return np.ndarray vec_p: 補正後ベクトル（形状: 恒星数 x 3）
+        """
+        try:
+            v = self.pv_e[0:3] - self.pv_s[0:3]
+            em = math.sqrt(np.dot(v, v))
+            e = v / em
+            dlim = 1.0e-6 / max(em * em, 1.0)
+            qdqpe = np.sum(vec_p * (vec_p + e), axis=1)[:, np.newaxis]
+            w = lcst.SRS / em / np.maximum(qdqpe, dlim)
+            return vec_p + w * np.cross(vec_p, np.cross(e, vec_p))
+        except Exception as e:
+            raise
+
+    def __conv_lorentz(self, vec_d):
+        """ 光行差の補正（方向ベクトルの Lorentz 変換）
+            * Apos.__conv_lorentz() と同じ計算を配列で行う。
+
+        :param  np.ndarray  v_d: 方向（単位）ベクトル（形状: 恒星数 x 3）
+        :return np.ndarray v_dd: 補正後ベクトル（形状: 恒星数 x 3）
+        """
+        try:
+            vec_v = (self.pv_e[3:6] / lcst.DAYSEC) / (lcst.C / lcst.AU)
+            g = (vec_d @ vec_v)[:, np.newaxis]
+            f = math.sqrt(1.0 - math.sqrt(np.dot(vec_v, vec_v)))
+            vec_dd = vec_d * f + (1.0 + g / (1.0 + f)) * vec_v
+            return vec_dd / (1.0 + g)
+        except Exception as e:
+            raise
@@ -9,6 +9,7 @@ import sys
 import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import apos           as lapos
+import apos_cheb      as lcheb
 import const          as lcst
 import const_saku     as lsak
 import const_sekki_24 as ls24
@@ -16,11 +17,18 @@ import time_          as ltm
 
 
 class Calendar:
-    def __init__(self, bin_path, jst):
+    APOS_SIZE = 8  # 保持する Apos の件数
+
+    def __init__(self, bin_path, jst, cheb_path=None):
         """ Initialization
+            * cheb_path（apos_cheb.build() で作成したファイル）を指定した場合は、
+              視黄経（太陽・月）を Apos の代わりに AposCheb で計算する。
+              （ファイルの期間外の時刻は Apos で計算する）
 
-        :param string file_bin: バイナリファイルのフルパス
-        :param datetime    jst: JST（日本標準時）
+        :param string  file_bin: バイナリファイルのフルパス
+        :param datetime     jst: JST（日本標準時）
+        :param string cheb_path: 視黄経のチェビシェフ近似ファイルのフルパス
+                                 （省略可）
         """
         self.bin_path = bin_path
         self.jst    = jst
@@ -30,6 +38,8 @@ class Calendar:
         self.day    = jst.day
         self.jd     = ltm.gc2jd(self.utc)
         self.jd_jst = self.jd + lcst.JST_D
+        self.apos   = {}  # UTC => Apos（同じ時刻の視位置計算で共有）
+        self.cheb   = None if cheb_path is None else lcheb.AposCheb(cheb_path)
 
     def yobi(self, jst=None):
         """ 曜日計算
@@ -166,6 +176,22 @@ class Calendar:
         except Exception as e:
             raise
 
+    def kokei_sun_moon(self, jst=None):
+        """ 視黄経（太陽・月）計算
+            * 太陽・月で章動・歳差等の計算を共有する。
+
+        :param  datetime jst: JST（日本標準時）(optional)
+        :return list        : [視黄経（太陽）, 視黄経（月）] (単位: deg)
+        """
+        try:
+            if jst is None:
+                utc = self.utc
+            else:
+                utc = jst - timedelta(hours=9)
+            return self.__comp_kokei_sun_moon(utc)
+        except Exception as e:
+            raise
+
     def moonage(self, jst=None):
         """ 月齢（正午）計算
 
@@ -859,8 +885,11 @@ class Calendar:
         :return float kokei_sun: 太陽視黄経
         """
         try:
-            o = lapos.Apos(self.bin_path, utc)
-            kokei_sun  = o.sun()[1][0] * 180.0 / math.pi
+            jd_tdb = self.__get_cheb_jd(utc)
+            if jd_tdb is not None:
+                return self.cheb.sun_lambda(jd_tdb) * 180.0 / math.pi
+            o = self.__get_apos(utc)
+            kokei_sun  = o.sun_lambda() * 180.0 / math.pi
             return kokei_sun
         except Exception as e:
             raise
@@ -872,9 +901,69 @@ class Calendar:
         :return float kokei_moon: 月視黄経
         """
         try:
-            o = lapos.Apos(self.bin_path, utc)
-            kokei_moon = o.moon()[1][0] * 180.0 / math.pi
+            jd_tdb = self.__get_cheb_jd(utc)
+            if jd_tdb is not None:
+                return self.cheb.moon_lambda(jd_tdb) * 180.0 / math.pi
+            o = self.__get_apos(utc)
+            kokei_moon = o.moon_lambda() * 180.0 / math.pi
             return kokei_moon
         except Exception as e:
             raise
 
+    def __comp_kokei_sun_moon(self, utc):
+        """ 太陽・月視黄経計算
+
+        :param  datetime utc: UTC（協定世界時）
+        :return list        : [太陽視黄経, 月視黄経]
+        """
+        try:
+            jd_tdb = self.__get_cheb_jd(utc)
+            if jd_tdb is not None:
+                return [
+                    self.cheb.sun_lambda(jd_tdb)  * 180.0 / math.pi,
+                    self.cheb.moon_lambda(jd_tdb) * 180.0 / math.pi
+                ]
+            o = self.__get_apos(utc)
+            return [
+                o.sun_lambda()  * 180.0 / math.pi,
+                o.moon_lambda() * 180.0 / math.pi
+            ]
+        except Exception as e:
+            raise
+
+    def __get_cheb_jd(self, utc):
+        """ AposCheb で計算する場合の TDB のユリウス日の取得
+
+        :param  datetime utc: UTC（協定世界時）
+        :return list        : TDB のユリウス日（2 つの値の和 [jd_1, jd_2]）
+                              （AposCheb を使用しない場合、期間外の場合は None）
+        """
+        try:
+            if self.cheb is None:
+                return None
+            jd_tdb = ltm.utc2tdb_2(utc)
+            jd_s, jd_e = self.cheb.range()
+            if not jd_s <= jd_tdb[0] + jd_tdb[1] < jd_e:
+                return None
+            return jd_tdb
+        except Exception as e:
+            raise
+
+    def __get_apos(self, utc):
+        """ Apos（視位置計算）の取得
+            * 同じ UTC の Apos は再利用する。（地球の位置・速度、章動等の
+              計算を共有する）
+            * 保持する件数は APOS_SIZE 件までとし、古いものから破棄する。
+
+        :param  datetime utc: UTC（協定世界時）
+        :return Apos
+        """
+        try:
+            if utc not in self.apos:
+                if len(self.apos) >= self.APOS_SIZE:
+                    del self.apos[next(iter(self.apos))]
+                self.apos[utc] = lapos.Apos(self.bin_path, utc)
+            return self.apos[utc]
+        except Exception as e:
+            raise
+
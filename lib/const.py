@@ -24,6 +24,9 @@ D2S    = 3600                                 # Degrees to seconds
 BODIES = {"earth": 3, "moon": 10, "sun": 11}  # 天体名と JPL での天体番号
 AU     = 149597870700                         # 1天文単位 (m)
 C      = 299792458                            # 光速 (m/s)
+SRS    = 1.97412574336e-8                     # 太陽のシュバルツシルト半径 (AU)
+FLAT   = 1 / 298.25642                        # 地球の扁平率 (IERS 2003)
+OMEGA  = 7.292115e-5                          # 地球の自転角速度 (rad/s)
 YOBI   = ["日", "月", "火", "水", "木", "金", "土"]
 ROKUYO = ["大安", "赤口", "先勝", "友引", "先負", "仏滅"]
 # 「国民の祝日に関する法律 (祝日法)」の施行は 1948年7月20日
@@ -102,3 +102,59 @@ def pol2rect(pol, r):
     except Exception as e:
         raise
 
+
+def rect_eq2ec_v(rects, eps):
+    """ 直交座標：赤道座標 -> 黄道座標（複数）
+        * rect_eq2ec() の配列版。
+
+    :param  np.ndarray rects: 赤道直交座標（形状: N x 3。先頭に軸を追加した形状も可）
+    :param  np.ndarray   eps: 黄道傾斜角 (Unit: rad)（N 個）
+    :return np.ndarray      : 黄道直交座標（形状: N x 3）
+    """
+    try:
+        return lmtx.rotate_v(lmtx.r_x_v(eps), rects)
+    except Exception as e:
+        raise
+
+def rect2pol_v(rects):
+    """ 直交座標 -> 極座標（複数）
+        * rect2pol() の配列版。
+
+    :param  np.ndarray rects: 直交座標（形状: N x 3。先頭に軸を追加した形状も可）
+    :return np.ndarray   lmd: λ（0 <= λ < 2π）（N 個）
+    :return np.ndarray   phi: φ（N 個）
+    :return np.ndarray     d: 距離（N 個）
+    """
+    try:
+        x, y, z = rects[..., 0], rects[..., 1], rects[..., 2]
+        r = np.sqrt(x * x + y * y)
+        lmd = np.arctan2(y, x)
+        phi = np.arctan2(z, r)
+        lmd = np.where(lmd < 0, lmd % (math.pi * 2), lmd)
+        d = np.sqrt(x * x + y * y + z * z)
+        return lmd, phi, d
+    except Exception as e:
+        raise
+
+def geod2rect_v(lats, lons, hs, a, f):
+    """ 測地座標（緯度・経度・楕円体高） -> 地心直交座標（複数）
+        * 回転楕円体（赤道半径 a, 扁平率 f）上の測地緯度・経度による。
+
+    :param  np.ndarray lats: 測地緯度 (Unit: rad)（M 個）
+    :param  np.ndarray lons: 経度（東経を正） (Unit: rad)（M 個）
+    :param  np.ndarray   hs: 楕円体高（a と同じ単位）（M 個）
+    :param  float         a: 赤道半径
+    :param  float         f: 扁平率
+    :return np.ndarray     : 地心直交座標（a と同じ単位）（形状: M x 3）
+    """
+    try:
+        e2 = f * (2.0 - f)
+        sp, cp = np.sin(lats), np.cos(lats)
+        n = a / np.sqrt(1.0 - e2 * sp * sp)
+        return np.stack((
+            (n + hs) * cp * np.cos(lons),
+            (n + hs) * cp * np.sin(lons),
+            (n * (1.0 - e2) + hs) * sp
+        ), axis=-1)
+    except Exception as e:
+        raise
@@ -6,6 +6,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import const    as lcst
+import fundamental_argument as lfa
 import matrix   as lmtx
 import nutation as lnut
 import time_    as ltm
@@ -13,8 +14,8 @@ import time_    as ltm
 
 class EphBpn:
     def __init__(self, tt):
-        self.tt = tt                              # TT(地球時)
-        self.jd  = ltm.gc2jd(self.tt)             # TT -> JD(ユリウス日)
+        self.tt = tt                              # TT(地球時)（datetime またはユリウス日）
+        self.jd  = self.__get_jd(self.tt)         # TT -> JD(ユリウス日)
         self.jc  = ltm.jd2jc(self.jd)             # JD -> JC(ユリウス世紀数)
         self.eps = self.__obliquity(self.jc)      # 平均黄道傾斜角
         self.dpsi, self.deps = self.__nutation()  # 章動
@@ -97,43 +98,38 @@ class EphBpn:
         except Exception as e:
             raise
 
+    def __get_jd(self, tt):
+        """ TT -> JD(ユリウス日)
+            * ユリウス日（float）が指定された場合は、そのまま使用する。
+
+        :param  datetime/float tt: 地球時（datetime またはユリウス日）
+        :return float          jd: ユリウス日
+        """
+        try:
+            if isinstance(tt, (int, float)):
+                return tt
+            return ltm.gc2jd(tt)
+        except Exception as e:
+            raise
+
     def __obliquity(self, jc):
-        """ 黄道傾斜角計算
-            * 黄道傾斜角 ε （単位: rad）を計算する。
-              以下の計算式により求める。
-                ε = 84381.406 - 46.836769 * T - 0.0001831 T^2 + 0.00200340 T^3
-                  - 5.76 * 10^(-7) * T^4 - 4.34 * 10^(-8) * T^5
-              ここで、 T は J2000.0 からの経過時間を 36525 日単位で表したユリウス
-              世紀数で、 T = (JD - 2451545) / 36525 である。
+        """ 黄道傾斜角計算（obliquity() を使用）
 
         :param  float  jc: ユリウス世紀数
         :return float    : 平均黄道傾斜角
         """
         try:
-            return (84381.406      \
-                 + (  -46.836769   \
-                 + (   -0.0001831  \
-                 + (    0.00200340 \
-                 + (   -5.76e-7    \
-                 + (   -4.34e-8 )  \
-                 * jc) * jc) * jc) * jc) * jc) * lcst.AS2R
+            return obliquity(jc)
         except Exception as e:
             raise
 
     def __nutation(self):
-        """ 章動計算
+        """ 章動計算（nutation() を使用）
 
         :return list [dpsi, deps]: Δψ, Δε
         """
         try:
-            nut = lnut.Nutation(self.jc)
-            fj2 = -2.7774e-6 * self.jc
-            dpsi_ls, deps_ls = nut.calc_lunisolar()
-            dpsi_pl, deps_pl = nut.calc_planetary()
-            dpsi, deps = dpsi_ls + dpsi_pl, deps_ls + deps_pl
-            dpsi += dpsi * (0.4697e-6 + fj2)
-            deps += deps * fj2
-            return [dpsi, deps]
+            return nutation(self.jc)
         except Exception as e:
             raise
 
@@ -192,14 +188,7 @@ class EphBpn:
         :return np.matrix r: 変換行列
         """
         try:
-            gam = self.__gamma_bp()
-            phi = self.__phi_bp()
-            psi = self.__psi_bp()
-            r = lmtx.r_z(gam)
-            r = lmtx.r_x(phi, r)
-            r = lmtx.r_z(-psi - self.dpsi, r)
-            r = lmtx.r_x(-self.eps - self.deps, r)
-            return r
+            return r_mtx_bpn(self.jc, self.eps, self.dpsi, self.deps)
         except Exception as e:
             raise
 
@@ -320,53 +309,205 @@ class EphBpn:
             raise
 
     def __gamma_bp(self):
-        """ バイアス＆歳差変換行列用 gamma 計算
+        """ バイアス＆歳差変換行列用 gamma 計算（gamma_bp() を使用）
 
         :return float gamma
         """
-        t = self.jc
         try:
-            return (-0.052928      \
-                 + (10.556378      \
-                 + ( 0.4932044     \
-                 + (-0.00031238    \
-                 + (-0.000002788   \
-                 + ( 0.0000000260) \
-                 * t) * t) * t) * t) * t) * lcst.AS2R
+            return gamma_bp(self.jc)
         except Exception as e:
             raise
 
     def __phi_bp(self):
-        """ バイアス＆歳差変換行列用 phi 計算
+        """ バイアス＆歳差変換行列用 phi 計算（phi_bp() を使用）
 
         :return float phi
         """
-        t = self.jc
         try:
-            return (84381.412819      \
-                 + (  -46.811016      \
-                 + (    0.0511268     \
-                 + (    0.00053289    \
-                 + (   -0.000000440   \
-                 + (   -0.0000000176) \
-                 * t) * t) * t) * t) * t) * lcst.AS2R
+            return phi_bp(self.jc)
         except Exception as e:
             raise
 
     def __psi_bp(self):
-        """ バイアス＆歳差変換行列用 psi 計算
+        """ バイアス＆歳差変換行列用 psi 計算（psi_bp() を使用）
 
         :return float psi
         """
-        t = self.jc
         try:
-            return (  -0.041775      \
-                  +(5038.481484      \
-                  +(   1.5584175     \
-                  +(  -0.00018522    \
-                  +(  -0.000026452   \
-                  +(  -0.0000000148) \
-                  * t) * t) * t) * t) * t) * lcst.AS2R
+            return psi_bp(self.jc)
         except Exception as e:
             raise
 
+
+def obliquity(jc):
+    """ 黄道傾斜角計算
+        * 黄道傾斜角 ε （単位: rad）を計算する。
+          以下の計算式により求める。
+            ε = 84381.406 - 46.836769 * T - 0.0001831 T^2 + 0.00200340 T^3
+              - 5.76 * 10^(-7) * T^4 - 4.34 * 10^(-8) * T^5
+          ここで、 T は J2000.0 からの経過時間を 36525 日単位で表したユリウス
+          世紀数で、 T = (JD - 2451545) / 36525 である。
+
+    :param  float  jc: ユリウス世紀数
+    :return float    : 平均黄道傾斜角
+    """
+    try:
+        return (84381.406      \
+             + (  -46.836769   \
+             + (   -0.0001831  \
+             + (    0.00200340 \
+             + (   -5.76e-7    \
+             + (   -4.34e-8 )  \
+             * jc) * jc) * jc) * jc) * jc) * lcst.AS2R
+    except Exception as e:
+        raise
+
+def gamma_bp(t):
+    """ バイアス＆歳差変換行列用 gamma 計算
+
+    :param  float t: ユリウス世紀数
+    :return float gamma
+    """
+    try:
+        return (-0.052928      \
+             + (10.556378      \
+             + ( 0.4932044     \
+             + (-0.00031238    \
+             + (-0.000002788   \
+             + ( 0.0000000260) \
+             * t) * t) * t) * t) * t) * lcst.AS2R
+    except Exception as e:
+        raise
+
+def phi_bp(t):
+    """ バイアス＆歳差変換行列用 phi 計算
+
+    :param  float t: ユリウス世紀数
+    :return float phi
+    """
+    try:
+        return (84381.412819      \
+             + (  -46.811016      \
+             + (    0.0511268     \
+             + (    0.00053289    \
+             + (   -0.000000440   \
+             + (   -0.0000000176) \
+             * t) * t) * t) * t) * t) * lcst.AS2R
+    except Exception as e:
+        raise
+
+def psi_bp(t):
+    """ バイアス＆歳差変換行列用 psi 計算
+
+    :param  float t: ユリウス世紀数
+    :return float psi
+    """
+    try:
+        return (  -0.041775      \
+              +(5038.481484      \
+              +(   1.5584175     \
+              +(  -0.00018522    \
+              +(  -0.000026452   \
+              +(  -0.0000000148) \
+              * t) * t) * t) * t) * t) * lcst.AS2R
+    except Exception as e:
+        raise
+
+def nutation(jc):
+    """ 章動計算
+        * IAU 2000A nutation with adjustments to match the IAU 2006 precession.
+
+    :param  float jc: ユリウス世紀数
+    :return list [dpsi, deps]: Δψ, Δε
+    """
+    try:
+        nut = lnut.Nutation(jc)
+        fj2 = -2.7774e-6 * jc
+        dpsi_ls, deps_ls = nut.calc_lunisolar()
+        dpsi_pl, deps_pl = nut.calc_planetary()
+        dpsi, deps = dpsi_ls + dpsi_pl, deps_ls + deps_pl
+        dpsi += dpsi * (0.4697e-6 + fj2)
+        deps += deps * fj2
+        return [dpsi, deps]
+    except Exception as e:
+        raise
+
+def r_mtx_bpn(jc, eps, dpsi, deps):
+    """ Bias + Precession + Nutation 変換行列
+        * IAU 2006 (Fukushima-Williams 4-angle formulation) 理論
+
+    :param  float   jc: ユリウス世紀数
+    :param  float  eps: 平均黄道傾斜角
+    :param  float dpsi: Δψ
+    :param  float deps: Δε
+    :return np.matrix r: 変換行列
+    """
+    try:
+        r = lmtx.r_z(gamma_bp(jc))
+        r = lmtx.r_x(phi_bp(jc), r)
+        r = lmtx.r_z(-psi_bp(jc) - dpsi, r)
+        r = lmtx.r_x(-eps - deps, r)
+        return r
+    except Exception as e:
+        raise
+
+def calc_bpn(jd):
+    """ 平均黄道傾斜角, Bias + Precession + Nutation 変換行列のみの計算
+        * EphBpn の eps, r_mtx_bpn と同じ値を、他の変換行列を生成せずに
+          計算する。
+
+    :param  float        jd: ユリウス日 (for TT)
+    :return float       eps: 平均黄道傾斜角
+    :return np.matrix     r: 変換行列
+    """
+    try:
+        jc = ltm.jd2jc(jd)
+        eps = obliquity(jc)
+        dpsi, deps = nutation(jc)
+        return eps, r_mtx_bpn(jc, eps, dpsi, deps)
+    except Exception as e:
+        raise
+
+def calc_bpn_v(jcs):
+    """ Bias + Precession + Nutation 変換行列の計算（複数のユリウス世紀数）
+        * EphBpn の eps, r_mtx_bpn と同じ計算を配列で行う。
+          （章動は nutation.calc_v() で計算する）
+
+    :param  np.ndarray       jcs: ユリウス世紀数の配列（N 個）
+    :return np.ndarray       eps: 平均黄道傾斜角（N 個）
+    :return np.ndarray r_mtx_bpn: 回転行列（形状: N x 3 x 3）
+    :return np.ndarray      dpsi: Δψ（N 個）（恒星時の計算用）
+    """
+    try:
+        jcs = np.atleast_1d(np.asarray(jcs, dtype=np.float64))
+        eps = obliquity(jcs)
+        dpsi, deps = lnut.calc_v(jcs)
+        fj2 = -2.7774e-6 * jcs
+        dpsi += dpsi * (0.4697e-6 + fj2)
+        deps += deps * fj2
+        r = lmtx.r_z_v(gamma_bp(jcs))
+        r = lmtx.r_x_v(phi_bp(jcs), r)
+        r = lmtx.r_z_v(-psi_bp(jcs) - dpsi, r)
+        r = lmtx.r_x_v(-eps - deps, r)
+        return eps, r, dpsi
+    except Exception as e:
+        raise
+
+def eqeq_v(jcs, eps, dpsi):
+    """ 分点均差（Equation of the equinoxes）の計算（複数）
+        * IAU 2000 (GAST = GMST + 分点均差)
+        * 補完項は主要な 2 項（Ω, 2Ω）のみとする。
+          （省略した項の合計は 0.03 ミリ秒角程度）
+
+    :param  np.ndarray  jcs: ユリウス世紀数（N 個）
+    :param  np.ndarray  eps: 平均黄道傾斜角（N 個）
+    :param  np.ndarray dpsi: Δψ（N 個）
+    :return np.ndarray     : 分点均差 (Unit: rad)（N 個）
+    """
+    try:
+        om = lfa.om_iers2003(jcs)
+        ct = (2640.96e-6 * np.sin(om) + 63.52e-6 * np.sin(2.0 * om)) \
+           * lcst.AS2R
+        return dpsi * np.cos(eps) + ct
+    except Exception as e:
+        raise
@@ -44,366 +44,1118 @@ Copyright(C) 2018 mk-mode.com All Rights Reserved.
   - 対象天体番号 = 基準天体番号 は、無意味なので処理しない。
   - 天体番号が 12 の場合は、 x, y, z の位置・速度の値は全て 0.0 とする。
   - その他、JPL 提供の FORTRAN プログラム "testeph.f" を参考にした。
+
+* 連続計算時
+  - EphJplSession はバイナリファイルを開いたまま保持し、ヘッダ部の解析は
+    インスタンス化時の 1 回のみ行う。
+    （state(対象天体番号, 基準天体番号, ユリウス日) で任意の日時を計算）
+  - EphJpl は get_session() で共有の EphJplSession を使用する。
+  - 計算区分 kind = 1 を指定すると位置のみ（3要素）を計算する。
+    （速度用のチェビシェフ多項式の計算を省略）
+  - EphJplSession の prefetch に 1 以上を指定すると、時刻順（昇順・降順）の
+    連続計算時に、次の区間（レコード）をバックグラウンドのスレッドで
+    先読みする。（暦の作成等、時刻順に計算する場合に有効）
+  - EphJplSession の derived に True を指定すると、地球・月（太陽系重心基準）の
+    チェビシェフ多項式の係数を区間毎に事前に計算し、それぞれ 1 回の補間で
+    計算する。（derive_earth_moon() 参照）
+  - 複数のバイナリファイル（期間毎に分割したもの）を 1 つのエフェメリスとして
+    扱う場合は、バイナリファイルのフルパスの代わりに、それらを格納した
+    ディレクトリ、またはそれらのフルパスを 1 行に 1 個記述したテキストファイル
+    （拡張子 .txt）を指定する。（EphJplSegments）
+  - 入出力・計算の回数等の統計は metrics（EphJplMetrics）で取得できる。
+    （metrics.enable() で有効にした場合のみ集計する。既定は無効）
+  - EphJplSession は複数のスレッドから同時に使用できる。
+    （係数データは mmap のビュー、または pread=True の場合は os.pread による
+      位置指定の読み込みで参照し、ファイルの読み込み位置を共有しない）
 """
-import datetime
+import collections
+import json
+import mmap
+import numpy as np
+import os
+import queue
 import struct
-import sys
+import threading
+import time
 import traceback
+import types
 
+# ヘッダ部（第1レコード）の固定長部分
+#   TTL(84 byte * 3), CNAM(6 byte * 400), SS(8 byte * 3), NCON(4 byte),
+#   AU(8 byte), EMRAT(8 byte), IPT(4 byte * 12 * 3), NUMDE(4 byte),
+#   IPT_13(4 byte * 3)
+# （エンディアンは機種依存、アライメントによる詰め物なし）
+HEADER_1 = struct.Struct("=252s2400s3dI2d36II3I")
+LEN_TTL  = 84  # TTL 1 行の byte 数
+LEN_CNAM = 6   # CNAM 1 個の byte 数
 
-class EphJpl:
-    KIND = 2      # 計算区分（0: 計算しない、1: 位置のみ計算、2: 位置・速度を計算）
-                  # （但し、現時点では 1 の場合の処理は実装していない）
+# ヘッダ部（変更不可）
+#   consts は 定数名 => 定数値 の Dict（読み取り専用）
+#   ksize  は IPT, NCON から求めた 1 レコードのサイズ（4 byte 単位）
+EphJplHeader = collections.namedtuple(
+    "EphJplHeader",
+    ["ttl", "cnams", "sss", "ncon", "au", "emrat", "ipts", "numde", "cvals",
+     "consts", "ksize"]
+)
+
+
+class EphJplMetrics:
+    def __init__(self):
+        """ Initialization
+            * 入出力・計算の回数等の統計（モジュール全体で 1 つ。 metrics）
+              - opens         : ファイル（.npy を含む）のオープン回数
+              - seeks         : 位置指定の読み込み回数（seek, os.pread）
+              - bytes_read    : 読み込んだ byte 数（mmap の場合は参照した
+                                レコードの byte 数）
+              - granules      : 区間（レコード）の読み込み・解析回数
+                                （キャッシュのヒット、先読みを除く）
+              - prefetched    : 区間の先読み回数
+              - interpolations: 補間の天体番号 => 補間したユリウス日の数
+              - calls         : state(), states(), state_all() の呼び出し回数
+              - time          : state(), states(), state_all() の累積時間（秒）
+            * 無効の場合（既定）は、各処理で self.enabled を参照するのみで
+              集計しない。
+        """
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        """ 集計の開始 """
+        self.enabled = True
+
+    def disable(self):
+        """ 集計の終了 """
+        self.enabled = False
+
+    def reset(self):
+        """ 集計値のリセット """
+        with self.lock:
+            self.opens, self.seeks, self.bytes_read = 0, 0, 0
+            self.granules, self.prefetched, self.calls = 0, 0, 0
+            self.interpolations = collections.Counter()
+            self.time = 0.0
+
+    def snapshot(self):
+        """ 集計値の取得
+
+        :return dict: 集計値（キーは __init__ の説明を参照）
+        """
+        with self.lock:
+            return {
+                "opens": self.opens, "seeks": self.seeks,
+                "bytes_read": self.bytes_read, "granules": self.granules,
+                "prefetched": self.prefetched,
+                "interpolations": dict(self.interpolations),
+                "calls": self.calls, "time": self.time
+            }
+
+    def add(self, name, n=1):
+        """ 加算（無効の場合は何もしない）
+
+        :param string name: 集計値の名前（opens, seeks, bytes_read 等）
+        :param int       n: 加算する値
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def add_interpolation(self, astr, n=1):
+        """ 補間の回数の加算（無効の場合は何もしない）
+
+        :param int astr: 補間の天体番号
+        :param int    n: 補間したユリウス日の数
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            self.interpolations[astr] += n
+
+    def start(self):
+        """ 計測開始
+
+        :return float: 開始時刻（無効の場合は None）
+        """
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, t_start):
+        """ 計測終了（呼び出し回数、累積時間の加算）
+
+        :param float t_start: start() の戻り値（None の場合は何もしない）
+        """
+        if t_start is None:
+            return
+        t = time.perf_counter() - t_start
+        with self.lock:
+            self.calls += 1
+            self.time += t
+
+
+metrics = EphJplMetrics()  # 入出力・計算の回数等の統計
+
+
+class GranuleCache:
+    def __init__(self, size=8):
+        """ Initialization
+            * 解析済みの係数データ（区間（レコード）単位）の LRU キャッシュ
+            * キーはレコード番号
+
+        :param int size: 保持する区間の最大数（0 の場合はキャッシュしない）
+        """
+        self.size = size
+        self.items = collections.OrderedDict()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self.lock = threading.RLock()  # 先読みスレッドとの排他用
+
+    def get(self, idx):
+        """ 取得（最近使用したものとして扱う）
+
+        :param  int  idx: レコード番号
+        :return list    : [jds, coeffs]（存在しない場合は None）
+        """
+        try:
+            with self.lock:
+                item = self.items.get(idx)
+                if item is None:
+                    self.misses += 1
+                    return None
+                self.items.move_to_end(idx)
+                self.hits += 1
+                return item
+        except Exception as e:
+            raise
+
+    def contains(self, idx):
+        """ 存在確認（統計・LRU の順序は変更しない）
+
+        :param  int  idx: レコード番号
+        :return bool    : True: 存在する, False: 存在しない
+        """
+        with self.lock:
+            return idx in self.items
+
+    def put(self, idx, item):
+        """ 登録（最大数を超える場合は最も古いものを破棄）
+
+        :param int  idx: レコード番号
+        :param list item: [jds, coeffs]
+        """
+        try:
+            if self.size <= 0:
+                return
+            with self.lock:
+                self.items[idx] = item
+                self.items.move_to_end(idx)
+                while len(self.items) > self.size:
+                    self.items.popitem(last=False)
+                    self.evictions += 1
+        except Exception as e:
+            raise
+
+    def evict(self, idx=None):
+        """ 破棄
+
+        :param int idx: レコード番号（省略時は全て）
+        """
+        try:
+            with self.lock:
+                if idx is None:
+                    self.evictions += len(self.items)
+                    self.items.clear()
+                elif self.items.pop(idx, None) is not None:
+                    self.evictions += 1
+        except Exception as e:
+            raise
+
+    def resize(self, size):
+        """ 最大数の変更
+
+        :param int size: 保持する区間の最大数
+        """
+        try:
+            with self.lock:
+                self.size = size
+                while len(self.items) > max(self.size, 0):
+                    self.items.popitem(last=False)
+                    self.evictions += 1
+        except Exception as e:
+            raise
+
+    def stats(self):
+        """ 統計
+
+        :return dict: ヒット数、ミス数、破棄数、保持数、最大数
+        """
+        try:
+            with self.lock:
+                return {
+                    "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions,
+                    "count": len(self.items), "size": self.size
+                }
+        except Exception as e:
+            raise
+
+    def reset_stats(self):
+        """ 統計のリセット """
+        with self.lock:
+            self.hits, self.misses, self.evictions = 0, 0, 0
+
+
+class Prefetcher:
+    def __init__(self, load, cache, depth, n_rec):
+        """ Initialization
+            * 区間（レコード）の先読み
+            * 直前のアクセスとの差が +1（昇順）または -1（降順）の場合、
+              その方向の次の depth 個の区間をバックグラウンドのスレッドで
+              読み込み（ページの取り込みを含む）、キャッシュに登録する。
+            * それ以外（同じ区間、離れた区間）の場合は先読みしない。
+
+        :param function     load: 読み込み用（引数はレコード番号、戻り値は
+                                  [jds, coeffs]）
+        :param GranuleCache cache: 登録先のキャッシュ
+        :param int         depth: 先読みする区間の数
+        :param int         n_rec: 区間（レコード）数
+        """
+        self.load, self.cache = load, cache
+        self.depth, self.n_rec = depth, n_rec
+        self.last, self.direction = None, 0
+        self.pending = set()
+        self.prefetched = 0
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def notify(self, idx):
+        """ アクセスの通知（アクセスの方向を判定し、先読みを依頼）
+
+        :param int idx: アクセスしたレコード番号
+        """
+        try:
+            with self.lock:
+                if self.last is not None and idx != self.last:
+                    d = idx - self.last
+                    self.direction = d if abs(d) == 1 else 0
+                self.last = idx
+                direction = self.direction
+            if direction == 0:
+                return
+            for i in range(1, self.depth + 1):
+                idx_n = idx + direction * i
+                if idx_n < 0 or idx_n >= self.n_rec:
+                    break
+                with self.lock:
+                    if idx_n in self.pending or self.cache.contains(idx_n):
+                        continue
+                    self.pending.add(idx_n)
+                self.queue.put(idx_n)
+        except Exception as e:
+            raise
+
+    def stop(self):
+        """ 先読みスレッドの終了（未処理の依頼は破棄） """
+        try:
+            if not self.thread.is_alive():
+                return
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.queue.put(None)
+            self.thread.join()
+        except Exception as e:
+            raise
+
+    def __run(self):
+        """ 先読みスレッド
+            * None を受け取ると終了する。
+        """
+        while True:
+            idx = self.queue.get()
+            if idx is None:
+                return
+            try:
+                item = self.load(idx)
+                self.cache.put(idx, item)
+                self.prefetched += 1
+                metrics.add("prefetched")
+                del item
+            except Exception as e:
+                traceback.print_exc()
+            finally:
+                with self.lock:
+                    self.pending.discard(idx)
+
+
+class EphJplBin:
     KSIZE = 2036  # バイナリファイル読み込み用
     RECL  = 4     # バイナリファイル読み込み用
 
-    def __init__(self, file_bin, target, center, jd, bary=True, km=False):
+    def __init__(self, file_bin, pread=False):
         """ Initialization
+            * JPLEPH（バイナリファイル）の読み込み
+            * ヘッダ部は read_header() で解析し、係数データは mmap で参照する。
+              （pread=True の場合は、レコード毎に os.pread で読み込む）
+            * いずれの場合もファイルの読み込み位置（シーク位置）は使用しないので、
+              複数のスレッドから同時に record() を呼び出せる。
+            * 1 レコードのサイズはヘッダ部（IPT, NCON）から求める。
+              （DE430 の場合は KSIZE = 2036）
+            * 区間（レコード）数は、 SS（開始・終了ユリウス日、分割日数）から
+              求めた数と、ファイルサイズから求めた数の小さい方とする。
 
         :param string file_bin: バイナリファイルのフルパス
+        :param bool      pread: 読み込み方法（True: os.pread, False: mmap）
+        """
+        self.file_bin = file_bin
+        self.f = open(self.file_bin, "rb")
+        metrics.add("opens")
+        self.mm = None
+        try:
+            self.header = read_header(self.f, self.KSIZE, self.RECL)
+            self.ksize = self.header.ksize
+            if pread:
+                len_file = os.fstat(self.f.fileno()).st_size
+            else:
+                self.mm = mmap.mmap(
+                    self.f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+                len_file = len(self.mm)
+            self.n_rec = min(
+                int(round(
+                    (self.header.sss[1] - self.header.sss[0])
+                    / self.header.sss[2]
+                )),
+                len_file // (self.ksize * self.RECL) - 2
+            )
+        except Exception as e:
+            self.f.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self.f.closed
+
+    def close(self):
+        """ バイナリファイルのクローズ
+            * 係数のビュー（np.ndarray）を保持したままの場合、 mmap のクローズで
+              BufferError となるので注意。（pread=True の場合を除く）
+        """
+        try:
+            if not self.f.closed:
+                if self.mm is not None:
+                    self.mm.close()
+                self.f.close()
+        except Exception as e:
+            raise
+
+    def record(self, idx):
+        """ COEFF 読み込み（レコード番号指定）
+            * 係数は mmap 上のレコードを np.frombuffer で参照するビュー
+              （コピーなし）で、天体毎に [サブ区間, x・y・z, 係数] の形状とする。
+              （IPT のオフセットで位置を決定）
+            * 8 byte * ?
+            * 倍精度浮動小数点数(機種依存)
+            * 最初の2要素は当該データの開始・終了ユリウス日
+
+            * pread=True の場合は、 os.pread で読み込んだレコードのビュー
+
+        :param  int     idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    jds: 対象区間のユリウス日（開始、終了）
+        :return list coeffs: 係数（天体毎の np.ndarray のビュー）
+        """
+        len_rec = self.ksize * self.RECL
+        pos = len_rec * (2 + idx)
+        coeffs = []
+        try:
+            metrics.add("granules")
+            metrics.add("bytes_read", len_rec)
+            if self.mm is None:
+                metrics.add("seeks")
+                buf = os.pread(self.f.fileno(), len_rec, pos)
+                if len(buf) < len_rec:
+                    raise ValueError("Record {} is out of file.".format(idx))
+                rec = np.frombuffer(buf, dtype=np.float64)
+            else:
+                rec = np.frombuffer(
+                    self.mm, dtype=np.float64, count=self.ksize // 2,
+                    offset=pos
+                )
+            jds = rec[0:2].tolist()
+            for i, ipt in enumerate(self.header.ipts):
+                n = 2 if i == 11 else 3
+                i_s = ipt[0] - 1
+                i_e = i_s + ipt[1] * n * ipt[2]
+                coeffs.append(rec[i_s:i_e].reshape(ipt[2], n, ipt[1]))
+            return [jds, coeffs]
+        except Exception as e:
+            raise
+
+    def prefetch(self, idx):
+        """ COEFF 先読み（レコード番号指定）
+            * mmap.madvise(MADV_WILLNEED) で対象レコードの読み込みを依頼し、
+              全係数を参照してページを取り込んだ上で record() の値を返す。
+              （madvise が使用できない環境では参照のみ）
+            * pread=True の場合は record() の値をそのまま返す。
+              （読み込み済みのため）
+
+        :param  int  idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    : [jds, coeffs]（record() と同じ）
+        """
+        len_rec = self.ksize * self.RECL
+        pos = len_rec * (2 + idx)
+        try:
+            if self.mm is None:
+                return self.record(idx)
+            if hasattr(mmap, "MADV_WILLNEED"):
+                pos_page = pos - pos % mmap.PAGESIZE
+                self.mm.madvise(
+                    mmap.MADV_WILLNEED, pos_page, pos + len_rec - pos_page
+                )
+            item = self.record(idx)
+            for c in item[1]:
+                c.sum()
+            return item
+        except Exception as e:
+            raise
+
+
+class EphJplCol:
+    FILE_HEADER = "header.json"     # ヘッダ部
+    FILE_JDS    = "jds.npy"         # 区間のユリウス日（開始、終了）
+    FILE_BODY   = "body_{:02d}.npy"  # 係数（係数データの並び順 1 - 13）
+
+    def __init__(self, dir_col):
+        """ Initialization
+            * 天体毎に分割した係数データ（eph_jpl_col.convert() で作成）の読み込み
+            * 係数は天体毎の .npy
+              （形状: 区間 x サブ区間 x x・y・z x 係数）を、
+              その天体を初めて参照した時に np.load(mmap_mode="r") で参照する。
+            * ヘッダ部は JSON
+            * 係数が単精度（dtype="f4"）の場合も、補間は倍精度で行う。
+              （self.errors は係数データの番号 => 位置の誤差の上限）
+            * 係数のファイルが存在しない天体の IPT は (オフセット, 0, 0) とする。
+
+        :param string dir_col: 出力ディレクトリのフルパス
+        """
+        self.dir_col = dir_col
+        self.is_closed = False
+        try:
+            with open(os.path.join(dir_col, self.FILE_HEADER)) as f:
+                h = json.load(f)
+            metrics.add("opens")
+            cnams, cvals = tuple(h["cnams"]), tuple(h["cvals"])
+            ipts = tuple(
+                tuple(ipt) if os.path.exists(
+                    os.path.join(dir_col, self.FILE_BODY.format(k + 1))
+                ) else (ipt[0], 0, 0)
+                for k, ipt in enumerate(h["ipts"])
+            )
+            self.header = EphJplHeader(
+                ttl=h["ttl"], cnams=cnams, sss=tuple(h["sss"]),
+                ncon=h["ncon"], au=h["au"], emrat=h["emrat"],
+                ipts=ipts, numde=h["numde"], cvals=cvals,
+                consts=types.MappingProxyType(dict(zip(cnams, cvals))),
+                ksize=calc_ksize(ipts, h["ncon"])
+            )
+            self.dtype = h.get("dtype", "f8")
+            self.errors = {int(k): v for k, v in h.get("errors", {}).items()}
+            self.jds = np.load(
+                os.path.join(dir_col, self.FILE_JDS), mmap_mode="r"
+            )
+            metrics.add("opens")
+            self.n_rec = len(self.jds)
+            self.bodies = [None for _ in self.header.ipts]
+        except Exception as e:
+            raise
+
+    @property
+    def closed(self):
+        return self.is_closed
+
+    def close(self):
+        """ クローズ（mmap の参照を破棄） """
+        self.jds, self.bodies = None, [None for _ in self.header.ipts]
+        self.is_closed = True
+
+    def record(self, idx):
+        """ COEFF 読み込み（レコード番号指定）
+            * 天体毎の係数は、区間のビュー（コピーなし）
+            * 出力対象外の天体（ファイルが存在しない）は None
+
+        :param  int     idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    jds: 対象区間のユリウス日（開始、終了）
+        :return list coeffs: 係数（天体毎の np.ndarray のビュー）
+        """
+        try:
+            coeffs = [self.__body(i) for i in range(len(self.bodies))]
+            coeffs = [None if c is None else c[idx] for c in coeffs]
+            if metrics.enabled:
+                metrics.add("granules")
+                metrics.add("bytes_read", self.jds[idx].nbytes + sum(
+                    c.nbytes for c in coeffs if c is not None
+                ))
+            return [self.jds[idx].tolist(), coeffs]
+        except Exception as e:
+            raise
+
+    def prefetch(self, idx):
+        """ COEFF 先読み（レコード番号指定）
+            * 全係数を参照してページを取り込んだ上で record() の値を返す。
+
+        :param  int  idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    : [jds, coeffs]（record() と同じ）
+        """
+        try:
+            item = self.record(idx)
+            for c in item[1]:
+                if c is not None:
+                    c.sum()
+            return item
+        except Exception as e:
+            raise
+
+    def __body(self, i):
+        """ 天体毎の係数の取得（初回のみ np.load(mmap_mode="r")）
+
+        :param  int        i: 係数データのインデックス（0 - 12）
+        :return np.ndarray  : 係数（ファイルが存在しない場合は None）
+        """
+        try:
+            if self.bodies[i] is None:
+                path = os.path.join(self.dir_col, self.FILE_BODY.format(i + 1))
+                if not os.path.exists(path):
+                    return None
+                self.bodies[i] = np.load(path, mmap_mode="r")
+                metrics.add("opens")
+            return self.bodies[i]
+        except Exception as e:
+            raise
+
+
+class EphJplSession:
+    KIND = 2      # 計算区分（0: 計算しない、1: 位置のみ計算、2: 位置・速度を計算）
+                  # （state() 等の引数 kind の既定値）
+    KSIZE = EphJplBin.KSIZE  # バイナリファイル読み込み用
+    RECL  = EphJplBin.RECL   # バイナリファイル読み込み用
+
+    def __init__(self, file_bin, cache_size=8, prefetch=0, pread=False,
+                 derived=False):
+        """ Initialization
+            * バイナリファイルを開いたまま保持し、ヘッダ部（TTL, CNAM, SS, IPT,
+              CVAL 等）の読み込みはインスタンス化時の 1 回のみとする。
+            * 以降は state() で任意の対象・基準天体、ユリウス日の計算を行う。
+            * 解析済みの係数データは区間（レコード）単位で LRU キャッシュ
+              （self.cache）に保持する。
+            * file_bin がディレクトリの場合は、天体毎に分割した係数データ
+              （eph_jpl_col.convert() で作成）を読み込む。
+            * prefetch が 1 以上の場合は、時刻順の連続計算時に次の区間を
+              バックグラウンドのスレッドで先読みする。（self.prefetcher）
+              （先読みした区間もキャッシュに保持するので、
+                cache_size は prefetch より大きくすること）
+            * 複数のスレッドから同時に state() 等を呼び出せる。
+              （キャッシュは GranuleCache 内でロックし、係数データの読み込みは
+                ファイルの読み込み位置を共有しない）
+            * pread=True の場合は、係数データを mmap の代わりに os.pread で
+              読み込む。（バイナリファイルの場合のみ有効）
+            * derived=True の場合は、区間の読み込み時に地球・月（太陽系重心
+              基準）の係数を derive_earth_moon() で計算し、区間と共に
+              キャッシュに保持する。（対象・基準天体が地球と月の組み合わせの
+              場合は、従来どおり月（地心）の係数を使用する）
+              （係数の変換による差は丸め誤差程度で、位置で 1e-6 km 程度）
+              地球 - 月の重心・月（地心）の係数が無い場合、月のサブ区間数が
+              地球 - 月の重心のサブ区間数の整数倍でない場合は無効。
+
+        :param string file_bin: バイナリファイル（またはディレクトリ）のフルパス
+        :param int  cache_size: キャッシュする区間の最大数（0: キャッシュしない）
+        :param int    prefetch: 先読みする区間の数（0: 先読みしない）
+        :param bool      pread: 読み込み方法（True: os.pread, False: mmap）
+        :param bool    derived: 地球・月の係数の事前計算（True: する, False: しない）
+        """
+        self.file_bin = file_bin
+        self.cache = GranuleCache(cache_size)
+        self.prefetcher = None
+        if os.path.isdir(self.file_bin):
+            self.reader = EphJplCol(self.file_bin)
+        else:
+            self.reader = EphJplBin(self.file_bin, pread)
+        try:
+            self.__read_header()
+            self.__set_derived(derived)
+            if prefetch > 0 and cache_size > prefetch:
+                self.prefetcher = Prefetcher(
+                    self.__load_prefetch, self.cache, prefetch,
+                    self.reader.n_rec
+                )
+        except Exception as e:
+            self.reader.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self.reader.closed
+
+    def close(self):
+        """ バイナリファイルのクローズ
+            * 係数のビュー（np.ndarray）を保持したままの場合、 mmap のクローズで
+              BufferError となるので注意。
+        """
+        try:
+            if not self.reader.closed:
+                if self.prefetcher is not None:
+                    self.prefetcher.stop()
+                self.cache.evict()
+                self.reader.close()
+        except Exception as e:
+            raise
+
+    def state(self, target, center, jd, bary=True, km=False, kind=KIND,
+              jd2=0.0):
+        """ 対象天体の基準天体に対する位置・速度の計算
+            * ユリウス日は 2 つの値の和（jd + jd2）でも指定できる。
+              （区間の開始からの経過日数を jd2 の精度で計算する）
+
         :param int      target: 対象天体番号
         :param int      center: 基準天体番号
         :param float        jd: ユリウス日
         :param bool       bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
         :param bool         km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param int        kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        :param float       jd2: ユリウス日（jd に加える値。省略時は 0.0）
+        :return list      rrds: 算出データ（対象 - 基準）
+                                （kind = 1 の場合は位置のみの 3 要素）
         """
-        self.file_bin = file_bin
-        self.astrs = [target, center]
-        self.jd, self.bary, self.km = jd, bary, km
-        # 各種初期化
-        self.pos   = 0                        # レコード位置
-        self.flags = [0 for _ in range(12)]   # 計算対象フラグ一覧配列
-        self.pvs   = [[] for _ in range(11)]  # 位置・角度データ配列
-        self.pvs_2 = [[] for _ in range(13)]  # 位置・角度データ配列（対象 - 基準 算出用）
-        self.__read_de430()
+        t_start = metrics.start()
+        try:
+            # 引数のユリウス日・天体番号をチェック
+            self.__check_jd(jd + jd2)
+            self.__check_bodies([target, center], bary)
+            # 係数取得
+            jds, coeffs = self.__get_coeff(jd, jd2)
+            rrds = self.__diff(
+                [target, center], bary,
+                self.__interpolate, jd, jds, coeffs, km, kind, None, jd2
+            ).tolist()
+            metrics.stop(t_start)
+            return rrds
+        except Exception as e:
+            raise
 
-    def calc(self):
-        """ Calculation """
-        rrds  = [0.0 for _ in range(6)]    # 算出データ（対象 - 基準）配列
+    def states(self, target, center, jds, bary=True, km=False, kind=KIND,
+               jds2=None):
+        """ 対象天体の基準天体に対する位置・速度の計算（複数のユリウス日）
+            * ユリウス日を区間（レコード）毎にまとめ、区間毎に係数を 1 回だけ
+              取得し（補間する全天体で共有）、サブ区間・チェビシェフ多項式の
+              計算は配列演算で行う。
+            * ユリウス日は 2 つの配列の和（jds + jds2）でも指定できる。
+
+        :param int          target: 対象天体番号
+        :param int          center: 基準天体番号
+        :param np.ndarray      jds: ユリウス日の配列（N 個）
+        :param bool           bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
+        :param bool             km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param int            kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        :param np.ndarray     jds2: ユリウス日（jds に加える値）の配列（省略可）
+        :return np.ndarray    rrds: 算出データ（対象 - 基準）(形状: N x 6)
+                                    （kind = 1 の場合は N x 3）
+        """
+        t_start = metrics.start()
         try:
+            jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+            if jds2 is not None:
+                jds2 = np.broadcast_to(
+                    np.asarray(jds2, dtype=np.float64), jds.shape
+                )
             # 引数のユリウス日をチェック
-            self.__check_jd()
-            # 計算対象フラグ一覧（係数データの並びに対応）取得
-            self.__get_list()
-            # 補間（11:太陽）
-            self.pv_sun = self.__interpolate(11)
-            # 補間（1:水星〜10:月）
-            for i in range(10):
-                if self.flags[i] == 0:
-                    continue
-                self.pvs[i] = self.__interpolate(i + 1)
-                if i > 8:
-                    continue
-                if self.bary:
-                    continue
-                self.pvs[i] = [a - b for a, b in zip(self.pvs[i], self.pv_sun)]
-            # 補間（14:地球の章動）
-            if self.flags[10] > 0 and self.ipts[11][1] > 0:
-                p_nut = self.__interpolate(14)
-            # 補間（15:月の秤動）
-            if self.flags[11] > 0 and self.ipts[12][1] > 0:
-                self.pvs[10] = self.__interpolate(15)
-            # 対象天体と基準天体の差
-            if self.astrs[0] == 14:
-                if self.ipts[11][1] > 0:
-                    rrds = p_nut + [0.0, 0.0]
-            elif self.astrs[0] == 15:
-                if self.ipts[12][1] > 0:
-                    rrds = self.pvs[10]
-            else:
-                for i in range(10):
-                    self.pvs_2[i] = self.pvs[i]
-                if 11 in self.astrs:
-                    self.pvs_2[10] = self.pv_sun
-                if 12 in self.astrs:
-                    self.pvs_2[11] = [0.0 for _ in range(6)]
-                if 13 in self.astrs:
-                    self.pvs_2[12] = self.pvs[2]
-                if (self.astrs[0] * self.astrs[1] == 30 or \
-                    self.astrs[0] + self.astrs[1] == 13):
-                    self.pvs_2[2] = [0.0 for _ in range(6)]
-                else:
-                    if self.flags[2] != 0:
-                        self.pvs_2[2] = [
-                            a - b / (1.0 + self.emrat)
-                            for a, b in zip(self.pvs[2], self.pvs[9])
-                        ]
-                    if self.flags[9] != 0:
-                        self.pvs_2[9] = [
-                            a + b
-                            for a, b in zip(self.pvs_2[2], self.pvs[9])
-                        ]
-                for i in range(6):
-                    rrds[i] = self.pvs_2[self.astrs[0] - 1][i] \
-                            - self.pvs_2[self.astrs[1] - 1][i]
+            if jds.size > 0:
+                jds_chk = jds if jds2 is None else jds + jds2
+                self.__check_jd(jds_chk.min())
+                self.__check_jd(jds_chk.max())
+            self.__check_bodies([target, center], bary)
+            recs = self.__get_records(jds, jds2)
+            rrds = self.__diff(
+                [target, center], bary, self.__interpolate_v, jds, recs, km,
+                kind, jds2
+            )
+            metrics.stop(t_start)
             return rrds
         except Exception as e:
             raise
 
-    def __read_de430(self):
-        """ Execution
+    def state_all(self, jd, bodies=None, km=False, kind=KIND, jd2=0.0):
+        """ 全天体（または指定の天体）の太陽系重心に対する位置・速度の計算
+            * 1 回の係数取得で、指定の天体をまとめて計算する。
+            * サブ区間数・係数の数が同じ天体はチェビシェフ多項式の値を共有し、
+              地球 - 月の重心・月（地心）の補間はそれぞれ 1 回のみとする。
 
-             1: 水星 (Mercury)
-             2: 金星 (Venus)
-             3: 地球 - 月の重心 (Earth-Moon barycenter)
-             4: 火星 (Mars)
-             5: 木星 (Jupiter)
-             6: 土星 (Saturn)
-             7: 天王星 (Uranus)
-             8: 海王星 (Neptune)
-             9: 冥王星 (Pluto)
-            10: 月（地心） (Moon (geocentric))
-            11: 太陽 (Sun)
-            12: 地球の章動（1980年IAUモデル）
-                (Earth Nutations in longitude and obliquity(IAU 1980 model))
-            13: 月の秤動 (Lunar mantle libration)
+        :param  float      jd: ユリウス日
+        :param  list   bodies: 天体番号（1 - 15）のリスト
+                               （省略時は bodies() の全て）
+        :param  bool       km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param  int      kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        :param  float     jd2: ユリウス日（jd に加える値。省略時は 0.0）
+        :return dict      pvs: 天体番号 => 位置・速度（state() と同じ形式）
+                               （14: 地球の章動、15: 月の秤動 は state(14, 0),
+                                 state(15, 0) と同じ値）
         """
+        res = {}
+        t_start = metrics.start()
         try:
-            with open(self.file_bin, "rb") as f:
-                self.__get_ttl(f)     # TTL
-                self.__get_cnam(f)    # CNAM
-                self.__get_ss(f)      # SS
-                self.__get_ncon(f)    # NCON
-                self.__get_au(f)      # AU
-                self.__get_emrat(f)   # EMRAT
-                self.__get_ipt(f)     # IPT
-                self.__get_numde(f)   # NUMDE
-                self.__get_ipt_13(f)  # IPT
-                self.__get_cnam_2(f)  # CNAM(>400)
-                self.__get_cval(f)    # CVAL
-                self.__get_coeff(f)   # 係数取得
-            self.__get_jdepoc()       # JDEPOC
+            if bodies is None:
+                bodies = self.bodies()
+            # 引数のユリウス日・天体番号をチェック
+            self.__check_jd(jd + jd2)
+            for k in bodies:
+                self.__check_bodies([k, 0])
+            # 係数取得
+            jds, coeffs = self.__get_coeff(jd, jd2)
+            # 補間（補間の天体番号 => 位置・速度）
+            basis, pvs = {}, {}
+            for k in bodies:
+                for astr in self.__get_astrs(k):
+                    if astr not in pvs:
+                        pvs[astr] = self.__interpolate(
+                            astr, jd, jds, coeffs, km, kind, basis, jd2
+                        )
+            for k in bodies:
+                if self.derived and (k == 3 or k == 10):
+                    pv = pvs[16 if k == 3 else 17]
+                elif k == 3 or k == 10:
+                    pv = pvs[3] - pvs[10] / (1.0 + self.emrat)
+                    if k == 10:
+                        pv = pv + pvs[10]
+                elif k == 11:
+                    pv = pvs[11]
+                elif k == 12:
+                    pv = np.zeros(3 * kind)
+                elif k == 13:
+                    pv = pvs[3]
+                elif k == 14:
+                    pv = np.concatenate((pvs[14], np.zeros(kind)))
+                else:
+                    pv = pvs[k]
+                res[k] = pv.tolist()
+            metrics.stop(t_start)
+            return res
         except Exception as e:
             raise
 
-    def __get_ttl(self, f):
-        """ TTL（タイトル）取得
-            - 84 byte * 3
-            - ASCII文字列(後続のnull文字やスペースを削除)
+    def bodies(self):
+        """ 計算可能な天体番号の一覧
+            * 係数の数が 0 の天体（抽出時の出力対象外等）を必要とするものは
+              除く。
 
-        :param file_object f
+        :return list: 天体番号（1 - 15）のリスト
         """
-        len_rec = 84
-        self.ttl = ""
         try:
-            for i in range(3):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack(str(len_rec) + "s", f.read(len_rec))[0]
-                if i != 0:
-                    self.ttl += "\n"
-                self.ttl += a.decode("utf-8").rstrip()
-            self.pos += len_rec * 3
+            return [
+                k for k in range(1, 16)
+                if all(self.__has_coeff(astr) for astr in self.__get_astrs(k))
+            ]
         except Exception as e:
             raise
 
-    def __get_cnam(self, f):
-        """ CNAM（定数名）取得
-            - 6 byte * 400
-            - ASCII文字列(後続のnull文字やスペースを削除)
+    def __has_coeff(self, astr):
+        """ 係数データの有無
 
-        :param file_object f
+        :param  int astr: 補間の天体番号（1 - 11, 14, 15）
+        :return bool    : True: 有り, False: 無し
         """
-        len_rec = 6
-        self.cnams = []
         try:
-            for i in range(400):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack(str(len_rec) + "s", f.read(len_rec))[0]
-                self.cnams.append(a.decode("utf-8").rstrip())
-            self.pos += len_rec * 400
+            return self.ipts_all[astr - 3 if astr > 13 else astr - 1][1] > 0
         except Exception as e:
             raise
 
-    def __get_ss(self, f):
-        """ SS（ユリウス日（開始、終了）、分割日数）取得
-            - 8 byte * 3
-            - 倍精度浮動小数点数(機種依存)
+    def __get_astrs(self, k):
+        """ 天体番号から補間に必要な天体（係数データ）の番号の一覧を取得
+            * 補間の天体番号は 1 - 11 が係数データの並び順、
+              14: 地球の章動、15: 月の秤動、
+              16: 地球、17: 月（太陽系重心基準。 derived=True の場合のみ）
 
-        :param file_object f
+        :param  int     k: 天体番号（1 - 15）
+        :return list     : 補間の天体番号の一覧
         """
-        len_rec = 8
-        self.sss = []
         try:
-            for i in range(3):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack("d", f.read(len_rec))[0]
-                self.sss.append(a)
-            self.pos += len_rec * 3
+            if self.derived and (k == 3 or k == 10):
+                return [16 if k == 3 else 17]
+            if k == 3 or k == 10:
+                return [3, 10]
+            if k == 12:
+                return []
+            if k == 13:
+                return [3]
+            return [k]
         except Exception as e:
             raise
 
-    def __get_ncon(self, f):
-        """ NCON（定数の数）取得
-            - 4 byte * 1
-            - unsigned int (符号なし整数, エンディアンと int のサイズに依存)
+    def __diff(self, astrs, bary, interpolate, *args):
+        """ 対象天体と基準天体の差の計算
+            * 位置・速度は np.ndarray で扱い、要素数 6 の 1 次元配列（単一の
+              ユリウス日）と N x 6 の 2 次元配列（複数のユリウス日）の両方に
+              対応する。
 
-        :param file_object f
+        :param  list        astrs: [対象天体番号, 基準天体番号]
+        :param  bool         bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
+        :param  function interpolate: 補間関数（第1引数は天体番号）
+        :param  *args              : 補間関数の残りの引数
+        :return np.ndarray    rrds: 算出データ（対象 - 基準）
         """
-        len_rec = 4
+        pvs   = [None for _ in range(11)]  # 位置・角度データ配列
+        pvs_2 = [None for _ in range(13)]  # 位置・角度データ配列（対象 - 基準 算出用）
         try:
-            f.seek(self.pos)
-            a = struct.unpack("I", f.read(len_rec))[0]
-            self.ncon = a
-            self.pos += len_rec
+            if self.derived and astrs[0] <= 13 and \
+               (3 in astrs or 10 in astrs) and sorted(astrs) != [3, 10]:
+                return self.__diff_derived(astrs, bary, interpolate, *args)
+            # 計算対象フラグ一覧（係数データの並びに対応）取得
+            flags = self.__get_list(astrs)
+            # 補間（11:太陽）（太陽が対象・基準、または太陽が基準の場合のみ）
+            pv_sun = None
+            if 11 in astrs or not bary:
+                pv_sun = interpolate(11, *args)
+            # 補間（1:水星〜10:月）
+            for i in range(10):
+                if flags[i] == 0:
+                    continue
+                pvs[i] = interpolate(i + 1, *args)
+                if i > 8:
+                    continue
+                if bary:
+                    continue
+                pvs[i] = pvs[i] - pv_sun
+            # 補間（14:地球の章動）
+            if flags[10] > 0 and self.ipts[11][1] > 0:
+                p_nut = interpolate(14, *args)
+            # 補間（15:月の秤動）
+            if flags[11] > 0 and self.ipts[12][1] > 0:
+                pvs[10] = interpolate(15, *args)
+            # 対象天体と基準天体の差
+            if astrs[0] == 14:
+                rrds = np.concatenate(
+                    (p_nut, np.zeros_like(p_nut[..., 0::2])), axis=-1
+                )
+            elif astrs[0] == 15:
+                rrds = pvs[10]
+            else:
+                pv_any = [pv for pv in pvs + [pv_sun] if pv is not None]
+                if not pv_any:
+                    # 12:太陽系重心 同士の場合（形状取得用）
+                    astr = [a for a in range(11, 0, -1) if self.__has_coeff(a)]
+                    pv_any = [interpolate(astr[0], *args)]
+                zeros = np.zeros_like(pv_any[0])
+                for i in range(10):
+                    pvs_2[i] = pvs[i]
+                if 11 in astrs:
+                    pvs_2[10] = pv_sun
+                if 12 in astrs:
+                    pvs_2[11] = zeros
+                if 13 in astrs:
+                    pvs_2[12] = pvs[2]
+                if (astrs[0] * astrs[1] == 30 or \
+                    astrs[0] + astrs[1] == 13):
+                    pvs_2[2] = zeros
+                else:
+                    if flags[2] != 0 and flags[9] != 0:
+                        pvs_2[2] = pvs[2] - pvs[9] / (1.0 + self.emrat)
+                    if flags[9] != 0:
+                        pvs_2[9] = pvs_2[2] + pvs[9]
+                rrds = pvs_2[astrs[0] - 1] - pvs_2[astrs[1] - 1]
+            return rrds
         except Exception as e:
             raise
 
-    def __get_au(self, f):
-        """ AU（天文単位）取得
-            - 8 byte * 1
-            - 倍精度浮動小数点数(機種依存)
+    def __diff_derived(self, astrs, bary, interpolate, *args):
+        """ 対象天体と基準天体の差の計算（derived=True で、地球・月を含む場合）
+            * 地球・月は事前計算した係数（補間の天体番号 16, 17）で
+              それぞれ 1 回の補間で計算する。
+            * bary=False の場合の扱いは __diff と同じ。
+              （太陽以外の天体は太陽を差し引き、太陽はそのまま）
 
-        :param file_object f
+        :param  list        astrs: [対象天体番号, 基準天体番号]（1 - 13）
+        :param  bool         bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
+        :param  function interpolate: 補間関数（第1引数は天体番号）
+        :param  *args              : 補間関数の残りの引数
+        :return np.ndarray    rrds: 算出データ（対象 - 基準）
         """
-        len_rec = 8
+        pvs = {}
         try:
-            f.seek(self.pos)
-            a = struct.unpack("d", f.read(len_rec))[0]
-            self.au = a
-            self.pos += len_rec
+            pv_sun = None
+            if 11 in astrs or not bary:
+                pv_sun = interpolate(11, *args)
+            for k in astrs:
+                if k == 12:
+                    continue
+                elif k == 11:
+                    pvs[k] = pv_sun
+                    continue
+                pvs[k] = interpolate(
+                    {3: 16, 10: 17, 13: 3}.get(k, k), *args
+                )
+                if not bary:
+                    pvs[k] = pvs[k] - pv_sun
+            for k in astrs:
+                if k == 12:
+                    pvs[k] = np.zeros_like(list(pvs.values())[0])
+            return pvs[astrs[0]] - pvs[astrs[1]]
         except Exception as e:
             raise
 
-    def __get_emrat(self, f):
-        """ EMRAT（地球と月の質量比）取得
-            - 8 byte * 1
-            - 倍精度浮動小数点数(機種依存)
+    def __read_header(self):
+        """ ヘッダ部読み込み
+            * 読み込み済みの EphJplHeader（変更不可）をインスタンス変数
+              self.header に設定する。
+            * 後方互換用に各値をインスタンス変数にも設定する。
 
-        :param file_object f
+             1: 水星 (Mercury)
+             2: 金星 (Venus)
+             3: 地球 - 月の重心 (Earth-Moon barycenter)
+             4: 火星 (Mars)
+             5: 木星 (Jupiter)
+             6: 土星 (Saturn)
+             7: 天王星 (Uranus)
+             8: 海王星 (Neptune)
+             9: 冥王星 (Pluto)
+            10: 月（地心） (Moon (geocentric))
+            11: 太陽 (Sun)
+            12: 地球の章動（1980年IAUモデル）
+                (Earth Nutations in longitude and obliquity(IAU 1980 model))
+            13: 月の秤動 (Lunar mantle libration)
         """
-        len_rec = 8
         try:
-            f.seek(self.pos)
-            a = struct.unpack("d", f.read(len_rec))[0]
-            self.emrat = a
-            self.pos += len_rec
+            self.header = self.reader.header
+            h = self.header
+            self.ttl, self.cnams, self.sss   = h.ttl,  h.cnams, h.sss
+            self.ncon, self.au,   self.emrat = h.ncon, h.au,    h.emrat
+            self.ipts, self.numde, self.cvals = h.ipts, h.numde, h.cvals
+            self.consts = h.consts
+            self.__get_jdepoc()   # JDEPOC
         except Exception as e:
             raise
 
-    def __get_numde(self, f):
-        """ NUMDE（DEバージョン番号）取得
-            - 4 byte * 1
-            - unsigned int (符号なし整数, エンディアンと int のサイズに依存)
+    def __get_coeff(self, jd, jd2=0.0):
+        """ COEFF 取得
+            * レコード位置計算
+            * 対象区間のユリウス日（開始、終了）と全ての係数を返す
 
-        :param file_object f
+        :param  float    jd: ユリウス日
+        :param  float   jd2: ユリウス日（jd に加える値）
+        :return list    jds: 対象区間のユリウス日（開始、終了）
+        :return list coeffs: 係数（天体毎の np.ndarray のビュー）
         """
-        len_rec = 4
         try:
-            f.seek(self.pos)
-            a = struct.unpack("I", f.read(len_rec))[0]
-            self.numde = a
-            self.pos += len_rec
+            return self.__get_record(
+                int(((jd - self.sss[0]) + jd2) // self.sss[2])
+            )
         except Exception as e:
             raise
 
-    def __get_ipt(self, f):
-        """ IPT（オフセット、係数の数、サブ区間数）（水星〜月の章動）取得
-            - 4 byte * 12 * 3
-            - unsigned int (符号なし整数, エンディアンと int のサイズに依存)
+    def __get_record(self, idx):
+        """ COEFF 取得（レコード番号指定）
+            * キャッシュに存在すればそれを使用する。
 
-        :param file_object f
+        :param  int     idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    jds: 対象区間のユリウス日（開始、終了）
+        :return list coeffs: 係数（天体毎の np.ndarray のビュー）
         """
-        len_rec = 4
-        self.ipts = []
         try:
-            for i in range(12):
-                l = []
-                for j in range(3):
-                    f.seek(self.pos + len_rec * j)
-                    a = struct.unpack("I", f.read(len_rec))[0]
-                    l.append(a)
-                self.ipts.append(l)
-                self.pos += len_rec * 3
+            item = self.cache.get(idx)
+            if item is None:
+                item = self.__derive(self.reader.record(idx))
+                self.cache.put(idx, item)
+            if self.prefetcher is not None:
+                self.prefetcher.notify(idx)
+            return item
         except Exception as e:
             raise
 
-    def __get_ipt_13(self, f):
-        """ IPT_13（オフセット、係数の数、サブ区間数）（月の秤動）取得
-            - 4 byte * 1 * 3
-            - unsigned int (符号なし整数, エンディアンと int のサイズに依存)
+    def __get_records(self, jds, jds2=None):
+        """ COEFF 取得（複数のユリウス日）
+            * ユリウス日を区間（レコード）毎にまとめ、区間毎に 1 回だけ係数を
+              取得する。
 
-        :param file_object f
+        :param  np.ndarray  jds: ユリウス日の配列（N 個）
+        :param  np.ndarray jds2: ユリウス日（jds に加える値）の配列
+                                 （None の場合は加えない）
+        :return list           : [
+                                     [対象のユリウス日のインデックスの配列,
+                                      対象区間のユリウス日（開始、終了）,
+                                      係数],
+                                     ...
+                                 ]（区間毎）
         """
-        len_rec = 4
         try:
-            l = []
-            for i in range(3):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack("I", f.read(len_rec))[0]
-                l.append(a)
-            self.ipts.append(l)
-            self.pos += len_rec * 3
+            days = jds - self.sss[0]
+            if jds2 is not None:
+                days = days + jds2
+            idxs = (days // self.sss[2]).astype(int)
+            order = np.argsort(idxs, kind="stable")
+            idxs_u, pos = np.unique(idxs[order], return_index=True)
+            return [
+                [sel, *self.__get_record(int(idx))]
+                for idx, sel in zip(idxs_u, np.split(order, pos[1:]))
+            ]
         except Exception as e:
             raise
 
-    def __get_cnam_2(self, f):
-        """ CNAM（定数名）取得
-            - 6 byte * 400
-            - ASCII文字列(後続のnull文字やスペースを削除)
-            - self.cnams に追加
+    def __load_prefetch(self, idx):
+        """ COEFF 先読み（レコード番号指定。先読みスレッドから呼び出す）
 
-        :param file_object f
+        :param  int  idx: レコード番号（係数データの先頭を 0 とする）
+        :return list    : [jds, coeffs]
         """
-        len_rec = 6
         try:
-            for i in range(self.ncon - 400):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack(str(len_rec) + "s", f.read(len_rec))[0]
-                self.cnams.append(a.decode("utf-8").rstrip())
-            self.pos += len_rec * 400
+            return self.__derive(self.reader.prefetch(idx))
         except Exception as e:
             raise
 
-    def __get_cval(self, f):
-        """ CVAL（定数値）取得
-            - 8 byte * @ncon
-            - 倍精度浮動小数点数(機種依存)
+    def __set_derived(self, derived):
+        """ 地球・月（太陽系重心基準）の係数の事前計算の設定
+            * 補間の天体番号 16: 地球, 17: 月 とし、 self.ipts_all（IPT に
+              16, 17 の分を追加したもの）にサブ区間数・係数の数を設定する。
+              （サブ区間数は月（地心）、係数の数は地球 - 月の重心と月（地心）
+                の大きい方）
 
-        :param file_object f
+        :param bool derived: 地球・月の係数の事前計算（True: する, False: しない）
         """
-        self.pos = self.KSIZE * self.RECL
-        len_rec = 8
-        self.cvals = []
         try:
-            for i in range(self.ncon):
-                f.seek(self.pos + len_rec * i)
-                a = struct.unpack("d", f.read(len_rec))[0]
-                self.cvals.append(a)
+            ipt_e, ipt_m = self.ipts[2], self.ipts[9]
+            self.derived = derived and ipt_e[1] > 0 and ipt_m[1] > 0 \
+                       and ipt_m[2] % ipt_e[2] == 0
+            self.ipts_all = self.ipts
+            if not self.derived:
+                return
+            n_coef = max(ipt_e[1], ipt_m[1])
+            self.ipts_all = self.ipts + ((0, n_coef, ipt_m[2]), ) * 2
+            self.mats = refit_matrices(n_coef, ipt_m[2] // ipt_e[2])
         except Exception as e:
             raise
 
-    def __get_coeff(self, f):
-        """ COEFF 取得
-            * レコード位置計算
-            * 対象区間のユリウス日（開始、終了）をインスタンス変数(list)
-              self.jds に設定する
-            * 全ての係数の値をインスタンス変数（配列） self.coeffs に設定する
-              （x, y, z やサブ区間毎に分割して格納）
-            * 8 byte * ?
-            * 倍精度浮動小数点数(機種依存)
-            * 最初の2要素は当該データの開始・終了ユリウス日
+    def __derive(self, item):
+        """ 地球・月（太陽系重心基準）の係数の追加（derived=True の場合のみ）
+
+        :param  list item: [jds, coeffs]
+        :return list     : [jds, coeffs + [地球の係数, 月の係数]]
         """
-        idx = (self.jd - self.sss[0]) // self.sss[2]
-        pos = int(self.KSIZE * self.RECL * (2 + idx))
-        recl = 8
-        items = []
-        self.coeffs = []
-        try:
-            for i in range(self.KSIZE // 2):
-                f.seek(pos + recl * i)
-                a = struct.unpack("d", f.read(recl))[0]
-                items.append(a)
-            self.jds = [items.pop(0), items.pop(0)]
-            for i, ipt in enumerate(self.ipts):
-                n = 2 if i == 11 else 3
-                l_1 = []
-                for _ in range(ipt[2]):
-                    l_0 = []
-                    for _ in range(n):
-                        l_0.append(items[:ipt[1]])
-                        items = items[ipt[1]:]
-                    l_1.append(l_0)
-                self.coeffs.append(l_1)
+        try:
+            if not self.derived:
+                return item
+            jds, coeffs = item
+            return [jds, coeffs + derive_earth_moon(
+                coeffs[2], coeffs[9], self.emrat, self.mats
+            )]
         except Exception as e:
             raise
 
@@ -417,117 +1169,759 @@ class EphJpl:
         except Exception as e:
             raise
 
-    def __check_jd(self):
-        """ 引数のユリウス日をチェック """
+    def __check_jd(self, jd):
+        """ 引数のユリウス日をチェック
+            * 期間外の場合は ValueError とする。
+
+        :param float jd: ユリウス日
+        """
+        if jd < self.sss[0] or jd >= self.sss[1]:
+            raise ValueError(
+                "JD must satisfy {} <= JD < {}.".format(*self.sss)
+            )
+
+    def __check_bodies(self, astrs, bary=True):
+        """ 引数の天体番号をチェック
+            * 計算に必要な係数データが無い場合（抽出時の出力対象外等）は
+              ValueError とする。
+
+        :param list astrs: [対象天体番号, 基準天体番号]
+        :param bool  bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
+        """
         try:
-            if self.jd < self.sss[0] or self.jd >= self.sss[1]:
-                print("Please input JD s.t. {} <= JD < {}.".format(*self.sss))
-                sys.exit(0)
+            ks = [astrs[0]] if astrs[0] > 13 else list(astrs)
+            if not bary and astrs[0] <= 13:
+                ks.append(11)
+            for k in ks:
+                if not 1 <= k <= 15:
+                    continue
+                if not all(
+                    self.__has_coeff(astr) for astr in self.__get_astrs(k)
+                ):
+                    raise ValueError(
+                        "No coefficients for body {} in {}.".format(
+                            k, self.file_bin
+                        )
+                    )
         except Exception as e:
             raise
 
-    def __get_list(self):
+    def __get_list(self, astrs):
         """ 計算対象フラグ一覧取得
-            * チェビシェフ多項式による計算が必要な天体の一覧をインスタンス変数
-              （リスト） self.flags に設定する
-            * 配列の並び順（係数データの並び順から「太陽」を除外した13個）
-              self.flags = [
+            * チェビシェフ多項式による計算が必要な天体の一覧を返す
+            * 配列の並び順（係数データの並び順から「太陽」を除外した12個）
+              flags = [
                   水星, 金星, 地球 - 月の重心, 火星, 木星, 土星, 天王星, 海王星,
                   冥王星, 月（地心）, 地球の章動, 月の秤動
               ]
+
+        :param  list  astrs: [対象天体番号, 基準天体番号]
+        :return list  flags: 計算対象フラグ一覧
         """
+        flags = [0 for _ in range(12)]
         try:
-            if self.astrs[0] == 14:
+            if astrs[0] == 14:
                 if self.ipts[11][1] > 0:
-                    self.flags[10] = self.KIND
-                return
-            if self.astrs[0] == 15:
+                    flags[10] = self.KIND
+                return flags
+            if astrs[0] == 15:
                 if self.ipts[12][1] > 0:
-                    self.flags[11] = self.KIND
-            for k in self.astrs:
+                    flags[11] = self.KIND
+            for k in astrs:
                 if k <= 10:
-                    self.flags[k - 1] = self.KIND
+                    flags[k - 1] = self.KIND
                 if k == 10:
-                    self.flags[2] = self.KIND
+                    flags[2] = self.KIND
                 if k ==  3:
-                    self.flags[9] = self.KIND
+                    flags[9] = self.KIND
                 if k == 13:
-                    self.flags[2] = self.KIND
+                    flags[2] = self.KIND
+            return flags
         except Exception as e:
             raise
 
-    def __interpolate(self, astr):
+    def __interpolate(self, astr, jd, jds, coeffs, km, kind, basis=None,
+                      jd2=0.0):
         """ 補間
             * 使用するチェビシェフ多項式の係数は、
             * 天体番号が 1 〜 13 の場合は、 x, y, z の位置・速度（6要素）、
               天体番号が 14 の場合は、 Δψ, Δε の角位置・角速度（4要素）、
-              天体番号が 15 の場合は、 φ, θ, ψ の角位置・角速度（6要素）。
+              天体番号が 15 の場合は、 φ, θ, ψ の角位置・角速度（6要素）、
+              天体番号が 16, 17 の場合は、地球・月（太陽系重心基準）の
+              x, y, z の位置・速度（6要素）。（derived=True の場合のみ）
             * 天体番号が 12 の場合は、 x, y, z の位置・速度の値は全て 0.0 とする。
+            * kind = 1 の場合は、速度用多項式・速度の計算を行わない。
+            * basis（Dict）を指定した場合は、サブ区間数・係数の数が同じ天体の
+              チェビシェフ多項式の値を共有する。
 
-        :param  int astr: 天体番号
-        :return list pvs: [
-                              x 位置, y 位置, z 位置,
-                              x 速度, y 速度, z 速度
-                          ]
-                          但し、
-                          14（地球の章動）の場合は、
-                          [
-                              Δψ の角位置, Δε の角位置,
-                              Δψ の角速度, Δε の角速度
-                          ]
-                          15（月の秤動）の場合は、
-                          [
-                              φ の角位置, θ の角位置, ψ の角位置,
-                              φ の角速度, θ の角速度, ψ の角速度
-                          ]
-        """
-        pvs = []
-        try:
-            tc, idx_sub = self.__norm_time(astr)
-            n_item = 2 if astr == 14 else 3  # 要素数
+        :param  int   astr: 天体番号
+        :param  float   jd: ユリウス日
+        :param  list   jds: 対象区間のユリウス日（開始、終了）
+        :param  list coeffs: 係数
+        :param  bool    km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param  int   kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        :param  dict basis: (サブ区間数, 係数の数) => [サブ区間のインデックス,
+                            位置用多項式, 速度用多項式] の Dict（省略可）
+        :param  float  jd2: ユリウス日（jd に加える値）
+        :return np.ndarray pvs: [
+                                x 位置, y 位置, z 位置,
+                                x 速度, y 速度, z 速度
+                            ]
+                            但し、
+                            14（地球の章動）の場合は、
+                            [
+                                Δψ の角位置, Δε の角位置,
+                                Δψ の角速度, Δε の角速度
+                            ]
+                            15（月の秤動）の場合は、
+                            [
+                                φ の角位置, θ の角位置, ψ の角位置,
+                                φ の角速度, θ の角速度, ψ の角速度
+                            ]
+        """
+        try:
+            metrics.add_interpolation(astr)
             i_ipt  = astr - 3 if astr > 13 else astr - 1
             i_coef = astr - 3 if astr > 13 else astr - 1
+            n_coef = self.ipts_all[i_ipt][1]
+            key = (self.ipts_all[i_ipt][2], n_coef)
+            if basis is not None and key in basis:
+                idx_sub, ps, vs = basis[key]
+            else:
+                tc, idx_sub = self.__norm_time(astr, jd, jds, jd2)
+                # 位置用多項式
+                ps = np.empty(n_coef)
+                ps[0], ps[1] = 1, tc
+                for i in range(2, n_coef):
+                    ps[i] = 2 * tc * ps[i - 1] - ps[i - 2]
+                # 速度用多項式
+                vs = None
+                if kind == 2:
+                    vs = np.empty(n_coef)
+                    vs[0], vs[1], vs[2] = 0, 1, 2 * 2 * tc
+                    for i in range(3, n_coef):
+                        vs[i] = 2 * tc * vs[i - 1] + 2 * ps[i - 1] - vs[i - 2]
+                if basis is not None:
+                    basis[key] = [idx_sub, ps, vs]
+            coeff = coeffs[i_coef][idx_sub]
             # 位置
-            ps = [1, tc]
-            for _ in range(2, self.ipts[i_ipt][1]):
-                ps.append(2 * tc * ps[-1] - ps[-2])
-            for i in range(n_item):
-                val = 0
-                for j in range(self.ipts[i_ipt][1]):
-                    val += self.coeffs[i_coef][idx_sub][i][j] * ps[j]
-                if not(self.km) and astr < 14:
-                    val /= self.au
-                pvs.append(val)
+            p = coeff.dot(ps)
+            if not(km) and astr not in (14, 15):
+                p /= self.au
+            if kind == 1:
+                return p
             # 速度
-            vs = [0, 1, 2 * 2 * tc]
-            for i in range(3, self.ipts[i_ipt][1]):
-                vs.append(2 * tc * vs[-1] + 2 * ps[i - 1] - vs[-2])
-            for i in range(n_item):
-                val = 0
-                for j in range(self.ipts[i_ipt][1]):
-                    val += self.coeffs[i_coef][idx_sub][i][j] \
-                         * vs[j] * 2 * self.ipts[i_ipt][2] / self.sss[2]
-                if astr < 14:
-                    val /= 86400 if self.km else self.au
-                pvs.append(val)
+            v = coeff.dot(vs) * (2 * self.ipts_all[i_ipt][2] / self.sss[2])
+            if astr not in (14, 15):
+                v /= 86400 if km else self.au
+            return np.concatenate((p, v))
+        except Exception as e:
+            raise
+
+    def __interpolate_v(self, astr, jds, recs, km, kind, jds2=None):
+        """ 補間（複数のユリウス日）
+            * 区間（レコード）毎に取得済みの係数（__get_records() の戻り値）を
+              使用し、サブ区間のインデックス・チェビシェフ時間・多項式は配列で
+              計算する。
+
+        :param  int          astr: 天体番号
+        :param  np.ndarray    jds: ユリウス日の配列（N 個）
+        :param  list         recs: 区間毎の係数（__get_records() の戻り値）
+        :param  bool           km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param  int          kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        :param  np.ndarray   jds2: ユリウス日（jds に加える値）の配列
+                                   （None の場合は加えない）
+        :return np.ndarray    pvs: 位置・速度（形状: N x 要素数 * kind）
+                                   （要素の並びは __interpolate と同じ）
+        """
+        try:
+            metrics.add_interpolation(astr, jds.size)
+            n_item = 2 if astr == 14 else 3  # 要素数
+            i_ipt  = astr - 3 if astr > 13 else astr - 1
+            i_coef = astr - 3 if astr > 13 else astr - 1
+            n_coef, n_sub = self.ipts_all[i_ipt][1], self.ipts_all[i_ipt][2]
+            pvs = np.empty((jds.size, n_item * kind))
+            for sel, jds_rec, coeffs in recs:
+                # サブ区間のインデックス、チェビシェフ時間
+                days = jds[sel] - jds_rec[0]
+                if jds2 is not None:
+                    days = days + jds2[sel]
+                tc = days / self.sss[2]
+                temp = tc * n_sub
+                idx_sub = (temp - tc.astype(int)).astype(int)
+                tc = (temp % 1 + tc.astype(int)) * 2 - 1
+                coeff = coeffs[i_coef][idx_sub]  # 形状: M x 要素数 x 係数の数
+                # 位置
+                ps = np.empty((tc.size, n_coef))
+                ps[:, 0], ps[:, 1] = 1, tc
+                for i in range(2, n_coef):
+                    ps[:, i] = 2 * tc * ps[:, i - 1] - ps[:, i - 2]
+                p = np.einsum("mic,mc->mi", coeff, ps)
+                if not(km) and astr not in (14, 15):
+                    p /= self.au
+                if kind == 1:
+                    pvs[sel] = p
+                    continue
+                # 速度
+                vs = np.empty((tc.size, n_coef))
+                vs[:, 0], vs[:, 1], vs[:, 2] = 0, 1, 2 * 2 * tc
+                for i in range(3, n_coef):
+                    vs[:, i] = 2 * tc * vs[:, i - 1] + 2 * ps[:, i - 1] \
+                             - vs[:, i - 2]
+                v = np.einsum("mic,mc->mi", coeff, vs) \
+                  * (2 * n_sub / self.sss[2])
+                if astr not in (14, 15):
+                    v /= 86400 if km else self.au
+                pvs[sel, :n_item], pvs[sel, n_item:] = p, v
             return pvs
         except Exception as e:
             raise
 
-    def __norm_time(self, astr):
+    def __norm_time(self, astr, jd, jds, jd2=0.0):
         """ チェビシェフ多項式用に時刻を正規化、サブ区間のインデックス算出
 
-        :param  int astr: 天体番号
+        :param  int   astr: 天体番号
+        :param  float   jd: ユリウス日
+        :param  list   jds: 対象区間のユリウス日（開始、終了）
+        :param  float  jd2: ユリウス日（jd に加える値）
         :return list: [チェビシェフ時間, サブ区間のインデックス]
         """
         try:
             idx = astr - 2 if astr > 13 else astr
-            jd_start = self.jds[0]
-            tc = (self.jd - jd_start) / self.sss[2]
-            temp = tc * self.ipts[idx - 1][2]
+            jd_start = jds[0]
+            tc = ((jd - jd_start) + jd2) / self.sss[2]
+            temp = tc * self.ipts_all[idx - 1][2]
             idx = int(temp - int(tc))          # サブ区間のインデックス
             tc = (temp % 1 + int(tc)) * 2 - 1  # チェビシェフ時間
             return [tc, idx]
         except Exception as e:
             raise
 
+
+class EphJplSegments:
+    EXT_MANIFEST = ".txt"  # ファイル一覧（マニフェスト）の拡張子
+
+    def __init__(self, path, max_open=4, **kwargs):
+        """ Initialization
+            * 期間毎に分割した複数のバイナリファイル（またはディレクトリ）を
+              1 つのエフェメリスとして扱う。
+            * インスタンス化時は各ファイルのヘッダ部のみを読み込み、
+              開始ユリウス日でソートした期間の索引（self.index）を作成する。
+            * 計算時はユリウス日から該当するファイルを二分探索で求め、
+              そのファイルの EphJplSession で計算する。
+              （EphJplSession は初めて使用する時に生成し、同時に開いておく数は
+                max_open 個までとする。超えた場合は、使用中でないもので
+                最も長く使用していないものを閉じる）
+            * 期間が重複する場合は、開始ユリウス日が早いものを使用する。
+            * ヘッダ部の値（SS 以外）は最初のファイルの値とし、 AU, EMRAT,
+              NUMDE が異なるファイルを含む場合は ValueError とする。
+
+        :param string path: ディレクトリ、またはファイル一覧（.txt）のフルパス
+        :param int max_open: 同時に開いておくファイルの最大数
+        :param dict  kwargs: EphJplSession の引数（cache_size, prefetch 等）
+        """
+        self.file_bin = path
+        self.max_open = max(max_open, 1)
+        self.kwargs = kwargs
+        self.sessions = collections.OrderedDict()  # 索引の番号 => [session, 使用数]
+        self.lock = threading.Lock()
+        self.is_closed = False
+        try:
+            index = []
+            for file_seg in list_segments(path):
+                if os.path.isdir(file_seg):
+                    reader = EphJplCol(file_seg)
+                    h = reader.header
+                    reader.close()
+                else:
+                    with open(file_seg, "rb") as f:
+                        h = read_header(f)
+                    metrics.add("opens")
+                index.append((h.sss[0], h.sss[1], file_seg, h))
+            if not index:
+                raise ValueError("No ephemeris files in {}.".format(path))
+            index.sort(key=lambda x: x[0])
+            h = index[0][3]
+            for _, _, file_seg, h_seg in index:
+                if (h_seg.au, h_seg.emrat, h_seg.numde) != \
+                   (h.au, h.emrat, h.numde):
+                    raise ValueError(
+                        "Inconsistent header in {}.".format(file_seg)
+                    )
+            self.index = [x[0:3] for x in index]
+            self.jds_s = np.array([x[0] for x in index])
+            self.jds_e = np.array([x[1] for x in index])
+            self.header = h._replace(
+                sss=(float(self.jds_s.min()), float(self.jds_e.max()), h.sss[2])
+            )
+            h = self.header
+            self.ttl, self.cnams, self.sss   = h.ttl,  h.cnams, h.sss
+            self.ncon, self.au,   self.emrat = h.ncon, h.au,    h.emrat
+            self.ipts, self.numde, self.cvals = h.ipts, h.numde, h.cvals
+            self.consts, self.jdepoc = h.consts, h.cvals[4]
+        except Exception as e:
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self.is_closed
+
+    def close(self):
+        """ 全ファイルのクローズ """
+        try:
+            with self.lock:
+                for session, _ in self.sessions.values():
+                    session.close()
+                self.sessions.clear()
+                self.is_closed = True
+        except Exception as e:
+            raise
+
+    def state(self, target, center, jd, bary=True, km=False,
+              kind=EphJplSession.KIND, jd2=0.0):
+        """ 対象天体の基準天体に対する位置・速度の計算
+            * 引数・戻り値は EphJplSession.state() と同じ。
+        """
+        try:
+            i = self.__find(jd + jd2)
+            session = self.__acquire(i)
+            try:
+                return session.state(target, center, jd, bary, km, kind, jd2)
+            finally:
+                self.__release(i)
+        except Exception as e:
+            raise
+
+    def states(self, target, center, jds, bary=True, km=False,
+               kind=EphJplSession.KIND, jds2=None):
+        """ 対象天体の基準天体に対する位置・速度の計算（複数のユリウス日）
+            * ユリウス日をファイル毎にまとめて EphJplSession.states() で
+              計算する。
+            * 引数・戻り値は EphJplSession.states() と同じ。
+        """
+        rrds = None
+        try:
+            jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+            if jds2 is not None:
+                jds2 = np.broadcast_to(
+                    np.asarray(jds2, dtype=np.float64), jds.shape
+                )
+            jds_all = jds if jds2 is None else jds + jds2
+            idxs = np.array([self.__find(jd) for jd in jds_all], dtype=int)
+            for i in np.unique(idxs):
+                mask = idxs == i
+                session = self.__acquire(int(i))
+                try:
+                    rrds_seg = session.states(
+                        target, center, jds[mask], bary, km, kind,
+                        None if jds2 is None else jds2[mask]
+                    )
+                finally:
+                    self.__release(int(i))
+                if rrds is None:
+                    rrds = np.empty((jds.size, rrds_seg.shape[1]))
+                rrds[mask] = rrds_seg
+            if rrds is None:
+                rrds = np.empty((0, 3 * kind))
+            return rrds
+        except Exception as e:
+            raise
+
+    def state_all(self, jd, bodies=None, km=False, kind=EphJplSession.KIND,
+                  jd2=0.0):
+        """ 全天体（または指定の天体）の太陽系重心に対する位置・速度の計算
+            * 引数・戻り値は EphJplSession.state_all() と同じ。
+        """
+        try:
+            i = self.__find(jd + jd2)
+            session = self.__acquire(i)
+            try:
+                return session.state_all(jd, bodies, km, kind, jd2)
+            finally:
+                self.__release(i)
+        except Exception as e:
+            raise
+
+    def bodies(self):
+        """ 計算可能な天体番号の一覧（最初のファイルの値）
+
+        :return list: 天体番号（1 - 15）のリスト
+        """
+        try:
+            session = self.__acquire(0)
+            try:
+                return session.bodies()
+            finally:
+                self.__release(0)
+        except Exception as e:
+            raise
+
+    def __find(self, jd):
+        """ ユリウス日を含むファイル（索引の番号）の検索
+            * 該当するファイルが無い場合は、ユリウス日と各ファイルの期間を
+              示して ValueError とする。
+
+        :param  float jd: ユリウス日
+        :return int    i: 索引の番号
+        """
+        try:
+            i = int(np.searchsorted(self.jds_s, jd, side="right")) - 1
+            if i < 0 or jd >= self.jds_e[i]:
+                raise ValueError(
+                    "No ephemeris file for JD {}. (Covered: {})".format(
+                        jd, ", ".join(
+                            "{} <= JD < {}".format(jd_s, jd_e)
+                            for jd_s, jd_e in zip(self.jds_s, self.jds_e)
+                        )
+                    )
+                )
+            return i
+        except Exception as e:
+            raise
+
+    def __acquire(self, i):
+        """ ファイルの EphJplSession の取得（使用数を加算）
+            * 開いていない場合は生成し、開いている数が max_open を超える場合は
+              使用中でないもので最も長く使用していないものを閉じる。
+
+        :param  int            i: 索引の番号
+        :return EphJplSession session
+        """
+        try:
+            with self.lock:
+                item = self.sessions.get(i)
+                if item is None:
+                    item = [EphJplSession(self.index[i][2], **self.kwargs), 0]
+                    self.sessions[i] = item
+                self.sessions.move_to_end(i)
+                item[1] += 1
+                for j in list(self.sessions.keys()):
+                    if len(self.sessions) <= self.max_open:
+                        break
+                    if self.sessions[j][1] == 0:
+                        self.sessions.pop(j)[0].close()
+                return item[0]
+        except Exception as e:
+            raise
+
+    def __release(self, i):
+        """ ファイルの EphJplSession の使用終了（使用数を減算）
+
+        :param int i: 索引の番号
+        """
+        with self.lock:
+            self.sessions[i][1] -= 1
+
+
+class EphJpl:
+    KIND = EphJplSession.KIND
+    KSIZE = EphJplSession.KSIZE
+    RECL  = EphJplSession.RECL
+
+    def __init__(self, file_bin, target, center, jd, bary=True, km=False,
+                 kind=KIND):
+        """ Initialization
+            * 後方互換用のラッパー。
+              ヘッダ部の読み込みは get_session() で共有する EphJplSession に
+              任せるので、同一ファイルに対する 2 回目以降のインスタンス化では
+              ファイルのオープン・ヘッダ部の解析は行わない。
+
+        :param string file_bin: バイナリファイルのフルパス
+        :param int      target: 対象天体番号
+        :param int      center: 基準天体番号
+        :param float        jd: ユリウス日
+        :param bool       bary: 基準フラグ(True: 太陽系重心が基準, False: 太陽が基準)
+        :param bool         km: 単位フラグ(True: km, km/sec, False: AU, AU/day)
+        :param int        kind: 計算区分（1: 位置のみ計算、2: 位置・速度を計算）
+        """
+        self.file_bin = file_bin
+        self.astrs = [target, center]
+        self.jd, self.bary, self.km, self.kind = jd, bary, km, kind
+        self.session = get_session(file_bin)
+        # ヘッダ部の値（後方互換用）
+        self.ttl,   self.cnams, self.sss = \
+            self.session.ttl, self.session.cnams, self.session.sss
+        self.ncon,  self.au,    self.emrat = \
+            self.session.ncon, self.session.au, self.session.emrat
+        self.ipts,  self.numde, self.cvals = \
+            self.session.ipts, self.session.numde, self.session.cvals
+        self.consts, self.jdepoc = self.session.consts, self.session.jdepoc
+
+    def calc(self):
+        """ Calculation """
+        try:
+            return self.session.state(
+                *self.astrs, self.jd, self.bary, self.km, self.kind
+            )
+        except Exception as e:
+            raise
+
+
+def read_header(f, ksize=EphJplBin.KSIZE, recl=EphJplBin.RECL):
+    """ ヘッダ部（先頭 2 レコード）の読み込み・解析
+        * 先頭 2 レコード（ksize * recl byte * 2）を 1 回で読み込み、
+          struct.Struct で一括して解析する。
+        * TTL, CNAM は ASCII 文字列(後続のスペースを削除)。
+        * CNAM は 400 個を超える分(NCON - 400 個)が IPT_13 の後に続く。
+        * CVAL は第2レコードの先頭から 8 byte * NCON。
+          （レコードのサイズは IPT, NCON から calc_ksize() で求める。
+            読み込み済みの範囲に収まらない場合のみ、追加で読み込む）
+
+    :param  file_object    f: バイナリファイル
+    :param  int        ksize: バイナリファイル読み込み用（最初に読み込むサイズ）
+    :param  int         recl: バイナリファイル読み込み用
+    :return EphJplHeader
+    """
+    try:
+        f.seek(0)
+        buf = f.read(ksize * recl * 2)
+        metrics.add("seeks")
+        metrics.add("bytes_read", len(buf))
+        items = HEADER_1.unpack_from(buf, 0)
+        ttl, cnam = items[0], items[1]
+        sss = items[2:5]
+        ncon, au, emrat = items[5:8]
+        ipts = [tuple(items[i:i + 3]) for i in range(8, 44, 3)]
+        numde = items[44]
+        ipts.append(tuple(items[45:48]))
+        cnam += buf[HEADER_1.size:HEADER_1.size + LEN_CNAM * (ncon - 400)]
+        cnams = tuple(
+            cnam[i:i + LEN_CNAM].decode("utf-8").rstrip()
+            for i in range(0, LEN_CNAM * ncon, LEN_CNAM)
+        )
+        ksize = calc_ksize(ipts, ncon)
+        if len(buf) < ksize * recl + 8 * ncon:
+            f.seek(ksize * recl)
+            buf = bytes(ksize * recl) + f.read(8 * ncon)
+            metrics.add("seeks")
+            metrics.add("bytes_read", 8 * ncon)
+        cvals = struct.unpack_from("={}d".format(ncon), buf, ksize * recl)
+        return EphJplHeader(
+            ttl="\n".join(
+                ttl[i:i + LEN_TTL].decode("utf-8").rstrip()
+                for i in range(0, LEN_TTL * 3, LEN_TTL)
+            ),
+            cnams=cnams, sss=tuple(sss), ncon=ncon, au=au, emrat=emrat,
+            ipts=tuple(ipts), numde=numde, cvals=cvals,
+            consts=types.MappingProxyType(dict(zip(cnams, cvals))),
+            ksize=ksize
+        )
+    except Exception as e:
+        raise
+
+def pack_header(h, recl=EphJplBin.RECL):
+    """ ヘッダ部（先頭 2 レコード）の作成（read_header() の逆）
+        * ヘッダ部の h.ksize で 2 レコード分の byte 列を作成する。
+          （余りは 0 で埋める）
+
+    :param  EphJplHeader h: ヘッダ部
+    :param  int       recl: バイナリファイル読み込み用
+    :return bytes      buf: 先頭 2 レコード
+    """
+    try:
+        len_rec = h.ksize * recl
+        buf = bytearray(len_rec * 2)
+        ttl = b"".join(
+            l.encode("utf-8").ljust(LEN_TTL)[:LEN_TTL]
+            for l in (h.ttl.split("\n") + ["", "", ""])[0:3]
+        )
+        cnam = b"".join(
+            c.encode("utf-8").ljust(LEN_CNAM)[:LEN_CNAM] for c in h.cnams
+        ).ljust(LEN_CNAM * 400)
+        ipts = [a for ipt in h.ipts[0:12] for a in ipt]
+        HEADER_1.pack_into(
+            buf, 0, ttl, cnam[0:LEN_CNAM * 400], *h.sss, h.ncon, h.au,
+            h.emrat, *ipts, h.numde, *h.ipts[12]
+        )
+        cnam_2 = cnam[LEN_CNAM * 400:]
+        buf[HEADER_1.size:HEADER_1.size + len(cnam_2)] = cnam_2
+        struct.pack_into("={}d".format(h.ncon), buf, len_rec, *h.cvals)
+        return bytes(buf)
+    except Exception as e:
+        raise
+
+def calc_ksize(ipts, ncon):
+    """ 1 レコードのサイズ（4 byte 単位）の計算
+        * 係数データ（区間のユリウス日 2 個 + IPT で示される係数）、
+          第1レコード（ヘッダ部の固定長部分 + NCON - 400 個の CNAM）、
+          第2レコード（NCON 個の CVAL）のうち最大のもの。
+          （DE430 の場合は 2036）
+        * 係数の数が 0 の天体（抽出時の出力対象外等）は除く。
+
+    :param  list ipts: IPT（オフセット、係数の数、サブ区間数）
+    :param  int  ncon: NCON（定数の数）
+    :return int      : 1 レコードのサイズ（4 byte 単位）
+    """
+    try:
+        n_data = 2
+        for i, ipt in enumerate(ipts):
+            if ipt[1] == 0:
+                continue
+            n_comp = 2 if i == 11 else 3
+            n_data = max(n_data, ipt[0] - 1 + ipt[1] * n_comp * ipt[2])
+        len_head = HEADER_1.size + LEN_CNAM * max(ncon - 400, 0)
+        n_head = max(-(-len_head // 8), ncon)
+        return 2 * max(n_data, n_head)
+    except Exception as e:
+        raise
+
+_sessions = {}  # バイナリファイルのフルパスと EphJplSession の Dict
+_sessions_lock = threading.Lock()  # _sessions の排他用
+
+
+def refit_matrices(n_coef, ratio):
+    """ サブ区間の分割用のチェビシェフ多項式の係数の変換行列
+        * 1 個のサブ区間を ratio 個に等分した各区間で、元のチェビシェフ多項式と
+          同じ多項式を表す係数への変換行列（n_coef x n_coef）を求める。
+        * 各区間のチェビシェフ点（n_coef 個）での元の多項式の値から係数を
+          求める（補間する）。次数が n_coef - 1 以下の多項式は丸め誤差を除き
+          厳密に一致する。
+
+    :param  int        n_coef: 係数の数
+    :param  int         ratio: 分割数
+    :return np.ndarray   mats: 変換行列（形状: ratio x n_coef x n_coef）
+                               （分割後の係数 = mats[q] @ 元の係数）
+    """
+    try:
+        xs = np.cos(np.pi * (np.arange(n_coef) + 0.5) / n_coef)
+        v = np.polynomial.chebyshev.chebvander(xs, n_coef - 1)
+        mats = np.empty((ratio, n_coef, n_coef))
+        for q in range(ratio):
+            ts = -1 + (2 * q + 1 + xs) / ratio  # 元のサブ区間でのチェビシェフ時間
+            w = np.polynomial.chebyshev.chebvander(ts, n_coef - 1)
+            mats[q] = np.linalg.solve(v, w)
+        return mats
+    except Exception as e:
+        raise
+
+def derive_earth_moon(coeff_emb, coeff_moon, emrat, mats):
+    """ 地球・月（太陽系重心基準）のチェビシェフ多項式の係数の計算
+        * チェビシェフ多項式は係数について線形なので、
+            地球 = 地球 - 月の重心 - 月（地心） / (1 + EMRAT)
+            月   = 地球 + 月（地心）
+          を係数で計算する。
+        * 地球 - 月の重心（DE430 の場合はサブ区間数 2）の係数は、 mats で
+          月（地心）（同 8）のサブ区間毎の係数に変換してから計算する。
+          （係数の数が異なる場合は、少ない方を 0 で埋める）
+
+    :param  np.ndarray coeff_emb: 地球 - 月の重心の係数
+                                  （形状: サブ区間数 x 3 x 係数の数）
+    :param  np.ndarray coeff_moon: 月（地心）の係数（形状は同上）
+    :param  float          emrat: EMRAT（地球と月の質量比）
+    :param  np.ndarray      mats: 変換行列（refit_matrices() で作成）
+    :return list                : [地球の係数, 月の係数]
+                                  （形状: 月のサブ区間数 x 3 x 係数の数）
+    """
+    try:
+        ratio, n_coef = mats.shape[0], mats.shape[1]
+        n_sub = coeff_moon.shape[0]
+        c_e = np.zeros((coeff_emb.shape[0], 3, n_coef))
+        c_m = np.zeros((n_sub, 3, n_coef))
+        c_e[..., :coeff_emb.shape[2]] = coeff_emb
+        c_m[..., :coeff_moon.shape[2]] = coeff_moon
+        subs = np.arange(n_sub)
+        c_e = np.einsum("sij,scj->sci", mats[subs % ratio], c_e[subs // ratio])
+        c_earth = c_e - c_m / (1.0 + emrat)
+        return [c_earth, c_earth + c_m]
+    except Exception as e:
+        raise
+
+def is_segmented(path):
+    """ 分割したエフェメリス（EphJplSegments）の判定
+        * 天体毎に分割した係数データ（header.json）を含まないディレクトリ、
+          またはファイル一覧（拡張子 .txt）の場合は True
+
+    :param  string path: バイナリファイル（またはディレクトリ等）のフルパス
+    :return bool
+    """
+    try:
+        if os.path.isdir(path):
+            return not os.path.exists(
+                os.path.join(path, EphJplCol.FILE_HEADER)
+            )
+        return path.endswith(EphJplSegments.EXT_MANIFEST)
+    except Exception as e:
+        raise
+
+def list_segments(path):
+    """ 分割したエフェメリスのファイルの一覧
+        * ディレクトリの場合は、直下のファイル（"." で始まるもの、ファイル一覧
+          を除く）と、天体毎に分割した係数データのディレクトリ。
+        * ファイル一覧の場合は、各行のフルパス（空行、 "#" で始まる行を除く。
+          相対パスはファイル一覧のディレクトリからのパス）。
+
+    :param  string path: ディレクトリ、またはファイル一覧のフルパス
+    :return list  files: ファイルのフルパスの一覧
+    """
+    files = []
+    try:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                file_seg = os.path.join(path, name)
+                if name.startswith(".") or \
+                   name.endswith(EphJplSegments.EXT_MANIFEST):
+                    continue
+                if os.path.isfile(file_seg) or os.path.exists(
+                    os.path.join(file_seg, EphJplCol.FILE_HEADER)
+                ):
+                    files.append(file_seg)
+            return files
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line == "" or line.startswith("#"):
+                    continue
+                files.append(os.path.join(os.path.dirname(path), line))
+        return files
+    except Exception as e:
+        raise
+
+def get_session(file_bin, cache_size=8, prefetch=0, pread=False,
+                derived=False):
+    """ 共有 EphJplSession の取得
+        * バイナリファイル毎に 1 つの EphJplSession を生成・保持する。
+        * 分割したエフェメリス（is_segmented() が True）の場合は、
+          EphJplSegments を生成・保持する。（各ファイルの EphJplSession に
+          cache_size 等を指定する）
+
+    :param  string        file_bin: バイナリファイルのフルパス
+    :param  int         cache_size: キャッシュする区間の最大数（生成時のみ有効）
+    :param  int           prefetch: 先読みする区間の数（生成時のみ有効）
+    :param  bool             pread: 読み込み方法（生成時のみ有効）
+    :param  bool           derived: 地球・月の係数の事前計算（生成時のみ有効）
+    :return EphJplSession session: （または EphJplSegments）
+    """
+    try:
+        key = os.path.abspath(file_bin)
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None or session.closed:
+                if is_segmented(file_bin):
+                    session = EphJplSegments(
+                        file_bin, cache_size=cache_size, prefetch=prefetch,
+                        pread=pread, derived=derived
+                    )
+                else:
+                    session = EphJplSession(
+                        file_bin, cache_size, prefetch, pread, derived
+                    )
+                _sessions[key] = session
+            return session
+    except Exception as e:
+        raise
+
+def close_sessions():
+    """ 共有 EphJplSession を全てクローズ """
+    try:
+        with _sessions_lock:
+            for session in _sessions.values():
+                session.close()
+            _sessions.clear()
+    except Exception as e:
+        raise
@@ -0,0 +1,218 @@
+"""
+Modules for JPL Ephemeris (ASCII -> binary).
+
+* JPL 提供の ASCII 形式のデータ（header.4xx, ascpYYYY.4xx）を、
+  EphJpl（EphJplSession）で使用するバイナリ形式（JPLEPH）に変換する。
+  （JPL 提供の FORTRAN プログラム "asc2eph.f" を参考にした）
+  - header.4xx : GROUP 1010（TTL）, 1030（SS）, 1040（CNAM）, 1041（CVAL）,
+                 1050（IPT）, 1070（データ開始）
+  - ascpYYYY.4xx: レコード番号・係数の数の行に続いて、 1 行 3 個の係数
+                 （指数部は "D"）
+* データファイルは 1 行ずつ読み込み、 1 区間（レコード）毎にバイナリファイルに
+  書き込む。（全係数をメモリに展開しない）
+* 連続するデータファイルの重複する区間（前のファイルの最後の区間と
+  次のファイルの最初の区間）は 1 回のみ出力する。
+* SS（開始・終了ユリウス日）は、出力した区間に合わせる。
+  （CVAL 中の開始・終了ユリウス日（START, FINAL）も SS に合わせる）
+"""
+import numpy as np
+import os
+import re
+import sys
+import types
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import eph_jpl as ljpl
+
+
+def convert(file_header, files_data, file_bin, jd_s=None, jd_e=None):
+    """ ASCII 形式 -> バイナリ形式
+        * ヘッダ部は仮の SS で書き込み、全区間の書き込み後に実際の SS で
+          書き直す。
+        * 区間の連続性（開始ユリウス日 = 前の区間の終了ユリウス日）、
+          区間の日数、係数の数を確認し、不正な場合は ValueError とする。
+
+    :param  string file_header: ヘッダファイル（header.4xx）のフルパス
+    :param  list    files_data: データファイル（ascpYYYY.4xx）のフルパスの一覧
+                                （時刻順）
+    :param  string    file_bin: 出力ファイルのフルパス
+    :param  float         jd_s: 開始ユリウス日（省略時はデータの先頭から）
+    :param  float         jd_e: 終了ユリウス日（省略時はデータの最後まで）
+    :return int          n_rec: 区間（レコード）数
+    """
+    n_rec, jd_0, jd_1 = 0, None, None
+    try:
+        h, ncoeff = read_header(file_header)
+        step = h.sss[2]
+        rec = np.zeros(h.ksize // 2, dtype=np.float64)
+        with open(file_bin, "wb") as f:
+            f.write(ljpl.pack_header(h))
+            for file_data in files_data:
+                for coeffs in read_records(file_data, ncoeff):
+                    if jd_1 is not None and coeffs[1] <= jd_1:
+                        continue
+                    if jd_s is not None and coeffs[1] <= jd_s:
+                        continue
+                    if jd_e is not None and coeffs[0] >= jd_e:
+                        break
+                    if jd_1 is not None and coeffs[0] != jd_1:
+                        raise ValueError(
+                            "Records are not continuous at JD {}. ({})".format(
+                                jd_1, file_data
+                            )
+                        )
+                    if coeffs[1] - coeffs[0] != step:
+                        raise ValueError(
+                            "Invalid record span at JD {}. ({})".format(
+                                coeffs[0], file_data
+                            )
+                        )
+                    rec[0:ncoeff] = coeffs
+                    f.write(rec.tobytes())
+                    if jd_0 is None:
+                        jd_0 = coeffs[0]
+                    jd_1 = coeffs[1]
+                    n_rec += 1
+            if n_rec == 0:
+                raise ValueError("No records in the range.")
+            f.seek(0)
+            f.write(ljpl.pack_header(set_range(h, jd_0, jd_1)))
+        return n_rec
+    except Exception as e:
+        raise
+
+def read_header(file_header):
+    """ ヘッダファイル（header.4xx）の読み込み・解析
+        * AU, EMRAT, NUMDE は CVAL の AU, EMRAT, DENUM の値とする。
+        * 1 レコードのサイズは IPT, NCON から eph_jpl.calc_ksize() で求め、
+          ヘッダファイルの KSIZE と異なる場合は ValueError とする。
+        * 必要な GROUP（1010, 1030, 1040, 1041, 1050）が無い（または空の）
+          場合は ValueError とする。
+
+    :param  string file_header: ヘッダファイルのフルパス
+    :return EphJplHeader     h: ヘッダ部
+    :return int         ncoeff: データファイルの 1 区間の係数の数（NCOEFF）
+    """
+    groups, group = {}, None
+    try:
+        with open(file_header) as f:
+            line = f.readline()
+            m = re.search(r"KSIZE=\s*(\d+)\s+NCOEFF=\s*(\d+)", line)
+            if m is None:
+                raise ValueError("No KSIZE/NCOEFF in {}.".format(file_header))
+            ksize, ncoeff = int(m.group(1)), int(m.group(2))
+            for line in f:
+                m = re.search(r"^GROUP\s+(\d+)", line)
+                if m is not None:
+                    group = int(m.group(1))
+                    groups[group] = []
+                elif group is not None and line.strip() != "":
+                    groups[group].append(line.rstrip("\n"))
+        for group in (1010, 1030, 1040, 1041, 1050):
+            if not groups.get(group):
+                raise ValueError(
+                    "No GROUP {} in {}.".format(group, file_header)
+                )
+        ttl = "\n".join(l.strip() for l in groups[1010][0:3])
+        sss = tuple(to_float(v) for v in " ".join(groups[1030]).split())
+        ncon = int(groups[1040][0].split()[0])
+        cnams = tuple(" ".join(groups[1040][1:]).split())
+        cvals = tuple(
+            to_float(v) for v in " ".join(groups[1041][1:]).split()
+        )[0:ncon]
+        if len(cnams) != ncon or len(cvals) != ncon:
+            raise ValueError("Invalid NCON in {}.".format(file_header))
+        rows = [[int(v) for v in l.split()] for l in groups[1050]]
+        ipts = [tuple(ipt) for ipt in zip(*rows)]
+        ipts += [(0, 0, 0) for _ in range(13 - len(ipts))]
+        consts = dict(zip(cnams, cvals))
+        h = ljpl.EphJplHeader(
+            ttl=ttl, cnams=cnams, sss=sss[0:3], ncon=ncon,
+            au=consts.get("AU", 0.0), emrat=consts.get("EMRAT", 0.0),
+            ipts=tuple(ipts), numde=int(consts.get("DENUM", 0)),
+            cvals=cvals, consts=types.MappingProxyType(consts),
+            ksize=ljpl.calc_ksize(ipts, ncon)
+        )
+        if h.ksize != ksize or ncoeff * 2 > ksize:
+            raise ValueError(
+                "Invalid KSIZE {} (expected {}) in {}.".format(
+                    ksize, h.ksize, file_header
+                )
+            )
+        return h, ncoeff
+    except Exception as e:
+        raise
+
+def read_records(file_data, ncoeff):
+    """ データファイル（ascpYYYY.4xx）の読み込み（1 区間ずつ返すジェネレータ）
+        * レコード番号が 1 から連続していること、係数の数が NCOEFF である
+          ことを確認し、不正な場合は ValueError とする。
+
+    :param  string    file_data: データファイルのフルパス
+    :param  int          ncoeff: 1 区間の係数の数（NCOEFF）
+    :return np.ndarray   coeffs: 1 区間の係数（先頭 2 個は開始・終了ユリウス日）
+                                 （同じ配列を書き換えて返すので、保持する場合は
+                                   コピーすること）
+    """
+    coeffs = np.zeros(ncoeff, dtype=np.float64)
+    n_line = -(-ncoeff // 3)  # 1 区間の係数の行数
+    n_rec = 0
+    try:
+        with open(file_data) as f:
+            for line in f:
+                items = line.split()
+                if not items:
+                    continue
+                n_rec += 1
+                if len(items) != 2 or int(items[0]) != n_rec or \
+                   int(items[1]) != ncoeff:
+                    raise ValueError(
+                        "Invalid record header '{}' (record {}) in {}.".format(
+                            line.strip(), n_rec, file_data
+                        )
+                    )
+                i = 0
+                for _ in range(n_line):
+                    vals = f.readline().split()
+                    n = min(len(vals), ncoeff - i)
+                    if len(vals) != 3:
+                        raise ValueError(
+                            "Unexpected end of record {} in {}.".format(
+                                n_rec, file_data
+                            )
+                        )
+                    coeffs[i:i + n] = [to_float(v) for v in vals[0:n]]
+                    i += n
+                yield coeffs
+    except Exception as e:
+        raise
+
+def set_range(h, jd_0, jd_1):
+    """ ヘッダ部の SS（開始・終了ユリウス日）の変更
+        * CVAL 中の開始・終了ユリウス日（START, FINAL）も SS に合わせる。
+
+    :param  EphJplHeader h: ヘッダ部
+    :param  float     jd_0: 開始ユリウス日
+    :param  float     jd_1: 終了ユリウス日
+    :return EphJplHeader
+    """
+    try:
+        consts = dict(h.consts)
+        if "START" in consts:
+            consts["START"] = jd_0
+        if "FINAL" in consts:
+            consts["FINAL"] = jd_1
+        cvals = tuple(consts.get(c, v) for c, v in zip(h.cnams, h.cvals))
+        return h._replace(
+            sss=(jd_0, jd_1, h.sss[2]), cvals=cvals,
+            consts=types.MappingProxyType(dict(zip(h.cnams, cvals)))
+        )
+    except Exception as e:
+        raise
+
+def to_float(s):
+    """ FORTRAN 形式（指数部が "D"）の数値文字列 -> float
+
+    :param  string s: 数値文字列
+    :return float
+    """
+    return float(s.replace("D", "E").replace("d", "e"))
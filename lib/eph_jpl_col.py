@@ -0,0 +1,171 @@
+"""
+Modules for JPL Ephemeris (columnar layout).
+
+* JPLEPH（JPL の DE430 バイナリデータ）を天体毎に分割した係数データに変換する。
+  - header.json   : ヘッダ部（TTL, CNAM, SS, NCON, AU, EMRAT, IPT, NUMDE, CVAL）
+  - jds.npy       : 区間のユリウス日（開始、終了）（形状: 区間数 x 2）
+  - body_NN.npy   : 係数（NN は係数データの並び順 01 - 13）
+                    （形状: 区間数 x サブ区間数 x 要素数 x 係数の数）
+* 変換後のディレクトリは eph_jpl.EphJplSession（EphJpl）にそのまま指定でき、
+  天体毎の .npy は、その天体を初めて参照した時に個別に mmap される。
+  （月のみ、太陽のみ等の計算では、対象天体の係数のみを参照する）
+* dtype="f4" を指定すると、係数を単精度（float32）で保存する。
+  （ファイルサイズ・メモリ使用量は倍精度の半分。暦の計算（太陽黄経の整数度、
+    朔の日付等）用）
+  - チェビシェフ多項式の値は |T_n| <= 1 なので、位置の誤差の上限は
+    係数の丸め誤差の絶対値の和となる。これを天体毎に全区間で求め、
+    header.json の "errors"（係数データの番号 => 誤差の上限）に保存する。
+    （単位は km。 12: 地球の章動, 13: 月の秤動 は rad）
+    係数の相対誤差は 2^-24（約 6e-8）以下なので、例えば DE430 の
+    地球 - 月の重心（係数の大きさ約 1.5e8 km）で十数 km、月（地心）
+    （約 4e5 km）で数十 m 程度となる。
+  - measure() で、倍精度の JPLEPH との差を実際に計算して確認できる。
+"""
+import json
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import eph_jpl as ljpl
+
+
+def convert(file_bin, dir_col, bodies=None, dtype="f8"):
+    """ JPLEPH -> 天体毎の係数データ
+        * 1 区間（レコード）ずつ読み込み、 np.lib.format.open_memmap で
+          作成した .npy に書き込む。（全係数をメモリに展開しない）
+        * dtype="f4" の場合は、係数の丸め誤差による位置の誤差の上限を
+          天体毎に求め、 header.json に保存する。
+
+    :param  string file_bin: バイナリファイルのフルパス
+    :param  string  dir_col: 出力ディレクトリのフルパス
+    :param  list     bodies: 出力対象の係数データの番号（1 - 13）の一覧
+                             （省略時は全て）
+    :param  string    dtype: 係数の型（"f8": 倍精度, "f4": 単精度）
+    :return int       n_rec: 区間（レコード）数
+    """
+    errors = {}
+    try:
+        os.makedirs(dir_col, exist_ok=True)
+        with ljpl.EphJplBin(file_bin) as reader:
+            h = reader.header
+            if bodies is None:
+                bodies = range(1, len(h.ipts) + 1)
+            n_rec = reader.n_rec
+            jds = np.lib.format.open_memmap(
+                os.path.join(dir_col, ljpl.EphJplCol.FILE_JDS),
+                mode="w+", dtype=np.float64, shape=(n_rec, 2)
+            )
+            outs = {}
+            for k in bodies:
+                ipt = h.ipts[k - 1]
+                if ipt[1] == 0:
+                    continue
+                outs[k] = np.lib.format.open_memmap(
+                    os.path.join(dir_col, ljpl.EphJplCol.FILE_BODY.format(k)),
+                    mode="w+", dtype=dtype,
+                    shape=(n_rec, ipt[2], 2 if k == 12 else 3, ipt[1])
+                )
+                errors[k] = 0.0
+            coeffs = None
+            for idx in range(n_rec):
+                jds_rec, coeffs = reader.record(idx)
+                jds[idx] = jds_rec
+                for k, out in outs.items():
+                    out[idx] = coeffs[k - 1]
+                    if out.dtype != np.float64:
+                        errors[k] = max(
+                            errors[k], calc_error(coeffs[k - 1], out[idx])
+                        )
+            written = list(outs.keys())
+            jds.flush()
+            for out in outs.values():
+                out.flush()
+            del jds, outs, coeffs
+            write_header(
+                h, os.path.join(dir_col, ljpl.EphJplCol.FILE_HEADER),
+                np.dtype(dtype).str[1:], errors, written
+            )
+        return n_rec
+    except Exception as e:
+        raise
+
+def calc_error(coeff, coeff_out):
+    """ 係数の丸め誤差による位置の誤差の上限
+        * |T_n| <= 1 なので、成分毎の誤差の上限は係数の差の絶対値の和。
+          その 2 乗和の平方根のサブ区間での最大値とする。
+
+    :param  np.ndarray     coeff: 元の係数（形状: サブ区間 x 要素 x 係数）
+    :param  np.ndarray coeff_out: 保存した係数（同上）
+    :return float               : 位置の誤差の上限（km または rad）
+    """
+    try:
+        diff = np.abs(coeff - coeff_out.astype(np.float64)).sum(axis=-1)
+        return float(np.sqrt((diff ** 2).sum(axis=-1)).max())
+    except Exception as e:
+        raise
+
+def measure(file_bin, dir_col, n_sample=1000):
+    """ 変換後の係数データの誤差の計測
+        * 期間内の乱数のユリウス日で、計算可能な全天体（太陽系重心基準）の位置を
+          元の JPLEPH（倍精度）と比較し、天体毎の差の最大値を返す。
+        * 一部の天体のみ変換した場合は、変換した係数データのみで計算可能な
+          天体（変換後の bodies()）のみを比較する。
+
+    :param  string file_bin: 元のバイナリファイルのフルパス
+    :param  string  dir_col: 変換後のディレクトリのフルパス
+    :param  int    n_sample: 比較するユリウス日の数
+    :return dict     errors: 天体番号 => 位置の差（ベクトルの大きさ）の最大値
+                             （単位は km。 14: 地球の章動, 15: 月の秤動 は rad）
+    """
+    errors = {}
+    try:
+        s_org = ljpl.EphJplSession(file_bin)
+        s_col = ljpl.EphJplSession(dir_col)
+        sss = s_col.sss
+        jds = np.random.uniform(sss[0], sss[1], n_sample)
+        jds = jds[jds < sss[1]]
+        bodies_org = s_org.bodies()
+        for k in s_col.bodies():
+            if k == 12 or k not in bodies_org:
+                continue
+            center = 0 if k > 13 else 12
+            n = 2 if k == 14 else 3
+            p_org = s_org.states(k, center, jds, km=True, kind=1)[:, :n]
+            p_col = s_col.states(k, center, jds, km=True, kind=1)[:, :n]
+            errors[k] = float(
+                np.sqrt(((p_col - p_org) ** 2).sum(axis=-1)).max()
+            )
+        s_org.close()
+        s_col.close()
+        return errors
+    except Exception as e:
+        raise
+
+def write_header(h, file_json, dtype="f8", errors=None, bodies=None):
+    """ ヘッダ部の JSON 出力
+        * 出力した係数データ（bodies）以外の天体の IPT は (オフセット, 0, 0)
+          とする。
+
+    :param EphJplHeader      h: ヘッダ部
+    :param string    file_json: 出力ファイルのフルパス
+    :param string        dtype: 係数の型（"f8": 倍精度, "f4": 単精度）
+    :param dict         errors: 係数データの番号 => 位置の誤差の上限（省略可）
+    :param list         bodies: 出力した係数データの番号（1 - 13）の一覧
+                                （省略時は全て）
+    """
+    try:
+        ipts = [
+            list(ipt) if bodies is None or k + 1 in bodies
+            else [ipt[0], 0, 0]
+            for k, ipt in enumerate(h.ipts)
+        ]
+        with open(file_json, "w") as f:
+            json.dump({
+                "ttl": h.ttl, "cnams": list(h.cnams), "sss": list(h.sss),
+                "ncon": h.ncon, "au": h.au, "emrat": h.emrat,
+                "ipts": ipts, "numde": h.numde,
+                "cvals": list(h.cvals), "dtype": dtype,
+                "errors": {str(k): v for k, v in (errors or {}).items()}
+            }, f, ensure_ascii=False, indent=1)
+    except Exception as e:
+        raise
@@ -0,0 +1,157 @@
+"""
+Modules for JPL Ephemeris (extraction).
+
+* JPLEPH（JPL の DE430 バイナリデータ）から、期間・天体を限定した
+  JPLEPH と同じ形式のバイナリファイルを作成する。
+  - 期間は区間（レコード）単位に切り上げ、 SS（開始・終了ユリウス日）を
+    抽出した区間に合わせる。
+  - 出力対象外の天体は IPT の係数の数・サブ区間数を 0 とし、係数は出力しない。
+    （出力対象の天体の係数は、オフセット 3 から順に詰めて配置する）
+  - レコードのサイズ（KSIZE）は、出力後の IPT, NCON から求める。
+* 作成したファイルは eph_jpl.EphJplSession（EphJpl）にそのまま指定できる。
+  （出力対象外の天体を必要とする計算は ValueError となる）
+* 係数は変換せずにそのまま複写するため、出力対象の天体の計算結果は元の
+  JPLEPH と一致する。（validate() で確認可能）
+"""
+import numpy as np
+import os
+import sys
+import types
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import eph_jpl as ljpl
+
+
+def extract(file_bin, file_out, jd_s, jd_e, bodies=None):
+    """ JPLEPH -> 期間・天体を限定した JPLEPH
+        * 1 区間（レコード）ずつ読み込み・書き込みを行う。
+          （全係数をメモリに展開しない）
+
+    :param  string file_bin: バイナリファイルのフルパス
+    :param  string file_out: 出力ファイルのフルパス
+    :param  float      jd_s: 開始ユリウス日
+    :param  float      jd_e: 終了ユリウス日
+    :param  list     bodies: 出力対象の係数データの番号（1 - 13）の一覧
+                             （省略時は全て）
+    :return int       n_rec: 区間（レコード）数
+    """
+    try:
+        with ljpl.EphJplBin(file_bin) as reader:
+            h = reader.header
+            if bodies is None:
+                bodies = range(1, len(h.ipts) + 1)
+            n_rec = reader.n_rec
+            idx_s, idx_e = get_range(h, n_rec, jd_s, jd_e)
+            h_out = make_header(h, idx_s, idx_e, bodies)
+            rec = np.zeros(h_out.ksize // 2, dtype=np.float64)
+            with open(file_out, "wb") as f:
+                f.write(ljpl.pack_header(h_out, reader.RECL))
+                for idx in range(idx_s, idx_e):
+                    jds, coeffs = reader.record(idx)
+                    rec[:] = 0.0
+                    rec[0:2] = jds
+                    for k, ipt in enumerate(h_out.ipts):
+                        if ipt[1] == 0:
+                            continue
+                        c = coeffs[k].ravel()
+                        rec[ipt[0] - 1:ipt[0] - 1 + c.size] = c
+                    f.write(rec.tobytes())
+                    del coeffs, c
+        return idx_e - idx_s
+    except Exception as e:
+        raise
+
+def get_range(h, n_rec, jd_s, jd_e):
+    """ 抽出する区間（レコード）の範囲の取得
+        * 開始・終了ユリウス日を含む区間全体とする。
+        * 範囲外のユリウス日の場合は ValueError とする。
+
+    :param  EphJplHeader h: ヘッダ部
+    :param  int      n_rec: 元の区間（レコード）数
+    :param  float     jd_s: 開始ユリウス日
+    :param  float     jd_e: 終了ユリウス日
+    :return int      idx_s: 開始レコード番号（係数データの先頭を 0 とする）
+    :return int      idx_e: 終了レコード番号（この番号を含まない）
+    """
+    try:
+        jd_0, step = h.sss[0], h.sss[2]
+        jd_max = jd_0 + step * n_rec
+        if jd_s > jd_e or jd_s < jd_0 or jd_e > jd_max:
+            raise ValueError(
+                "Please input JD s.t. {} <= JD_S <= JD_E <= {}.".format(
+                    jd_0, jd_max
+                )
+            )
+        idx_s = int((jd_s - jd_0) // step)
+        idx_e = int(-((jd_0 - jd_e) // step))
+        return min(idx_s, n_rec - 1), max(min(idx_e, n_rec), idx_s + 1)
+    except Exception as e:
+        raise
+
+def make_header(h, idx_s, idx_e, bodies):
+    """ 出力ファイルのヘッダ部の作成
+        * SS は抽出した区間に合わせ、 IPT は出力対象の天体の係数をオフセット 3
+          から順に詰めた値とする。（出力対象外の天体は (オフセット, 0, 0)）
+        * CVAL 中の開始・終了ユリウス日（START, FINAL）も SS に合わせる。
+
+    :param  EphJplHeader h: 元のヘッダ部
+    :param  int      idx_s: 開始レコード番号
+    :param  int      idx_e: 終了レコード番号（この番号を含まない）
+    :param  list    bodies: 出力対象の係数データの番号（1 - 13）の一覧
+    :return EphJplHeader
+    """
+    try:
+        jd_0, step = h.sss[0], h.sss[2]
+        sss = (jd_0 + step * idx_s, jd_0 + step * idx_e, step)
+        ipts, pos = [], 3
+        for k, ipt in enumerate(h.ipts):
+            if k + 1 not in bodies or ipt[1] == 0:
+                ipts.append((pos, 0, 0))
+                continue
+            ipts.append((pos, ipt[1], ipt[2]))
+            pos += ipt[1] * ipt[2] * (2 if k == 11 else 3)
+        consts = dict(h.consts)
+        if "START" in consts:
+            consts["START"] = sss[0]
+        if "FINAL" in consts:
+            consts["FINAL"] = sss[1]
+        cvals = tuple(consts.get(c, v) for c, v in zip(h.cnams, h.cvals))
+        return h._replace(
+            sss=sss, ipts=tuple(ipts), cvals=cvals,
+            consts=types.MappingProxyType(dict(zip(h.cnams, cvals))),
+            ksize=ljpl.calc_ksize(ipts, h.ncon)
+        )
+    except Exception as e:
+        raise
+
+def validate(file_bin, file_out, n_sample=1000):
+    """ 抽出したファイルの検証
+        * 抽出したファイルの期間内の（区間の境界を含む）ユリウス日で、
+          計算可能な全天体（太陽系重心基準）の位置・速度を元の JPLEPH と比較し、
+          天体毎の差の絶対値の最大値を返す。（係数をそのまま複写しているため、
+          全て 0.0 となる）
+
+    :param  string file_bin: 元のバイナリファイルのフルパス
+    :param  string file_out: 抽出したファイルのフルパス
+    :param  int    n_sample: 比較するユリウス日の数（区間の境界を除く）
+    :return dict      diffs: 天体番号 => 差の絶対値の最大値
+    """
+    diffs = {}
+    try:
+        s_org = ljpl.EphJplSession(file_bin)
+        s_ext = ljpl.EphJplSession(file_out)
+        sss = s_ext.sss
+        jds = np.concatenate((
+            np.arange(sss[0], sss[1], sss[2]),
+            np.random.uniform(sss[0], sss[1], n_sample)
+        ))
+        jds = jds[jds < sss[1]]
+        for k in s_ext.bodies():
+            center = 0 if k > 13 else 12
+            rrds_org = s_org.states(k, center, jds)
+            rrds_ext = s_ext.states(k, center, jds)
+            diffs[k] = float(np.abs(rrds_ext - rrds_org).max())
+        s_org.close()
+        s_ext.close()
+        return diffs
+    except Exception as e:
+        raise
@@ -82,3 +82,56 @@ def rotate(r, pos):
     except Exception as e:
         raise
 
+
+def r_x_v(phis, r_src=None):
+    """ 回転行列生成(x軸中心, 複数の角度)
+        * r_x() の配列版。角度の配列（N 個）に対する回転行列を返す。
+
+    :param  np.ndarray  phis: Angles (Unit: rad)（N 個）
+    :param  np.ndarray r_src: Rotation matrixes（形状: N x 3 x 3, 省略可）
+    :return np.ndarray r_dst: Rotated matrixes（形状: N x 3 x 3）
+    """
+    try:
+        s, c = np.sin(phis), np.cos(phis)
+        r_mx = np.zeros((s.size, 3, 3), dtype="float64")
+        r_mx[:, 0, 0] = 1.0
+        r_mx[:, 1, 1], r_mx[:, 1, 2] =  c, s
+        r_mx[:, 2, 1], r_mx[:, 2, 2] = -s, c
+        return r_mx if r_src is None else r_mx @ r_src
+    except Exception as e:
+        raise
+
+def r_z_v(psis, r_src=None):
+    """ 回転行列生成(z軸中心, 複数の角度)
+        * r_z() の配列版。角度の配列（N 個）に対する回転行列を返す。
+
+    :param  np.ndarray  psis: Angles (Unit: rad)（N 個）
+    :param  np.ndarray r_src: Rotation matrixes（形状: N x 3 x 3, 省略可）
+    :return np.ndarray r_dst: Rotated matrixes（形状: N x 3 x 3）
+    """
+    try:
+        s, c = np.sin(psis), np.cos(psis)
+        r_mx = np.zeros((s.size, 3, 3), dtype="float64")
+        r_mx[:, 0, 0], r_mx[:, 0, 1] =  c, s
+        r_mx[:, 1, 0], r_mx[:, 1, 1] = -s, c
+        r_mx[:, 2, 2] = 1.0
+        return r_mx if r_src is None else r_mx @ r_src
+    except Exception as e:
+        raise
+
+def rotate_v(r, pos):
+    """ 座標回転（複数）
+        * 回転行列が 1 個（形状: 3 x 3）の場合は、全ての座標に適用する。
+        * 座標は先頭に軸を追加した形状（例: M x N x 3）でもよい。
+          （N 個の回転行列を、先頭の軸の全ての座標に適用する）
+
+    :param  np.ndarray r    : 回転行列（形状: N x 3 x 3 または 3 x 3）
+    :param  np.ndarray pos  : 回転前直交座標（形状: N x 3）
+    :return np.ndarray pos_r: 回転後直交座標（形状: N x 3）
+    """
+    try:
+        if np.ndim(r) == 2:
+            return pos @ np.asarray(r).T
+        return np.einsum("nij,...nj->...ni", r, pos)
+    except Exception as e:
+        raise
@@ -17,6 +17,7 @@ Class for Nutation.
   - [IERS Conventions Center](http://62.161.69.131/iers/conv2003/conv2003_c5.html)
 """
 import math
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -25,6 +26,11 @@ import fundamental_argument as lfa
 
 
 class Nutation:
+    DAT_LS = None  # 日月章動の係数データ（初回の生成時に設定し、共有）
+    DAT_PL = None  # 惑星章動の係数データ（初回の生成時に設定し、共有）
+    ARR_LS = None  # 日月章動の係数データ（np.ndarray, calc_v() の初回に設定）
+    ARR_PL = None  # 惑星章動の係数データ（np.ndarray, calc_v() の初回に設定）
+
     def __init__(self, jc):
         """ Initialization
 
@@ -38,16 +44,32 @@ class Nutation:
             * luni-solar の最初の5列、planetary の最初の14列は整数に、
               残りの列は浮動小数点*10000にする
             * 読み込みデータは self.dat_ls, self.dat_pl に格納
+            * 変換は初回のみ行い、以降はクラス変数 DAT_LS, DAT_PL を共有する。
+              （変更しないこと）
         """
         try:
-            self.dat_ls = [
-                l[:5] + [x * 10000 for x in l[5:]]
-                for l in lcst.NUT_LS
-            ]
-            self.dat_pl =[
-                l[:14] + [x * 10000 for x in l[14:]]
-                for l in lcst.NUT_PL
-            ]
+            self.dat_ls, self.dat_pl = Nutation.get_data()
+        except Exception as e:
+            raise
+
+    @staticmethod
+    def get_data():
+        """ 係数データ（クラス変数 DAT_LS, DAT_PL）の取得
+            * 未設定の場合は定数(NUT_LS, NUT_PL)から変換して設定する。
+
+        :return list: [日月章動の係数データ, 惑星章動の係数データ]
+        """
+        try:
+            if Nutation.DAT_LS is None:
+                Nutation.DAT_LS = [
+                    l[:5] + [x * 10000 for x in l[5:]]
+                    for l in lcst.NUT_LS
+                ]
+                Nutation.DAT_PL = [
+                    l[:14] + [x * 10000 for x in l[14:]]
+                    for l in lcst.NUT_PL
+                ]
+            return [Nutation.DAT_LS, Nutation.DAT_PL]
         except Exception as e:
             raise
 
@@ -107,3 +129,59 @@ class Nutation:
         except Exception as e:
             raise
 
+
+def calc_v(jcs, chunk=1024):
+    """ 章動（日月章動 + 惑星章動）の計算（複数のユリウス世紀数）
+        * Nutation.calc_lunisolar(), Nutation.calc_planetary() の配列版。
+          引数（幅角）の計算は基本引数と係数の整数倍の行列積、各項の和は
+          sin, cos の行列とベクトルの積で行う。
+        * メモリ使用量を抑えるため、 chunk 個ずつ計算する。
+        * 係数データの配列は初回のみ Nutation.get_data() から作成し、以降は
+          クラス変数 Nutation.ARR_LS, ARR_PL を共有する。（変更しないこと）
+
+    :param  np.ndarray jcs: ユリウス世紀数の配列（N 個）
+    :param  int      chunk: 1 回に計算する個数
+    :return np.ndarray dps: 黄経における章動(Δψ)の配列（N 個）
+    :return np.ndarray des: 黄道傾斜における章動(Δε)の配列（N 個）
+    """
+    try:
+        jcs = np.atleast_1d(np.asarray(jcs, dtype=np.float64))
+        if Nutation.ARR_LS is None:
+            dat_ls, dat_pl = Nutation.get_data()
+            Nutation.ARR_PL = np.array(dat_pl, dtype=np.float64)
+            Nutation.ARR_LS = np.array(dat_ls, dtype=np.float64)
+        dat_ls, dat_pl = Nutation.ARR_LS, Nutation.ARR_PL
+        m_ls = dat_ls[:, 0:5].T
+        m_pl = dat_pl[:, [0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13]].T
+        dps = np.zeros(jcs.size, dtype=np.float64)
+        des = np.zeros(jcs.size, dtype=np.float64)
+        for i in range(0, jcs.size, chunk):
+            t = jcs[i:i + chunk]
+            # 日月章動
+            fa = np.column_stack([
+                lfa.l_iers2003(t), lfa.lp_mhb2000(t), lfa.f_iers2003(t),
+                lfa.d_mhb2000(t), lfa.om_iers2003(t)
+            ])
+            arg = (fa @ m_ls) % lcst.PI2
+            sarg, carg = np.sin(arg), np.cos(arg)
+            dp = sarg @ dat_ls[:, 5] + t * (sarg @ dat_ls[:, 6]) \
+               + carg @ dat_ls[:, 7]
+            de = carg @ dat_ls[:, 8] + t * (carg @ dat_ls[:, 9]) \
+               + sarg @ dat_ls[:, 10]
+            # 惑星章動
+            fa = np.column_stack([
+                lfa.l_mhb2000(t), lfa.f_mhb2000(t), lfa.d_mhb2000_2(t),
+                lfa.om_mhb2000(t), lfa.lme_iers2003(t), lfa.lve_iers2003(t),
+                lfa.lea_iers2003(t), lfa.lma_iers2003(t),
+                lfa.lju_iers2003(t), lfa.lsa_iers2003(t),
+                lfa.lur_iers2003(t), lfa.lne_mhb2000(t), lfa.pa_iers2003(t)
+            ])
+            arg = (fa @ m_pl) % lcst.PI2
+            sarg, carg = np.sin(arg), np.cos(arg)
+            dp += sarg @ dat_pl[:, 14] + carg @ dat_pl[:, 15]
+            de += sarg @ dat_pl[:, 16] + carg @ dat_pl[:, 17]
+            dps[i:i + chunk] = dp * lcst.U2R
+            des[i:i + chunk] = de * lcst.U2R
+        return dps, des
+    except Exception as e:
+        raise
@@ -2,6 +2,7 @@
 各種時刻換算用ライブラリ
 """
 import datetime
+import numpy as np
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -14,6 +15,20 @@ def gc2jd(gc):
     :param  datetime gc: グレゴリオ暦
     :return float    jd: ユリウス日
     """
+    try:
+        d, t = gc2jd_2(gc)
+        return d + t
+    except Exception as e:
+        raise
+
+def gc2jd_2(gc):
+    """ ユリウス日の計算（2 つの値の和）
+        * 日の部分（0 時のユリウス日）と日の端数に分けて返す。
+          （和をとらないため、日の端数の精度が保たれる）
+
+    :param  datetime gc: グレゴリオ暦
+    :return list       : [0 時のユリウス日, 日の端数]
+    """
     year, month,  day    = gc.year, gc.month,  gc.day
     hour, minute, second = gc.hour, gc.minute, gc.second
     second += gc.microsecond * 1e-6
@@ -24,7 +39,7 @@ def gc2jd(gc):
         d = int(365.25 * year) + year // 400  - year // 100 \
           + int(30.59 * (month - 2)) + day + 1721088.5
         t  = (second / 3600 + minute / 60 + hour) / 24
-        return d + t
+        return [d, t]
     except Exception as e:
         raise
 
@@ -193,3 +208,178 @@ def tcb2tdb(tcb, jd_tcb):
     except Exception as e:
         raise
 
+
+def gc2jd_v(gcs):
+    """ ユリウス日の計算（複数）
+        * gc2jd() の配列版。 datetime のリスト、 np.datetime64 の配列を
+          マイクロ秒単位で扱う。
+
+    :param  np.ndarray gcs: グレゴリオ暦（N 個）
+    :return np.ndarray jds: ユリウス日（N 個）
+    """
+    try:
+        gcs = np.atleast_1d(np.asarray(gcs, dtype="datetime64[us]"))
+        us = (gcs - np.datetime64("1970-01-01T00:00:00", "us")).astype(np.int64)
+        return 2440587.5 + us / (lcst.DAYSEC * 1e6)
+    except Exception as e:
+        raise
+
+def utc2utc_tai_v(utcs):
+    """ UTC - TAI（うるう秒の総和）の取得（複数）
+        * utc2utc_tai() の配列版。
+
+    :param  np.ndarray     utcs: 協定世界時（N 個）
+    :return np.ndarray utc_tais: 協定世界時と国際原子時の差（N 個）
+                                 (Unit: seconds)
+    """
+    try:
+        days = np.atleast_1d(np.asarray(utcs, dtype="datetime64[D]"))
+        dates = np.array(
+            [np.datetime64("{}-{}-{}".format(d[0:4], d[4:6], d[6:8]))
+             for d, _ in lcst.LEAP_SEC],
+            dtype="datetime64[D]"
+        )
+        secs = np.array([sec for _, sec in lcst.LEAP_SEC], dtype=np.float64)
+        idxs = np.searchsorted(dates, days, side="right") - 1
+        return np.where(idxs >= 0, secs[np.maximum(idxs, 0)], 0.0)
+    except Exception as e:
+        raise
+
+def utc2tdb_2(utc):
+    """ UTC(協定世界時) -> TDB(太陽系力学時)（ユリウス日, 2 つの値の和）
+        * utc2tai(), tai2tt(), tt2tcb(), tcb2tdb() と同じ計算を、
+          datetime を使用せずにユリウス日で行う。
+        * 時刻の差（秒）は日の端数に加えるため、 datetime のマイクロ秒への
+          丸め、ユリウス日の和による丸めが発生しない。
+
+    :param  datetime utc: 協定世界時
+    :return list        : [0 時のユリウス日, 日の端数] (for TDB)
+    """
+    try:
+        jd_1, jd_2 = gc2jd_2(utc)
+        s = lcst.TT_TAI - utc2utc_tai(utc)
+        s += lcst.L_B * ((jd_1 - lcst.T_0) + jd_2) * lcst.DAYSEC
+        s -= lcst.L_B * ((jd_1 - lcst.T_0) + jd_2 + s / lcst.DAYSEC) \
+           * lcst.DAYSEC - lcst.TDB_0
+        return [jd_1, jd_2 + s / lcst.DAYSEC]
+    except Exception as e:
+        raise
+
+def utc2tdb_v(utcs):
+    """ UTC(協定世界時) -> TDB(太陽系力学時)（複数）
+        * utc2tdb_2() の配列版。
+
+    :param  np.ndarray     utcs: 協定世界時（N 個）
+    :return np.ndarray jds_tdb_1: 0 時のユリウス日 (for TDB)（N 個）
+    :return np.ndarray jds_tdb_2: 日の端数 (for TDB)（N 個）
+    """
+    try:
+        utcs = np.atleast_1d(np.asarray(utcs, dtype="datetime64[us]"))
+        days = utcs.astype("datetime64[D]")
+        jds_1 = gc2jd_v(days)
+        jds_2 = (utcs - days).astype(np.int64) / (lcst.DAYSEC * 1e6)
+        s = lcst.TT_TAI - utc2utc_tai_v(utcs)
+        s += lcst.L_B * ((jds_1 - lcst.T_0) + jds_2) * lcst.DAYSEC
+        s -= lcst.L_B * ((jds_1 - lcst.T_0) + jds_2 + s / lcst.DAYSEC) \
+           * lcst.DAYSEC - lcst.TDB_0
+        return jds_1, jds_2 + s / lcst.DAYSEC
+    except Exception as e:
+        raise
+
+def utc2dut1_v(utcs):
+    """ DUT1 (= UT1(世界時1) - UTC(協定世界時)) の取得（複数）
+        * utc2dut1() の配列版。
+
+    :param  np.ndarray  utcs: 協定世界時（N 個）
+    :return np.ndarray dut1s: DUT1（N 個） (Unit: seconds)
+    """
+    try:
+        days = np.atleast_1d(np.asarray(utcs, dtype="datetime64[D]"))
+        dates = np.array(
+            [np.datetime64("{}-{}-{}".format(d[0:4], d[4:6], d[6:8]))
+             for d, _ in lcst.DUT1],
+            dtype="datetime64[D]"
+        )
+        secs = np.array([sec for _, sec in lcst.DUT1], dtype=np.float64)
+        idxs = np.searchsorted(dates, days, side="right") - 1
+        return np.where(idxs >= 0, secs[np.maximum(idxs, 0)], 0.0)
+    except Exception as e:
+        raise
+
+def utc2ut1_v(utcs):
+    """ UTC(協定世界時) -> UT1(世界時1)（ユリウス日, 複数）
+        * UT1 = UTC + DUT1 を、 utc2tdb_v() と同じく 0 時のユリウス日と
+          日の端数に分けて計算する。
+
+    :param  np.ndarray      utcs: 協定世界時（N 個）
+    :return np.ndarray jds_ut1_1: 0 時のユリウス日 (for UT1)（N 個）
+    :return np.ndarray jds_ut1_2: 日の端数 (for UT1)（N 個）
+    """
+    try:
+        utcs = np.atleast_1d(np.asarray(utcs, dtype="datetime64[us]"))
+        days = utcs.astype("datetime64[D]")
+        jds_1 = gc2jd_v(days)
+        jds_2 = (utcs - days).astype(np.int64) / (lcst.DAYSEC * 1e6)
+        return jds_1, jds_2 + utc2dut1_v(utcs) / lcst.DAYSEC
+    except Exception as e:
+        raise
+
+def tdb2utc_v(jds_1, jds_2):
+    """ TDB(太陽系力学時) -> UTC(協定世界時)（複数, 近似）
+        * TDB - TT（2 ミリ秒未満）は無視し、 UTC - TAI は TDB の日付の値を
+          使用する。（うるう秒の挿入直後は 1 秒ずれる）
+
+    :param  np.ndarray jds_1: ユリウス日 (for TDB)（N 個）
+    :param  np.ndarray jds_2: ユリウス日 (for TDB)（jds_1 に加える値, N 個）
+    :return np.ndarray  utcs: 協定世界時（np.datetime64[us], N 個）
+    """
+    try:
+        days = np.floor(jds_1 - 2440587.5)
+        us = np.round(((jds_1 - 2440587.5 - days) + jds_2) * lcst.DAYSEC * 1e6)
+        tdbs = np.datetime64("1970-01-01T00:00:00", "us") \
+             + days.astype(np.int64) * np.timedelta64(lcst.DAYSEC * 10**6, "us") \
+             + us.astype(np.int64) * np.timedelta64(1, "us")
+        s = lcst.TT_TAI - utc2utc_tai_v(tdbs)
+        return tdbs - np.round(s * 1e6).astype(np.int64) * np.timedelta64(1, "us")
+    except Exception as e:
+        raise
+
+def ut12era_v(jds_1, jds_2):
+    """ 地球回転角 (ERA: Earth Rotation Angle) の計算（複数）
+        * IAU 2000 (SOFA の iauEra00 と同じ計算)
+
+    :param  np.ndarray jds_1: ユリウス日 (for UT1)（N 個）
+    :param  np.ndarray jds_2: ユリウス日 (for UT1)（jds_1 に加える値, N 個）
+    :return np.ndarray  eras: 地球回転角 (Unit: rad, 0 <= ERA < 2π)（N 個）
+    """
+    try:
+        t = (jds_1 - lcst.J2000) + jds_2
+        f = np.mod(jds_1, 1.0) + np.mod(jds_2, 1.0)
+        era = lcst.PI2 * (f + 0.7790572732640 + 0.00273781191135448 * t)
+        return np.mod(era, lcst.PI2)
+    except Exception as e:
+        raise
+
+def ut12gmst_v(jds_1, jds_2, jcs):
+    """ グリニッジ平均恒星時 (GMST) の計算（複数）
+        * IAU 2006 (SOFA の iauGmst06 と同じ計算)
+
+    :param  np.ndarray jds_1: ユリウス日 (for UT1)（N 個）
+    :param  np.ndarray jds_2: ユリウス日 (for UT1)（jds_1 に加える値, N 個）
+    :param  np.ndarray   jcs: ユリウス世紀数 (for TT)（N 個）
+    :return np.ndarray gmsts: グリニッジ平均恒星時 (Unit: rad, 0 <= GMST < 2π)
+                              （N 個）
+    """
+    try:
+        t = jcs
+        gmst = ut12era_v(jds_1, jds_2) \
+             + (     0.014506    \
+             + (  4612.156534    \
+             + (     1.3915817   \
+             + (    -0.00000044  \
+             + (    -0.000029956 \
+             + (    -0.0000000368) \
+             * t) * t) * t) * t) * t) * lcst.AS2R
+        return np.mod(gmst, lcst.PI2)
+    except Exception as e:
+        raise